@@ -78,3 +78,11 @@ async def list_jobs():
         })
 
     return jobs
+
+
+@router.get("/models", response_model=dict)
+async def model_status():
+    """Warm/cold state of the LLM models (warm-up runs in the background)"""
+
+    processor = get_processor()
+    return processor.get_model_status()
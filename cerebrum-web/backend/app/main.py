@@ -3,6 +3,10 @@ Cerebrum Web API - FastAPI Backend
 Beautiful, minimalist API for knowledge refinement
 """
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -10,6 +14,21 @@ import uvicorn
 
 from app.api.routes import process, vault, settings
 from app.api.websocket import websocket_endpoint
+from app.services.processor import get_processor
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the processor at boot, so model warm-up starts with the server"""
+    try:
+        await asyncio.to_thread(get_processor)
+    except Exception as e:
+        # No LLM yet: the first request tries again
+        logger.warning("Processor not ready at startup: %s", e)
+    yield
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -17,7 +36,8 @@ app = FastAPI(
     description="It just works, beautifully ✨",
     version="0.5.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware (allow frontend to connect)
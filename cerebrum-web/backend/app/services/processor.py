@@ -20,7 +20,7 @@ class ProcessorService:
     def __init__(self, vault_path: Path, verbose: bool = False):
         self.vault_path = vault_path
         self.verbose = verbose
-        self.llm = LLMService.create_default()
+        self.llm = LLMService.create_default(vault_path)
         self.orchestrator = Orchestrator(self.llm, vault_path, verbose=verbose)
         self.jobs: Dict[str, Dict[str, Any]] = {}  # In-memory job storage
 
@@ -124,6 +124,10 @@ class ProcessorService:
 
         return job_id
 
+    def get_model_status(self) -> Dict[str, str]:
+        """Warm/cold state of the pipeline's models (warm-up runs at startup)"""
+        return self.orchestrator.model_states()
+
     def get_job_status(self, job_id: str) -> Dict[str, Any]:
         """Get status of a processing job"""
         return self.jobs.get(job_id, {
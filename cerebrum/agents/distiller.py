@@ -1,9 +1,14 @@
 """
 Distiller Agent - Atomizes knowledge from raw text into structured notes.
+
+Concept notes are generated concurrently (bounded worker pool) or, in
+packed mode, in one multi-concept prompt. Every prompt opens with the
+same source block, so the model can reuse its cached prefix.
 """
 
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 import frontmatter
 from datetime import datetime
 
@@ -11,6 +16,20 @@ from cerebrum.agents.base import BaseAgent
 from cerebrum.intelligence.llm import LLMService
 from cerebrum.vault.parser import MarkdownParser
 from cerebrum.utils.templates import TemplateEngine
+from cerebrum.utils.json_repair import loads_lenient
+
+# Characters of the source sent with note generation prompts
+SOURCE_PREFIX_CHARS = 3000
+
+NOTE_SECTIONS = """Create a note with these sections:
+1. Brief definition (1-2 sentences)
+2. Key insights (2-3 bullet points)
+3. Connections to other concepts
+4. Practical applications (if applicable)
+
+Write in clear, concise Markdown. Use callouts for emphasis.
+Use Portuguese (pt-BR).
+"""
 
 
 class Note:
@@ -28,12 +47,21 @@ class Note:
         post.metadata = self.metadata
         return frontmatter.dumps(post)
 
-    def save(self):
+    def save(self, make_dirs: bool = True):
         """Save note to file."""
-        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        if make_dirs:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
         self.file_path.write_text(self.to_markdown(), encoding='utf-8')
 
 
+def save_notes(notes: List[Note]) -> None:
+    """Save notes in one pass (each directory is created once)."""
+    for directory in {note.file_path.parent for note in notes}:
+        directory.mkdir(parents=True, exist_ok=True)
+    for note in notes:
+        note.save(make_dirs=False)
+
+
 class DistillerAgent(BaseAgent):
     """
     Distills raw knowledge into atomic notes.
@@ -44,6 +72,10 @@ class DistillerAgent(BaseAgent):
     3. Generate atomic notes for each concept
     4. Apply templates
     5. Save to vault
+
+    Step 3 runs on up to distillation.note_workers threads, or as one
+    packed prompt when distillation.packed_notes is set (concepts the
+    packed response misses are generated individually).
     """
 
     def __init__(self, config: Dict[str, Any]):
@@ -52,6 +84,10 @@ class DistillerAgent(BaseAgent):
         self.parser = MarkdownParser()
         self.template_engine = TemplateEngine(config)
 
+        distillation = config.get('distillation') or {}
+        self.note_workers = max(1, distillation.get('note_workers', 4))
+        self.packed_notes = distillation.get('packed_notes', False)
+
     def process_file(self, file_path: Path, template: str = 'concept') -> List[Note]:
         """Process a single file and return atomic notes."""
         self.start_timer()
@@ -65,22 +101,47 @@ class DistillerAgent(BaseAgent):
         # Extract concepts
         concepts = self._identify_concepts(content)
 
-        # Generate notes
-        notes = []
-        for i, concept_data in enumerate(concepts):
-            note = self._create_note(
-                concept_data=concept_data,
-                source_content=content,
-                source_file=file_path.name,
-                template=template,
-                index=i
-            )
-            note.save()
-            notes.append(note)
+        # Generate notes (in concept order) and save them together
+        notes = self._create_notes(concepts, content, file_path.name, template)
+        save_notes(notes)
 
         self.stop_timer()
         return notes
 
+    def _create_notes(
+        self,
+        concepts: List[Dict[str, Any]],
+        source_content: str,
+        source_file: str,
+        template: str
+    ) -> List[Note]:
+        """Notes for all concepts, in order, with bounded concurrency."""
+
+        if not concepts:
+            return []
+
+        contents: List[Optional[str]] = [None] * len(concepts)
+        if self.packed_notes and len(concepts) > 1:
+            contents = self._generate_contents_packed(concepts, source_content)
+
+        def create(i: int) -> Note:
+            return self._create_note(
+                concept_data=concepts[i],
+                source_content=source_content,
+                source_file=source_file,
+                template=template,
+                index=i,
+                content=contents[i]
+            )
+
+        workers = min(self.note_workers, len(concepts))
+        if workers == 1:
+            return [create(i) for i in range(len(concepts))]
+
+        # map() returns results in submission order
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="distiller") as pool:
+            return list(pool.map(create, range(len(concepts))))
+
     def _extract_pdf(self, file_path: Path) -> str:
         """Extract text from PDF."""
         try:
@@ -158,9 +219,10 @@ Respond in JSON format:
         source_content: str,
         source_file: str,
         template: str,
-        index: int
+        index: int,
+        content: Optional[str] = None
     ) -> Note:
-        """Create a note from concept data."""
+        """Create a note from concept data (content: already generated)."""
 
         title = concept_data['title']
 
@@ -178,7 +240,8 @@ Respond in JSON format:
         }
 
         # Generate content using template
-        content = self._generate_content(concept_data, source_content, template)
+        if content is None:
+            content = self._generate_content(concept_data, source_content, template)
 
         # Determine output path
         output_dir = Path(self.config['vault']['permanent'])
@@ -199,30 +262,83 @@ Respond in JSON format:
     ) -> str:
         """Generate note content using LLM and template."""
 
-        prompt = f"""Write a concise, atomic note about: {concept_data['title']}
+        # Source first: identical across the file's concepts (prefix cache)
+        prompt = f"""{self._source_prefix(source_content)}Write a concise, atomic note about: {concept_data['title']}
 
 Definition: {concept_data['definition']}
 Context: {concept_data.get('context', '')}
 
-Source material (for reference):
-{source_content[:3000]}
+{NOTE_SECTIONS}"""
 
-Create a note with these sections:
-1. Brief definition (1-2 sentences)
-2. Key insights (2-3 bullet points)
-3. Connections to other concepts
-4. Practical applications (if applicable)
+        content = self.llm.generate(prompt, temperature=0.4)
 
-Write in clear, concise Markdown. Use callouts for emphasis.
-Use Portuguese (pt-BR).
+        return self._with_title(content, concept_data['title'])
+
+    def _generate_contents_packed(
+        self,
+        concepts: List[Dict[str, Any]],
+        source_content: str
+    ) -> List[Optional[str]]:
+        """
+        Generate all notes in one prompt.
+
+        Returns:
+            Content per concept, in order (None where the response has
+            no usable note for it)
+        """
+
+        listing = "\n".join(
+            f"{i}. {c['title']}: {c.get('definition', '')} {c.get('context', '')}".rstrip()
+            for i, c in enumerate(concepts, 1)
+        )
+
+        prompt = f"""{self._source_prefix(source_content)}Write one concise, atomic note for EACH of these concepts:
+
+{listing}
+
+{NOTE_SECTIONS}
+Respond in JSON format:
+{{
+  "notes": [
+    {{"index": 1, "content": "Markdown note for concept 1"}}
+  ]
+}}
 """
 
-        content = self.llm.generate(prompt, temperature=0.4)
+        contents: List[Optional[str]] = [None] * len(concepts)
 
-        # Ensure title is present
-        if not content.startswith('#'):
-            content = f"# {concept_data['title']}\n\n{content}"
+        response = self.llm.generate(prompt, temperature=0.4, json_mode=True)
+        data = loads_lenient(response)
+        items = data.get('notes', []) if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return contents
+
+        for position, item in enumerate(items):
+            if not isinstance(item, dict) or not str(item.get('content') or '').strip():
+                continue
+            try:
+                i = int(item.get('index', position + 1)) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= i < len(concepts) and contents[i] is None:
+                contents[i] = self._with_title(str(item['content']).strip(), concepts[i]['title'])
 
+        return contents
+
+    @staticmethod
+    def _source_prefix(source_content: str) -> str:
+        return f"""Source material (for reference):
+{source_content[:SOURCE_PREFIX_CHARS]}
+
+---
+
+"""
+
+    @staticmethod
+    def _with_title(content: str, title: str) -> str:
+        """Ensure title is present."""
+        if not content.startswith('#'):
+            content = f"# {title}\n\n{content}"
         return content
 
     def _slugify(self, text: str) -> str:
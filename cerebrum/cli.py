@@ -4,6 +4,7 @@ Cerebrum CLI - Your Personal Knowledge Refinement Tool
 """
 
 import click
+import time
 from pathlib import Path
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
@@ -11,6 +12,8 @@ from rich.panel import Panel
 
 from cerebrum.core.orchestrator import Orchestrator
 from cerebrum.services.llm_service import LLMService
+from cerebrum.services.blob_store import BlobStore
+from cerebrum.models.note import Note
 from cerebrum.utils.config import Config
 
 console = Console()
@@ -27,7 +30,9 @@ def cli():
 @click.argument('input_path', type=click.Path(exists=True))
 @click.option('--vault', '-v', type=click.Path(), help='Vault path (default: current dir)')
 @click.option('--verbose', is_flag=True, help='Show detailed processing steps')
-def process(input_path, vault, verbose):
+@click.option('--telemetry', type=click.Path(), help='Append per-call LLM telemetry (JSONL)')
+@click.option('--workers', '-w', type=int, help='Files processed at once (default: llm.parallel_documents, else 1)')
+def process(input_path, vault, verbose, telemetry, workers):
     """
     Transform documents into atomic notes with semantic connections.
 
@@ -37,6 +42,8 @@ def process(input_path, vault, verbose):
         cerebrum process paper.pdf
         cerebrum process inbox/ --vault ~/my-vault
         cerebrum process paper.pdf --verbose
+        cerebrum process inbox/ --telemetry llm-calls.jsonl
+        CEREBRUM_OLLAMA_HOSTS=http://gpu1:11434,http://gpu2:11434 cerebrum process inbox/
     """
     console.print("\n[bold]🧠 Cerebrum[/bold] [dim]· It just works, beautifully[/dim]\n")
 
@@ -47,7 +54,7 @@ def process(input_path, vault, verbose):
     try:
         if verbose:
             console.print("🔌 Initializing AI...")
-        llm = LLMService.create_default()
+        llm = LLMService.create_default(vault_path)
         if verbose:
             console.print(f"[green]✓[/green] Using {llm.provider} ({llm.model})\n")
         elif not verbose:
@@ -124,7 +131,7 @@ def process(input_path, vault, verbose):
 
         console.print(f"[dim]Processing {len(files)} files...[/dim]\n")
 
-        results = []
+        started = time.monotonic()
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -132,19 +139,21 @@ def process(input_path, vault, verbose):
         ) as progress:
             task = progress.add_task("", total=len(files))
 
-            for file_path in files:
+            def advance(file_path, result):
                 progress.update(task, description=f"{file_path.name}")
-                result = orchestrator.process(file_path)
-                results.append(result)
                 progress.advance(task)
 
+            results = orchestrator.batch_process(
+                files, max_workers=workers, on_result=advance
+            )
+
         # Batch summary - Apple-style clean
         succeeded = sum(1 for r in results if r.success)
         failed = len(results) - succeeded
         total_notes = sum(1 + len(r.permanent_notes) for r in results)
         total_links = sum(r.links_created for r in results)
         total_mocs = sum(len(r.mocs_created) + len(r.mocs_updated) for r in results)
-        total_time = sum(r.duration_seconds for r in results)
+        total_time = time.monotonic() - started  # Wall time (files may overlap)
 
         if failed == 0:
             console.print(f"\n[green bold]✓ Done[/green bold] [dim]· {len(results)} files[/dim]\n")
@@ -156,6 +165,10 @@ def process(input_path, vault, verbose):
         else:
             console.print(f"[bold]{total_notes}[/bold] atomic notes  [dim]·[/dim]  [bold]{total_links}[/bold] connections  [dim]·[/dim]  {total_time:.0f}s\n")
 
+    if telemetry:
+        written = llm.telemetry.export_jsonl(Path(telemetry))
+        console.print(f"[dim]LLM telemetry: {written} calls → {telemetry}[/dim]\n")
+
 
 @cli.command()
 @click.argument('note_path', type=click.Path(exists=True), required=False)
@@ -206,6 +219,48 @@ def synthesize(recent, tag):
     console.print("[yellow]Coming soon![/yellow]\n")
 
 
+@cli.command()
+@click.argument('note_path', type=click.Path(exists=True))
+@click.option('--head', '-n', type=int, default=None, help='Only the first N characters')
+def source(note_path, head):
+    """
+    Print the full source text of a literature note.
+
+    Examples:
+        cerebrum source "02-Literature/books/My Book.md"
+        cerebrum source note.md --head 2000
+    """
+    note_file = Path(note_path).resolve()
+    note = Note.from_markdown_file(note_file)
+
+    if not note.metadata.source_blob:
+        console.print("[red]Note has no stored source text[/red]")
+        return
+
+    # Vault root: nearest parent with a .cerebrum directory
+    vault_path = next(
+        (p for p in note_file.parents if (p / '.cerebrum').is_dir()), None
+    )
+    if vault_path is None:
+        console.print("[red]Not inside a Cerebrum vault[/red]")
+        return
+
+    blobs = BlobStore.for_vault(vault_path)
+    if not blobs.exists(note.metadata.source_blob):
+        console.print(f"[red]Source blob missing: {blobs.relative_path(note.metadata.source_blob)}[/red]")
+        return
+
+    if head is not None:
+        click.echo(blobs.excerpt(note.metadata.source_blob, head))
+        return
+
+    # Stream: the text is never held in memory at once
+    with blobs.open(note.metadata.source_blob) as stream:
+        for chunk in iter(lambda: stream.read(64 * 1024), ''):
+            click.echo(chunk, nl=False)
+    click.echo()
+
+
 @cli.command()
 @click.option('--vault', type=click.Path(), help='Vault path')
 def init(vault):
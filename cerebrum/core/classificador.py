@@ -7,22 +7,44 @@ Determines:
 - Tags (hierarchical)
 - Content type classification
 
-Simple but effective: LLM-based with structured output.
+Simple but effective: LLM-based with structured output (schema-
+constrained, repaired locally if still malformed).
 """
 
 from pathlib import Path
-from typing import Dict, Any, Optional
-import json
-import re
+from typing import Dict, Any, Optional, Tuple
 
 from cerebrum.services.llm_service import LLMService
+from cerebrum.models.schemas import Classification, CLASSIFICATION_SCHEMA, SchemaError
+from cerebrum.utils.json_repair import loads_lenient
+from cerebrum.utils.prompts import fit_document_prefix, DOCUMENT_INPUT_TOKENS
+
+# Token budgets: on its own, classification only needs a sample of the
+# document; on the distillation model it reads the shared document block
+# (DOCUMENT_INPUT_TOKENS), which distillation then finds in the KV cache
+CLASSIFICATION_SAMPLE_TOKENS = 512
+CLASSIFICATION_MAX_TOKENS = 500
+
+# Bump when a change alters classifications (stored classification
+# artifacts of older versions are then recomputed)
+CLASSIFICATION_VERSION = "1"
 
 
 class ClassificadorAgent:
     """Classifies content for proper taxonomy placement."""
 
-    def __init__(self, llm_service: LLMService):
+    def __init__(self, llm_service: LLMService, share_prefix: bool = False):
+        """
+        Args:
+            llm_service: LLM for classification
+            share_prefix: Open the prompt with the full shared document
+                block (set when distillation runs on the same model)
+                instead of a short sample
+        """
         self.llm = llm_service
+        self.document_tokens = (
+            DOCUMENT_INPUT_TOKENS if share_prefix else CLASSIFICATION_SAMPLE_TOKENS
+        )
 
         # Default taxonomy
         self.known_domains = [
@@ -55,29 +77,32 @@ class ClassificadorAgent:
 
         # Determine source type
         source_type = metadata.get('source_type', 'unknown')
-        title = metadata.get('title', 'Untitled')
 
-        # Build classification prompt
-        prompt = self._build_classification_prompt(
-            raw_text, title, source_type
-        )
+        # Build classification prompt (document prefix shared with
+        # distillation, then instructions)
+        prefix, prompt = self._build_classification_prompt(raw_text, metadata)
 
         # Get LLM classification
-        response = self.llm.generate(prompt, max_tokens=500)
+        response = self.llm.generate(
+            prompt,
+            max_tokens=CLASSIFICATION_MAX_TOKENS,
+            prefix=prefix,
+            schema=CLASSIFICATION_SCHEMA
+        )
 
         # Parse response
         classification = self._parse_classification(response)
 
         # Build final classification
         result = {
-            'domain': classification.get('domain', 'general'),
-            'subdomain': classification.get('subdomain'),
+            'domain': classification.domain,
+            'subdomain': classification.subdomain,
             'basb_para_category': self._determine_para_category(source_type, classification),
             'basb_para_path': None,  # Will be set below
-            'lyt_mocs': classification.get('mocs', []),
+            'lyt_mocs': classification.mocs,
             'tags': self._build_hierarchical_tags(classification),
-            'content_type': classification.get('content_type', 'concept'),
-            'confidence': classification.get('confidence', 0.75)
+            'content_type': classification.content_type,
+            'confidence': classification.confidence
         }
 
         # Build BASB path
@@ -88,22 +113,29 @@ class ClassificadorAgent:
     def _build_classification_prompt(
         self,
         raw_text: str,
-        title: str,
-        source_type: str
-    ) -> str:
-        """Build classification prompt."""
+        metadata: Dict[str, Any]
+    ) -> Tuple[str, str]:
+        """Build classification prompt as (document prefix, instructions).
 
-        text_sample = raw_text[:2000]  # First 2000 chars
+        With share_prefix the prefix is the distillation prompt's
+        document block; otherwise a short sample from the start.
+        """
 
-        return f"""You are an expert knowledge taxonomist.
+        instructions = self._classification_instructions()
+        prefix = fit_document_prefix(
+            self.llm, raw_text, metadata, instructions,
+            max_output_tokens=CLASSIFICATION_MAX_TOKENS,
+            max_input_tokens=self.document_tokens
+        )
 
-Classify this content into a clear taxonomy.
+        return prefix, instructions
 
-**Title:** {title}
-**Source Type:** {source_type}
+    def _classification_instructions(self) -> str:
+        """Classification instructions (follow the document prefix)."""
+
+        return f"""You are an expert knowledge taxonomist.
 
-**Content Sample:**
-{text_sample}
+Classify the source document above into a clear taxonomy.
 
 Provide classification as JSON:
 {{
@@ -124,34 +156,19 @@ Rules:
 Return ONLY valid JSON, no other text.
 """
 
-    def _parse_classification(self, response: str) -> Dict[str, Any]:
-        """Parse LLM classification response."""
+    def _parse_classification(self, response: str) -> Classification:
+        """Parse LLM classification response (repairs malformed JSON)."""
 
         try:
-            # Extract JSON
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                classification = json.loads(json_match.group())
-            else:
-                classification = json.loads(response)
-
-            return classification
-
-        except json.JSONDecodeError:
+            return Classification.from_dict(loads_lenient(response))
+        except SchemaError:
             # Fallback: minimal classification
-            return {
-                'domain': 'general',
-                'subdomain': None,
-                'content_type': 'concept',
-                'mocs': [],
-                'key_topics': [],
-                'confidence': 0.5
-            }
+            return Classification(confidence=0.5)
 
     def _determine_para_category(
         self,
         source_type: str,
-        classification: Dict[str, Any]
+        classification: Classification
     ) -> str:
         """Determine BASB PARA category."""
 
@@ -166,15 +183,15 @@ Return ONLY valid JSON, no other text.
 
     def _build_hierarchical_tags(
         self,
-        classification: Dict[str, Any]
+        classification: Classification
     ) -> list:
         """Build hierarchical tag list."""
 
         tags = []
 
         # Domain tags
-        domain = classification.get('domain', 'general')
-        subdomain = classification.get('subdomain')
+        domain = classification.domain
+        subdomain = classification.subdomain
 
         if domain:
             tags.append(f"{domain}")
@@ -182,11 +199,11 @@ Return ONLY valid JSON, no other text.
                 tags.append(f"{domain}/{subdomain}")
 
         # Content type tag
-        content_type = classification.get('content_type', 'concept')
+        content_type = classification.content_type
         tags.append(f"type/{content_type}")
 
         # Topic tags
-        key_topics = classification.get('key_topics', [])
+        key_topics = classification.key_topics
         for topic in key_topics[:5]:  # Max 5 topic tags
             tags.append(f"topic/{topic.lower().replace(' ', '-')}")
 
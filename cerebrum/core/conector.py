@@ -12,7 +12,7 @@ Zettelkasten principle: Notes gain value through connections.
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import re
-import json
+import threading
 from datetime import datetime
 
 try:
@@ -24,6 +24,20 @@ except ImportError:
 
 from cerebrum.models.note import Note, NoteMetadata
 from cerebrum.services.llm_service import LLMService
+from cerebrum.services.embedding_store import EmbeddingStore
+from cerebrum.models.schemas import LinkSuggestion, LINKS_SCHEMA, parse_list
+from cerebrum.utils.json_repair import loads_lenient
+
+# Token budgets of LLM linking prompts (runs once per new note, so the
+# input is capped well below large context windows)
+LINK_MAX_TOKENS = 800
+LINK_INPUT_TOKENS = 2048
+
+# Share of the linking prompt's input budget (LINK_INPUT_TOKENS, or less
+# if the context window does not fit it) the source note may use; the
+# rest, including what the source leaves unused, is split between
+# candidates
+LINK_SOURCE_SHARE = 0.3
 
 
 class ConectorAgent:
@@ -33,14 +47,28 @@ class ConectorAgent:
         self,
         llm_service: LLMService,
         vault_path: Path,
-        embeddings_path: Optional[Path] = None
+        embeddings_path: Optional[Path] = None,
+        embedding_store: Optional[EmbeddingStore] = None,
+        input_tokens: int = LINK_INPUT_TOKENS
     ):
         self.llm = llm_service
         self.vault_path = vault_path
+        self.input_tokens = input_tokens
         self.embeddings_path = embeddings_path or (vault_path / ".cerebrum" / "embeddings")
 
+        # Shared content-addressed store (preferred over ChromaDB)
+        self.embedding_store = embedding_store
+
+        # Vault notes are indexed in the store once per process; after
+        # that only new notes are
+        self._synced = False
+        self._sync_lock = threading.Lock()
+
         # Initialize ChromaDB
-        if CHROMADB_AVAILABLE:
+        if self.embedding_store is not None:
+            self.chroma_client = None
+            self.collection = None
+        elif CHROMADB_AVAILABLE:
             self.embeddings_path.mkdir(parents=True, exist_ok=True)
             self.chroma_client = chromadb.PersistentClient(
                 path=str(self.embeddings_path),
@@ -78,7 +106,10 @@ class ConectorAgent:
         if existing_notes is None:
             existing_notes = self._load_existing_notes()
 
-        # Add new notes to embeddings
+        # Add new notes to embeddings (with a store, the vault's notes
+        # are synced on the first call)
+        if self.embedding_store is not None:
+            self._sync_vault()
         self._index_notes(new_notes)
 
         all_links = []
@@ -129,21 +160,62 @@ class ConectorAgent:
             try:
                 note = Note.from_markdown(note_file.read_text(encoding='utf-8'))
                 notes.append(note)
-            except Exception as e:
+            except Exception:
                 # Skip malformed notes
                 continue
 
         return notes
 
+    def _sync_vault(self) -> None:
+        """Index vault notes not yet in the store (once per process;
+        unchanged ones are skipped by content hash) and drop entries of
+        deleted notes."""
+
+        with self._sync_lock:
+            if self._synced:
+                return
+
+            notes = self._load_existing_notes()
+
+            present = {note.metadata.id for note in notes}
+            stale = [
+                item_id for item_id in self.embedding_store.ids(where={'kind': 'note'})
+                if item_id not in present
+            ]
+            if stale:
+                self.embedding_store.remove(stale)
+
+            self._index_notes(notes)
+            self._synced = True
+
     def _index_notes(self, notes: List[Note]) -> None:
         """Add notes to embedding index."""
 
+        if self.embedding_store is not None:
+            self.embedding_store.ensure(
+                [
+                    (
+                        note.metadata.id,
+                        self._embedding_text(note),
+                        {
+                            'kind': 'note',
+                            'title': note.metadata.title,
+                            'domain': note.metadata.domain or 'general',
+                            'type': note.metadata.zk_permanent_note_type or 'concept'
+                        }
+                    )
+                    for note in notes
+                ],
+                self.llm.embed
+            )
+            return
+
         if not self.collection:
             return  # ChromaDB not available
 
         for note in notes:
             # Create embedding text: title + definition + key content
-            embedding_text = f"{note.metadata.title}\n\n{note.content[:1000]}"
+            embedding_text = self._embedding_text(note)
 
             # Add to collection
             self.collection.add(
@@ -156,6 +228,10 @@ class ConectorAgent:
                 }]
             )
 
+    def _embedding_text(self, note: Note) -> str:
+        """Text embedded for a note: title + definition + key content."""
+        return f"{note.metadata.title}\n\n{note.content[:1000]}"
+
     def _find_connections_for_note(
         self,
         note: Note,
@@ -166,7 +242,7 @@ class ConectorAgent:
         links = []
 
         # Strategy 1: Semantic similarity (embeddings)
-        if self.collection:
+        if self.embedding_store is not None or self.collection:
             similar_notes = self._find_similar_by_embeddings(note, top_k=10)
             links.extend(similar_notes)
 
@@ -194,10 +270,13 @@ class ConectorAgent:
     ) -> List[Dict[str, Any]]:
         """Find similar notes using embeddings."""
 
+        if self.embedding_store is not None:
+            return self._find_similar_in_store(note, top_k)
+
         if not self.collection:
             return []
 
-        embedding_text = f"{note.metadata.title}\n\n{note.content[:1000]}"
+        embedding_text = self._embedding_text(note)
 
         # Query
         results = self.collection.query(
@@ -229,6 +308,40 @@ class ConectorAgent:
 
         return links
 
+    def _find_similar_in_store(
+        self,
+        note: Note,
+        top_k: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Find similar notes using the shared embedding store."""
+
+        vector = self.embedding_store.get(note.metadata.id)
+        if vector is None:
+            return []  # Note could not be embedded
+
+        results = self.embedding_store.search(
+            vector,
+            top_k=top_k,
+            exclude_ids={note.metadata.id},
+            where={'kind': 'note'}
+        )
+
+        links = []
+        for match in results:
+            confidence = match['score']
+            link_type = self._infer_link_type(confidence)
+
+            links.append({
+                'target': match['metadata']['title'],
+                'target_id': match['id'],
+                'type': link_type,
+                'confidence': round(confidence, 2),
+                'context': f'Semantically similar ({confidence:.0%})',
+                'method': 'embeddings'
+            })
+
+        return links
+
     def _infer_link_type(self, confidence: float) -> str:
         """Infer link type based on confidence score."""
 
@@ -261,17 +374,67 @@ class ConectorAgent:
         if not candidates:
             return []
 
-        # Build prompt
+        # Build prompt within the input cap: the source excerpt first,
+        # then an even share of what is left per candidate
+        template = self._render_link_prompt(note.metadata.title, "", "")
+        budget = min(self.input_tokens, self.llm.input_budget(LINK_MAX_TOKENS, template))
+
+        source_content = self.llm.fit_tokens(note.content, int(budget * LINK_SOURCE_SHARE))
+        remaining = budget - self.llm.count_tokens(source_content)
+
+        # Each candidate line also carries its number and title
+        labels = [f"{i+1}. [[{c.metadata.title}]] - " for i, c in enumerate(candidates)]
+        overhead = sum(self.llm.count_tokens(f"{label}...\n") for label in labels)
+        per_candidate = max(0, (remaining - overhead) // len(candidates))
+
         candidate_list = "\n".join([
-            f"{i+1}. [[{c.metadata.title}]] - {c.content[:150]}..."
-            for i, c in enumerate(candidates)
+            f"{label}{self.llm.fit_tokens(c.content, per_candidate)}..."
+            for label, c in zip(labels, candidates)
         ])
 
-        prompt = f"""You are an expert at creating Zettelkasten connections.
+        prompt = self._render_link_prompt(
+            note.metadata.title, source_content, candidate_list
+        )
+
+        try:
+            response = self.llm.generate(
+                prompt, max_tokens=LINK_MAX_TOKENS, schema=LINKS_SCHEMA
+            )
+            suggestions = parse_list(loads_lenient(response), LinkSuggestion)
+
+            # Convert to link format
+            links = []
+            for suggestion in suggestions:
+                note_idx = suggestion.note_number - 1
+                if 0 <= note_idx < len(candidates):
+                    target_note = candidates[note_idx]
+                    links.append({
+                        'target': target_note.metadata.title,
+                        'target_id': target_note.metadata.id,
+                        'type': suggestion.link_type,
+                        'confidence': suggestion.confidence,
+                        'context': suggestion.context,
+                        'method': 'llm'
+                    })
+
+            return links
+
+        except Exception:
+            return []
+
+    def _render_link_prompt(
+        self,
+        title: str,
+        content: str,
+        candidate_list: str
+    ) -> str:
+        """Render LLM linking prompt."""
+
+        return f"""You are an expert at creating Zettelkasten connections.
 
 Source note:
-**Title:** {note.metadata.title}
-**Content:** {note.content[:800]}
+**Title:** {title}
+**Content:** {content}
 
 Candidate notes to link to:
 {candidate_list}
@@ -295,36 +458,6 @@ Return JSON:
 Return ONLY valid JSON.
 """
 
-        try:
-            response = self.llm.generate(prompt, max_tokens=800)
-
-            # Parse JSON
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
-            if json_match:
-                connections = json.loads(json_match.group())
-            else:
-                return []
-
-            # Convert to link format
-            links = []
-            for conn in connections:
-                note_idx = conn.get('note_number', 1) - 1
-                if 0 <= note_idx < len(candidates):
-                    target_note = candidates[note_idx]
-                    links.append({
-                        'target': target_note.metadata.title,
-                        'target_id': target_note.metadata.id,
-                        'type': conn.get('link_type', 'related'),
-                        'confidence': conn.get('confidence', 0.7),
-                        'context': conn.get('context', ''),
-                        'method': 'llm'
-                    })
-
-            return links
-
-        except Exception as e:
-            return []
-
     def _find_connections_by_domain(
         self,
         note: Note,
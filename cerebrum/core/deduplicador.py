@@ -0,0 +1,375 @@
+"""Deduplicador: Keeps repeated concepts out of the vault.
+
+Runs on distilled concepts before permanent notes are created:
+- Within the document: concepts with the same title, or embeddings
+  closer than the threshold, are merged into one (the others become
+  aliases)
+- Against the vault: one vectorized lookup of all concepts against the
+  existing permanent notes; a close match is not written as a new note,
+  it is merged into the existing one (alias + source reference)
+- Between documents processed in parallel: recheck() repeats the vault
+  lookup under the vault lock, after earlier documents were saved
+
+Vault growth and linking cost then follow new ideas, not repeated
+sources. Concept vectors (title + definition) live in the shared
+embedding store as kind 'concept', next to the notes' own vectors. The
+definition is read from note metadata (zettelkasten.definition), so it
+does not depend on the permanent note template.
+"""
+
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import re
+import threading
+
+import numpy as np
+
+from cerebrum.models.note import Note
+from cerebrum.models.schemas import Concept, title_words
+from cerebrum.services.llm_service import LLMService
+from cerebrum.services.embedding_store import EmbeddingStore
+
+# Cosine similarity of title + definition above which two concepts are one
+DUPLICATE_THRESHOLD = 0.9
+
+# Section of an existing note listing the other sources that covered it
+ALSO_IN_HEADING = "## 📚 Also Found In"
+
+# Definition line of the built-in permanent body (notes written before
+# the definition was kept in metadata)
+_DEFINITION_PATTERN = re.compile(r'^> \*\*(.+?)\*\*\s*$', re.MULTILINE)
+
+
+class DeduplicadorAgent:
+    """Merges duplicate concepts within a document and into the vault."""
+
+    def __init__(
+        self,
+        llm_service: LLMService,
+        vault_path: Path,
+        embedding_store: EmbeddingStore,
+        threshold: float = DUPLICATE_THRESHOLD
+    ):
+        self.llm = llm_service
+        self.vault_path = vault_path
+        self.embedding_store = embedding_store
+        self.threshold = threshold
+
+        self._synced = False
+        self._sync_lock = threading.Lock()
+
+    def deduplicate(
+        self,
+        concepts: List[Concept]
+    ) -> Tuple[List[Concept], List[Dict[str, Any]], List[Optional[List[float]]]]:
+        """
+        Split concepts into new ones and duplicates of vault notes.
+
+        Args:
+            concepts: Concepts of one document
+
+        Returns:
+            (new_concepts, duplicates, vectors): new_concepts have
+            in-document duplicates merged in (their titles as aliases);
+            duplicates are {concept, target_id, target_title,
+            target_path, score} for concepts that match an existing
+            vault note; vectors are the embeddings of new_concepts
+            (None if embedding failed), for register()
+        """
+
+        if not concepts:
+            return [], [], []
+
+        self._sync_vault()
+
+        # Step 1: Embed all concepts in one batch
+        texts = [self.concept_text(c) for c in concepts]
+        try:
+            vectors = self.llm.embed(texts)
+        except Exception:
+            vectors = [None] * len(concepts)  # Titles only
+
+        # Step 2: Merge duplicates within the document
+        kept: List[int] = []
+        merged: Dict[int, Concept] = {}
+        for i, concept in enumerate(concepts):
+            target = self._batch_match(i, kept, concepts, vectors)
+            if target is None:
+                kept.append(i)
+                merged[i] = concept
+            else:
+                merged[target] = merged[target].merge(concept)
+
+        # Step 3: Look up the survivors in the vault (one matrix product)
+        matches = self._vault_matches(
+            [merged[i] for i in kept], [vectors[i] for i in kept]
+        )
+
+        new_concepts = []
+        new_vectors = []
+        duplicates = []
+        for i, match in zip(kept, matches):
+            if match is None:
+                new_concepts.append(merged[i])
+                new_vectors.append(vectors[i])
+            else:
+                duplicates.append({'concept': merged[i], **match})
+
+        return new_concepts, duplicates, new_vectors
+
+    def recheck(
+        self,
+        concepts: List[Concept],
+        vectors: List[Optional[List[float]]]
+    ) -> Tuple[List[int], List[Dict[str, Any]]]:
+        """
+        Look up concepts kept by deduplicate() in the vault again.
+
+        Documents deduplicated at the same time do not see each other's
+        concepts. Call under the vault lock, right before saving: notes
+        registered by documents saved meanwhile are then found.
+
+        Args:
+            concepts: New concepts from deduplicate()
+            vectors: Their vectors (same order; may be empty)
+
+        Returns:
+            (kept, duplicates): indices of concepts still new, and
+            duplicates as in deduplicate()
+        """
+
+        if not concepts:
+            return [], []
+
+        vectors = list(vectors) or [None] * len(concepts)
+        matches = self._vault_matches(concepts, vectors)
+
+        kept = [i for i, match in enumerate(matches) if match is None]
+        duplicates = [
+            {'concept': concepts[i], **match}
+            for i, match in enumerate(matches) if match is not None
+        ]
+        return kept, duplicates
+
+    def _batch_match(
+        self,
+        index: int,
+        kept: List[int],
+        concepts: List[Concept],
+        vectors: List[Optional[List[float]]]
+    ) -> Optional[int]:
+        """Earlier kept concept that concepts[index] duplicates, if any."""
+
+        words = title_words(concepts[index].title)
+        for k in kept:
+            if words and words == title_words(concepts[k].title):
+                return k
+
+        if not vectors[index]:
+            return None
+
+        candidates = [k for k in kept if vectors[k]]
+        if not candidates:
+            return None
+
+        query = self._unit(vectors[index])
+        scores = np.stack([self._unit(vectors[k]) for k in candidates]) @ query
+        best = int(np.argmax(scores))
+        return candidates[best] if scores[best] >= self.threshold else None
+
+    def _vault_matches(
+        self,
+        concepts: List[Concept],
+        vectors: List[Optional[List[float]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Existing note each concept duplicates (None = new)."""
+
+        matches: List[Optional[Dict[str, Any]]] = [None] * len(concepts)
+
+        # Same title as an existing note
+        by_title = {}
+        for item_id in self.embedding_store.ids(where={'kind': 'concept'}):
+            metadata = self.embedding_store.metadata(item_id) or {}
+            by_title.setdefault(title_words(metadata.get('title', '')), (item_id, metadata))
+
+        for i, concept in enumerate(concepts):
+            found = by_title.get(title_words(concept.title))
+            if found and title_words(concept.title):
+                matches[i] = self._match(found[0], found[1], 1.0)
+
+        # Close embedding
+        pending = [i for i in range(len(concepts)) if matches[i] is None and vectors[i]]
+        results = self.embedding_store.search_batch(
+            [vectors[i] for i in pending], top_k=1, where={'kind': 'concept'}
+        )
+        for i, result in zip(pending, results):
+            if result and result[0]['score'] >= self.threshold:
+                matches[i] = self._match(result[0]['id'], result[0]['metadata'], result[0]['score'])
+
+        # A match whose file is gone is not a duplicate
+        return [
+            m if m is not None and (self.vault_path / m['target_path']).exists() else None
+            for m in matches
+        ]
+
+    @staticmethod
+    def _match(item_id: str, metadata: Dict[str, Any], score: float) -> Dict[str, Any]:
+        return {
+            'target_id': metadata.get('note_id', item_id),
+            'target_title': metadata.get('title', ''),
+            'target_path': metadata.get('path', ''),
+            'score': round(score, 3)
+        }
+
+    def apply(
+        self,
+        duplicates: List[Dict[str, Any]],
+        literature_note: Note
+    ) -> List[str]:
+        """
+        Merge vault duplicates into their existing notes.
+
+        The existing note gains the duplicate's title as an alias and a
+        link to the new source. Call while holding the vault lock.
+
+        Returns:
+            Paths of the notes updated
+        """
+
+        updated = []
+        source_title = literature_note.metadata.title
+
+        for duplicate in duplicates:
+            path = self.vault_path / duplicate['target_path']
+            if not path.exists():
+                continue
+
+            note = Note.from_markdown_file(path)
+            concept = duplicate['concept']
+
+            known = {note.metadata.title.lower(), *(a.lower() for a in note.metadata.aliases)}
+            for alias in [concept.title] + concept.aliases:
+                if alias.lower() not in known:
+                    note.metadata.aliases.append(alias)
+                    known.add(alias.lower())
+
+            reference = f"- [[{source_title}]]"
+            if reference not in note.content:
+                if ALSO_IN_HEADING not in note.content:
+                    note.content = note.content.rstrip() + f"\n\n{ALSO_IN_HEADING}\n"
+                note.content = note.content.rstrip() + f"\n{reference}\n"
+
+            note.metadata.modified = datetime.now().isoformat()
+            note.metadata.version += 1
+            path.write_text(note.to_markdown(), encoding='utf-8')
+            updated.append(str(path))
+
+        return updated
+
+    def register(
+        self,
+        notes: List[Note],
+        paths: List[str],
+        vectors: Optional[List[Optional[List[float]]]] = None
+    ) -> None:
+        """
+        Add saved permanent notes to the concept index.
+
+        Args:
+            notes: Notes just written
+            paths: Their file paths (same order)
+            vectors: Their concept vectors from deduplicate() (same
+                order; missing ones are embedded)
+        """
+
+        items = [self._index_item(note, Path(path)) for note, path in zip(notes, paths)]
+        known = {
+            item[1]: vector
+            for item, vector in zip(items, vectors or [])
+            if vector
+        }
+
+        def embed(texts: List[str]) -> List[Optional[List[float]]]:
+            result = [known.get(text) for text in texts]
+            missing = [i for i, v in enumerate(result) if v is None]
+            if missing:
+                for i, vector in zip(missing, self.llm.embed([texts[i] for i in missing])):
+                    result[i] = vector
+            return result
+
+        try:
+            self.embedding_store.ensure(items, embed)
+        except Exception:
+            pass  # No embeddings: indexed by the next process's sync
+
+    def _sync_vault(self) -> None:
+        """Index permanent notes not yet in the concept index (once per
+        process) and drop entries of deleted notes."""
+
+        with self._sync_lock:
+            if self._synced:
+                return
+
+            items = []
+            permanent_dir = self.vault_path / "03-Permanent"
+            if permanent_dir.exists():
+                for note_file in permanent_dir.rglob("*.md"):
+                    try:
+                        note = Note.from_markdown_file(note_file)
+                    except Exception:
+                        continue  # Skip malformed notes
+                    items.append(self._index_item(note, note_file))
+
+            present = {item[0] for item in items}
+            stale = [
+                item_id for item_id in self.embedding_store.ids(where={'kind': 'concept'})
+                if item_id not in present
+            ]
+            if stale:
+                self.embedding_store.remove(stale)
+
+            if items:
+                try:
+                    self.embedding_store.ensure(items, self.llm.embed)
+                except Exception:
+                    pass  # No embeddings: titles still deduplicate
+
+            self._synced = True
+
+    def _index_item(self, note: Note, path: Path) -> Tuple[str, str, Dict[str, Any]]:
+        try:
+            relative = str(path.relative_to(self.vault_path))
+        except ValueError:
+            relative = str(path)
+
+        return (
+            f"concept:{note.metadata.id}",
+            self.note_text(note),
+            {
+                'kind': 'concept',
+                'note_id': note.metadata.id,
+                'title': note.metadata.title,
+                'path': relative
+            }
+        )
+
+    @staticmethod
+    def concept_text(concept: Concept) -> str:
+        """Text embedded for a concept: title + definition."""
+        return f"{concept.title}\n\n{concept.definition}".strip()
+
+    @classmethod
+    def note_text(cls, note: Note) -> str:
+        """concept_text() of the concept a permanent note was built from."""
+        definition = note.metadata.zk_definition
+        if definition is None:
+            match = _DEFINITION_PATTERN.search(note.content)
+            definition = match.group(1) if match else ""
+        return f"{note.metadata.title}\n\n{definition}".strip()
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm > 0 else array
@@ -6,31 +6,369 @@ Transforms raw extracted text into atomic notes following:
 - Zettelkasten: Atomic concept extraction, permanent notes
 
 Core responsibility: 1 source → 1 literature note + 5-15 permanent notes
+
+Long documents are distilled map-reduce: the text is split at its
+sections (or into token windows), chunks are distilled in parallel, and
+the chunk concepts are merged, deduplicated and ranked locally.
 """
 
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-import json
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 import uuid
 from datetime import datetime, timedelta
 import re
 
 from cerebrum.models.note import Note, NoteMetadata
 from cerebrum.services.llm_service import LLMService
+from cerebrum.services.blob_store import BlobStore
+from cerebrum.core.extractor import StructureScanner
+from cerebrum.utils.prompts import (
+    fit_document_prefix, document_prefix, DOCUMENT_INPUT_TOKENS, DOCUMENT_OUTPUT_TOKENS
+)
+from cerebrum.utils.json_stream import JSONArrayStreamParser
+from cerebrum.utils.json_repair import loads_lenient
+from cerebrum.utils.templates import TemplateEngine
+from cerebrum.models.schemas import Concept, CONCEPTS_SCHEMA, SchemaError, parse_list, title_words
+
+# Concepts per source (generation is cut off once MAX is reached)
+MIN_CONCEPTS = 5
+MAX_CONCEPTS = 15
+
+# Token budgets for concept extraction: the shared document block (see
+# utils.prompts; input is further capped by the context window)
+DISTILL_MAX_TOKENS = DOCUMENT_OUTPUT_TOKENS
+DISTILL_INPUT_TOKENS = DOCUMENT_INPUT_TOKENS
+
+# Chunked (map-reduce) distillation: concepts asked of each chunk,
+# completion budget per chunk, and the title word overlap (Jaccard) at
+# which concepts of different chunks count as one
+CHUNK_CONCEPTS = 5
+CHUNK_MAX_TOKENS = 1500
+TITLE_MERGE_SIMILARITY = 0.75
+
+DISTILL_MODES = ('auto', 'single', 'chunked')
+
+# Bump when a change alters the concepts produced (stored destillation
+# artifacts of older versions are then recomputed)
+DESTILLATION_VERSION = "2"
+
+# Default note bodies (override with .cerebrum/templates/<name>.md).
+# {list_of_permanent_notes} is filled in once the permanent notes exist.
+LITERATURE_TEMPLATE = """# 📚 {title}
+
+> [!info] Bibliographic Information
+> **Authors:** {authors}
+> **Type:** {source_type}
+> **File:** {file_name}
+> **Status:** 🌱 Seedling (captured, not yet processed)
+
+---
+
+## 📋 Layer 0: Raw Capture
+
+> [!question] Initial Questions
+> - What is the main thesis or argument?
+> - What evidence or examples support it?
+> - How does this connect to my existing knowledge?
+
+{preview}
+
+---
+
+## 💎 Permanent Notes Extracted
+
+> [!tip] These atomic concepts were distilled from this source
+
+{list_of_permanent_notes}
+
+---
+
+## 🔄 Layer 1: Bold Key Passages
+
+> [!note] Progressive Summarization - Layer 1
+> When you first **USE** information from this source:
+> - Bold the 10-20% most important passages
+> - Focus on surprising insights or actionable advice
+
+**Instructions:**
+- Read through the source text (see Source Text below)
+- Bold (`**text**`) the most valuable 10-20%
+- This becomes your "second read" layer
+
+**Target Date:** {layer1_date}
+
+---
+
+## ✨ Layer 2: Highlight Critical Insights
+
+> [!note] Progressive Summarization - Layer 2
+> When this becomes **CRITICAL** to a project:
+> - Highlight 10-20% of bolded text
+> - Use `==highlighted==` for absolute essentials
+
+**Target Date:** {layer2_date}
+
+---
+
+## 📝 Layer 3: Executive Summary
+
+> [!note] Progressive Summarization - Layer 3
+> When you need to **EXPLAIN** this to others:
+> - Write a 3-5 sentence summary
+> - Include key takeaways only
+
+**Target Date:** {layer3_date}
+
+---
+
+## 🔗 Connections
+
+> [!tip] How this relates to other knowledge
+
+### Related Sources
+- Add: `[[similar-source]]`
+
+### Relevant MOCs
+- {moc}
+
+---
+
+## 📝 Source Text
+
+> [!info] Full text stored once, compressed
+> **Blob:** `{blob_path}`
+> **Size:** {word_count} words
+
+---
+
+## ❓ Processing Questions
+
+> [!question] To deepen understanding
+> - [ ] What assumptions does the author make?
+> - [ ] What are potential weaknesses in the argument?
+> - [ ] How could I apply this practically?
+> - [ ] What questions does this raise?
+
+---
+
+## 🔄 Review Schedule
+
+> [!info] Spaced Repetition
+> Review at increasing intervals to move from 🌱 Seedling → 🌳 Evergreen
+
+**Review History:**
+- [ ] {layer1_date}: Check permanent notes, add bold (Layer 1)
+- [ ] {layer2_date}: Highlight critical passages if needed (Layer 2)
+- [ ] {layer3_date}: Create executive summary if needed (Layer 3)
+
+**Next Review:** {next_review}
+
+---
+
+**Meta:** This note follows BASB + LYT + Zettelkasten principles
+"""
+
+PERMANENT_TEMPLATE = """# {title}
+
+> [!abstract] Atomic Definition
+> **{definition}**
+>
+> *This is a permanent note - a single, reusable concept*
+> **Type:** {concept_type} | **Status:** 🌱 Seedling | **Confidence:** 75%
+
+---
+
+## 🎯 What Is This?
+
+> [!question] Core Understanding
+> - What is this, fundamentally?
+> - What makes it distinct?
+> - When does it apply?
+
+{explanation}
+
+---
+
+## 💡 Why Does This Matter?
+
+> [!question] Significance
+> - Why should I care about this?
+> - What problems does it solve?
+> - What becomes possible?
+
+{why_matters}
+
+---
+
+## 🔬 How to Apply This
+
+> [!example] Practical Use Cases
+
+{applications}
+
+> [!question] My Applications
+> - [ ] Where can I use this in current projects?
+> - [ ] What experiments could test this?
+> - [ ] Real-world example I've observed?
+
+---
+
+## 🌐 Connections
+
+> [!tip] How this connects to the knowledge graph
+> Links will be enhanced by semantic analysis
+
+{connections}
+
+> [!question] Additional Connections to Explore
+> - What must someone understand first? (Prerequisites)
+> - What does this enable? (Implications)
+> - What contradicts this? (Contrasts)
+
+**Manual additions:**
+- `[[]]` ← Prerequisite
+- `[[]]` → Enables
+- `[[]]` ⚔️ Contrasts
+
+---
+
+## 🧪 Evidence & Examples
+
+> [!note] What supports this concept?
+
+**From source:**
+{evidence}
+
+**To add:**
+- [ ] Real-world observations
+- [ ] Counterexamples or limitations
+- [ ] Personal experiments
+
+---
+
+## 📚 Source Trail
+
+> [!info] Intellectual lineage
+
+**Primary Source:** [[{source}]]
+
+**Add related sources:**
+- `[[]]` ← Corroborates
+- `[[]]` ⚔️ Alternative view
+
+---
+
+## ❓ Open Questions
+
+> [!question] To explore further
+
+- [ ] How does this connect to related concepts?
+- [ ] What are the edge cases or limitations?
+- [ ] Can I test this practically?
+- [ ] How has my understanding evolved?
+
+**Personal questions:**
+-
+-
+
+---
+
+## 🔄 Evolution
+
+> [!info] Status Progression
+> Track journey from 🌱 Seedling → 🌳 Evergreen
+
+**Current Status:** 🌱 Seedling (new, needs review)
+
+**Path to Evergreen:**
+- [ ] ≥5 quality connections
+- [ ] Used in at least 1 project/output
+- [ ] Reviewed 3+ times
+- [ ] Evidence and examples added
+
+**Review History:**
+- {created_date}: Created from literature note
+- Next: {next_review}
+
+---
+
+## 💭 Personal Notes
+
+> [!tip] Your unique perspective
+
+**My take on this:**
+
+
+**How I've used this:**
+
+
+**Surprising connections I found:**
+
+
+---
+
+**Confidence:** 75% (initial) | **Completeness:** 60% (needs depth)
+**Next Review:** {next_review}
+"""
+
+
+def _titles_similar(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= TITLE_MERGE_SIMILARITY
 
 
 class DestiladorAgent:
     """Atomizes content into perfect permanent notes."""
 
-    def __init__(self, llm_service: LLMService, vault_path: Path):
+    def __init__(
+        self,
+        llm_service: LLMService,
+        vault_path: Path,
+        mode: str = 'auto',
+        chunk_tokens: int = DISTILL_INPUT_TOKENS,
+        max_parallel_chunks: int = 4,
+        deduplicator=None,
+        blob_store: Optional[BlobStore] = None,
+        templates: Optional[TemplateEngine] = None
+    ):
+        """
+        Args:
+            llm_service: LLM for concept extraction
+            vault_path: Vault root
+            mode: 'single' (one prompt, document cut to fit), 'chunked'
+                (map-reduce over the whole document) or 'auto' (chunked
+                when the document does not fit one prompt)
+            chunk_tokens: Max document tokens per chunk
+            max_parallel_chunks: Chunks distilled at once
+            deduplicator: DeduplicadorAgent run on the concepts before
+                notes are created (None = every concept becomes a note)
+            blob_store: Where source texts are kept (default: the
+                vault's .cerebrum/blobs); literature notes link to them
+            templates: Note body templates (default: the vault's
+                .cerebrum/templates, else the built-in templates)
+        """
+        if mode not in DISTILL_MODES:
+            raise ValueError(f"Unknown distillation mode: {mode} (use one of {DISTILL_MODES})")
+
         self.llm = llm_service
         self.vault_path = vault_path
+        self.mode = mode
+        self.chunk_tokens = chunk_tokens
+        self.max_parallel_chunks = max(1, max_parallel_chunks)
+        self.deduplicator = deduplicator
+        self.blob_store = blob_store or BlobStore.for_vault(vault_path)
+        self.templates = templates or TemplateEngine.for_vault(vault_path)
 
     def destilate(
         self,
         raw_text: str,
         metadata: Dict[str, Any],
-        classification: Dict[str, Any]
+        classification: Dict[str, Any],
+        concepts: Optional[List[Concept]] = None
     ) -> Dict[str, Any]:
         """
         Destilate source into atomic notes.
@@ -39,12 +377,25 @@ class DestiladorAgent:
             raw_text: Extracted text from source
             metadata: Extraction metadata
             classification: Classification result (domain, BASB path, MOCs, etc.)
+            concepts: Concepts of an earlier run; notes are built from
+                them without calling the LLM
 
         Returns:
             Dict with:
                 - literature_note: Literature note
-                - permanent_notes: List[Note] (5-15 atomic concepts)
-                - stats: Processing statistics
+                - permanent_notes: List[Note] (5-15 atomic concepts,
+                  minus duplicates)
+                - concepts: List[Concept] extracted (before deduplication)
+                - new_concepts: Concepts of permanent_notes (same order)
+                - concept_vectors: Their embeddings from deduplication
+                  (empty without a deduplicator)
+                - duplicates: Concepts merged into existing vault notes
+                  (see DeduplicadorAgent.deduplicate)
+                - stats: Processing statistics (concepts_source: 'llm',
+                  'retry', 'chunked', 'fallback' or 'provided';
+                  duplicates_merged: concepts merged into vault notes;
+                  merged_in_document: concepts merged into another
+                  concept of this document)
         """
 
         # Step 1: Create literature note (source note)
@@ -52,34 +403,85 @@ class DestiladorAgent:
             raw_text, metadata, classification
         )
 
-        # Step 2: Extract atomic concepts via LLM
-        concepts = self._extract_atomic_concepts(
-            raw_text, metadata, classification
-        )
+        # Notes are created as concepts arrive, unless they first go
+        # through deduplication
+        eager = self.deduplicator is None
+        permanent_notes: List[Note] = []
+
+        if concepts is not None:
+            # Step 2 (concepts given): no LLM call
+            source = 'provided'
+
+        elif self._use_chunks(raw_text, metadata, classification):
+            # Step 2 (long document): map-reduce over chunks
+            concepts = self._extract_chunked_concepts(raw_text, metadata, classification)
+            source = 'chunked'
+            if not concepts:
+                concepts = self._fallback_concept_extraction(raw_text, metadata)
+                source = 'fallback'
 
-        # Step 3: Create permanent note for each concept
-        permanent_notes = []
-        for concept in concepts:
-            perm_note = self._create_permanent_note(
-                concept, literature_note, classification
+        else:
+            # Step 2: Stream atomic concepts from the LLM and create a
+            # permanent note for each one as soon as it is parsed
+            parser = JSONArrayStreamParser()
+            concepts = []
+            for concept in self._iter_atomic_concepts(
+                raw_text, metadata, classification, parser
+            ):
+                concepts.append(concept)
+                if eager:
+                    permanent_notes.append(self._create_permanent_note(
+                        concept, literature_note, classification
+                    ))
+
+            completed, source = self._complete_concepts(
+                concepts, parser, raw_text, metadata, classification
             )
-            permanent_notes.append(perm_note)
+            if completed is not concepts:
+                concepts = completed
+                permanent_notes = []
+
+        # Step 2.5: Drop concepts the vault (or this document) already has
+        new_concepts, duplicates, vectors = concepts, [], []
+        if self.deduplicator is not None:
+            new_concepts, duplicates, vectors = self.deduplicator.deduplicate(concepts)
+
+        # Step 3: Create permanent notes not created while streaming
+        if len(permanent_notes) != len(new_concepts):
+            permanent_notes = [
+                self._create_permanent_note(concept, literature_note, classification)
+                for concept in new_concepts
+            ]
 
         # Step 3.5: Update literature note with links to permanent notes
-        self._update_literature_note_with_links(literature_note, permanent_notes)
+        # (and to the existing notes duplicates were merged into)
+        self._update_literature_note_with_links(
+            literature_note, permanent_notes,
+            [d['target_title'] for d in duplicates]
+        )
 
         # Step 4: Validate results
         validation = self._validate_destillation(
-            literature_note, permanent_notes
+            literature_note, permanent_notes, merged=len(duplicates)
         )
 
         return {
             'literature_note': literature_note,
             'permanent_notes': permanent_notes,
+            'concepts': concepts,
+            'new_concepts': new_concepts,
+            'concept_vectors': vectors,
+            'duplicates': duplicates,
             'stats': {
                 'concepts_extracted': len(concepts),
+                'concepts_source': source,
                 'permanent_notes_created': len(permanent_notes),
-                'avg_note_size': sum(len(n.content) for n in permanent_notes) / len(permanent_notes),
+                'duplicates_merged': len(duplicates),
+                'merged_in_document': len(concepts) - len(new_concepts) - len(duplicates),
+                'avg_note_size': (
+                    sum(len(n.content) for n in permanent_notes) / len(permanent_notes)
+                    if permanent_notes else 0
+                ),
                 'validation_passed': validation['passed']
             },
             'validation': validation
@@ -96,6 +498,9 @@ class DestiladorAgent:
         # Generate unique ID (timestamp + UUID to prevent collisions)
         note_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
 
+        # Full text goes to the blob store once; the note links to it
+        blob = self.blob_store.put(raw_text)
+
         # Extract bibliographic info
         source_type = metadata.get('source_type', 'unknown')
         title = metadata.get('title', 'Untitled')
@@ -114,157 +519,69 @@ class DestiladorAgent:
             basb_para_path=classification.get('basb_para_path'),
             basb_progressive_summary_layer=0,
             lyt_mocs=classification.get('lyt_mocs', []),
-            source_type=source_type,
-            source_title=title,
-            source_authors=authors,
-            created=datetime.now().isoformat(),
-            next_review=(datetime.now() + timedelta(days=30)).isoformat()
-        )
-
-        # Create body using template
-        body = self._render_literature_template(
-            raw_text, metadata, classification
-        )
-
-        return Note(metadata=lit_metadata, content=body)
-
-    def _render_literature_template(
-        self,
-        raw_text: str,
-        metadata: Dict[str, Any],
-        classification: Dict[str, Any]
-    ) -> str:
-        """Render literature note body with epistemic structure."""
-
-        title = metadata.get('title', 'Untitled')
-        authors = metadata.get('authors', [])
-        authors_str = ', '.join(authors) if authors else 'Unknown'
-
-        # Extract first 800 chars as preview
-        preview = raw_text[:800] + "..." if len(raw_text) > 800 else raw_text
-
-        # Calculate review date (7 days from now)
-        next_review = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
-        layer1_date = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
-        layer2_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
-        layer3_date = (datetime.now() + timedelta(days=90)).strftime('%Y-%m-%d')
-
-        return f"""# 📚 {title}
-
-> [!info] Bibliographic Information
-> **Authors:** {authors_str}
-> **Type:** {metadata.get('source_type', 'unknown')}
-> **File:** {metadata.get('file_name', 'unknown')}
-> **Status:** 🌱 Seedling (captured, not yet processed)
-
----
-
-## 📋 Layer 0: Raw Capture
-
-> [!question] Initial Questions
-> - What is the main thesis or argument?
-> - What evidence or examples support it?
-> - How does this connect to my existing knowledge?
-
-{preview}
-
----
-
-## 💎 Permanent Notes Extracted
-
-> [!tip] These atomic concepts were distilled from this source
-
-{{{{list_of_permanent_notes}}}}
-
----
-
-## 🔄 Layer 1: Bold Key Passages
-
-> [!note] Progressive Summarization - Layer 1
-> When you first **USE** information from this source:
-> - Bold the 10-20% most important passages
-> - Focus on surprising insights or actionable advice
-
-**Instructions:**
-- Read through Raw Content below
-- Bold (`**text**`) the most valuable 10-20%
-- This becomes your "second read" layer
-
-**Target Date:** {layer1_date}
-
----
-
-## ✨ Layer 2: Highlight Critical Insights
-
-> [!note] Progressive Summarization - Layer 2
-> When this becomes **CRITICAL** to a project:
-> - Highlight 10-20% of bolded text
-> - Use `==highlighted==` for absolute essentials
-
-**Target Date:** {layer2_date}
-
----
-
-## 📝 Layer 3: Executive Summary
-
-> [!note] Progressive Summarization - Layer 3
-> When you need to **EXPLAIN** this to others:
-> - Write a 3-5 sentence summary
-> - Include key takeaways only
-
-**Target Date:** {layer3_date}
-
----
-
-## 🔗 Connections
-
-> [!tip] How this relates to other knowledge
-
-### Related Sources
-- Add: `[[similar-source]]`
-
-### Relevant MOCs
-- {classification.get('lyt_mocs', [''])[0] if classification.get('lyt_mocs') else 'Add MOC link'}
-
----
-
-## 📝 Raw Content
-
-{raw_text}
-
----
-
-## ❓ Processing Questions
+            source_type=source_type,
+            source_title=title,
+            source_authors=authors,
+            source_blob=blob,
+            created=datetime.now().isoformat(),
+            next_review=(datetime.now() + timedelta(days=30)).isoformat()
+        )
 
-> [!question] To deepen understanding
-> - [ ] What assumptions does the author make?
-> - [ ] What are potential weaknesses in the argument?
-> - [ ] How could I apply this practically?
-> - [ ] What questions does this raise?
+        # Create body using template
+        body = self._render_literature_template(
+            raw_text, metadata, classification, blob
+        )
 
----
+        return Note(metadata=lit_metadata, content=body)
 
-## 🔄 Review Schedule
+    def _render_literature_template(
+        self,
+        raw_text: str,
+        metadata: Dict[str, Any],
+        classification: Dict[str, Any],
+        blob: str
+    ) -> str:
+        """Render literature note body with epistemic structure.
 
-> [!info] Spaced Repetition
-> Review at increasing intervals to move from 🌱 Seedling → 🌳 Evergreen
+        Only an excerpt of raw_text is included; the full text is
+        linked from the blob store.
+        """
 
-**Review History:**
-- [ ] {layer1_date}: Check permanent notes, add bold (Layer 1)
-- [ ] {layer2_date}: Highlight critical passages if needed (Layer 2)
-- [ ] {layer3_date}: Create executive summary if needed (Layer 3)
+        title = metadata.get('title', 'Untitled')
+        authors = metadata.get('authors', [])
+        authors_str = ', '.join(authors) if authors else 'Unknown'
+        lyt_mocs = classification.get('lyt_mocs')
 
-**Next Review:** {next_review}
+        # Extract first 800 chars as preview
+        preview = raw_text[:800] + "..." if len(raw_text) > 800 else raw_text
+        word_count = sum(1 for _ in re.finditer(r'\S+', raw_text))
 
----
+        # Calculate review date (7 days from now)
+        next_review = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
+        layer1_date = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
+        layer2_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        layer3_date = (datetime.now() + timedelta(days=90)).strftime('%Y-%m-%d')
 
-**Meta:** This note follows BASB + LYT + Zettelkasten principles
-"""
+        return self.templates.render_named('literature', {
+            'title': title,
+            'authors': authors_str,
+            'source_type': metadata.get('source_type', 'unknown'),
+            'file_name': metadata.get('file_name', 'unknown'),
+            'preview': preview,
+            'layer1_date': layer1_date,
+            'layer2_date': layer2_date,
+            'layer3_date': layer3_date,
+            'next_review': next_review,
+            'moc': lyt_mocs[0] if lyt_mocs else 'Add MOC link',
+            'blob_path': self.blob_store.relative_path(blob),
+            'word_count': f"{word_count:,}",
+        }, default=LITERATURE_TEMPLATE)
 
     def _update_literature_note_with_links(
         self,
         literature_note: Note,
-        permanent_notes: List[Note]
+        permanent_notes: List[Note],
+        existing_titles: Optional[List[str]] = None
     ) -> None:
         """Update literature note by replacing placeholder with actual links to permanent notes."""
 
@@ -272,37 +589,186 @@ class DestiladorAgent:
         links_list = []
         for note in permanent_notes:
             links_list.append(f"- [[{note.metadata.title}]]")
+        for title in dict.fromkeys(existing_titles or []):
+            links_list.append(f"- [[{title}]]")
 
         links_text = "\n".join(links_list)
 
         # Replace placeholder
         literature_note.content = literature_note.content.replace(
-            "{{{{list_of_permanent_notes}}}}",
+            "{list_of_permanent_notes}",
             links_text
         )
 
+    def redirect_links(
+        self,
+        literature_note: Note,
+        moved: Dict[str, str]
+    ) -> None:
+        """Point literature note links at other notes ({old title: new title};
+        a link whose new target is already listed is dropped)."""
+
+        links = {
+            f"- [[{old}]]": f"- [[{new}]]"
+            for old, new in moved.items() if old != new
+        }
+        lines = literature_note.content.split("\n")
+        listed = set(lines)
+
+        redirected = []
+        for line in lines:
+            target = links.get(line)
+            if target is None:
+                redirected.append(line)
+            elif target not in listed:
+                redirected.append(target)
+                listed.add(target)
+
+        literature_note.content = "\n".join(redirected)
+
     def _extract_atomic_concepts(
         self,
         raw_text: str,
         metadata: Dict[str, Any],
         classification: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Concept]:
         """Extract 5-15 atomic concepts using LLM."""
 
-        prompt = f"""You are an expert knowledge curator following Zettelkasten principles.
+        parser = JSONArrayStreamParser()
+        concepts = list(self._iter_atomic_concepts(
+            raw_text, metadata, classification, parser
+        ))
+
+        return self._complete_concepts(
+            concepts, parser, raw_text, metadata, classification
+        )[0]
+
+    def _complete_concepts(
+        self,
+        concepts: List[Concept],
+        parser: JSONArrayStreamParser,
+        raw_text: str,
+        metadata: Dict[str, Any],
+        classification: Dict[str, Any]
+    ) -> Tuple[List[Concept], str]:
+        """Return (concepts, source): concepts as-is if enough were
+        extracted, else a replacement list ('retry' or 'fallback')."""
+
+        if len(concepts) >= MIN_CONCEPTS:
+            return concepts, 'llm'
+
+        if parser.malformed and not concepts:
+            # Fallback (output unrepairable): create minimal concepts
+            return self._fallback_concept_extraction(raw_text, metadata), 'fallback'
+
+        # Too few, ask for more
+        retried = self._extract_atomic_concepts_retry(raw_text, metadata, classification)
+        if not retried:
+            return self._fallback_concept_extraction(raw_text, metadata), 'fallback'
+        return retried, 'retry'
+
+    def _iter_atomic_concepts(
+        self,
+        raw_text: str,
+        metadata: Dict[str, Any],
+        classification: Dict[str, Any],
+        parser: JSONArrayStreamParser
+    ) -> Iterator[Concept]:
+        """
+        Stream atomic concepts from the LLM as each JSON object closes.
+
+        Output is schema-constrained. If it is malformed anyway, the rest
+        of the response is read and repaired locally (no second LLM
+        call); parser.malformed stays set. Generation is cut off once
+        MAX_CONCEPTS are yielded.
+        """
+
+        prompt = self._concepts_instructions(metadata, classification)
+        prefix = self._document_prefix(raw_text, metadata, prompt)
+
+        stream = self.llm.generate_stream(
+            prompt,
+            max_tokens=DISTILL_MAX_TOKENS,
+            prefix=prefix,
+            schema=CONCEPTS_SCHEMA
+        )
+        chunks = []
+        count = 0
+        emitted = 0  # Array items parsed, valid or not
+        yielded = set()
+
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                if parser.malformed:
+                    continue  # Keep reading for the repair pass
+
+                for item in parser.feed(chunk):
+                    emitted += 1
+                    try:
+                        concept = Concept.from_dict(item)
+                    except SchemaError:
+                        continue
+
+                    yield concept
+                    count += 1
+                    yielded.add(title_words(concept.title))
+
+                    if count >= MAX_CONCEPTS:
+                        return  # Closing the stream stops generation
+
+                if parser.done:
+                    return
+        finally:
+            stream.close()
+
+        if parser.malformed:
+            # Local repair; items before the bad spot were already parsed
+            repaired = loads_lenient(''.join(chunks))
+            if isinstance(repaired, list):
+                repaired = repaired[emitted:]
+
+            for concept in parse_list(repaired, Concept):
+                if count >= MAX_CONCEPTS:
+                    return
+                words = title_words(concept.title)
+                if words and words in yielded:
+                    continue  # Already streamed (repair kept a wrapper)
+                yield concept
+                count += 1
+
+    def _document_prefix(
+        self,
+        raw_text: str,
+        metadata: Dict[str, Any],
+        instructions: str
+    ) -> str:
+        """Shared document prefix (same for first pass and retry)."""
+
+        return fit_document_prefix(
+            self.llm, raw_text, metadata, instructions,
+            max_output_tokens=DISTILL_MAX_TOKENS,
+            max_input_tokens=DISTILL_INPUT_TOKENS
+        )
+
+    def _concepts_instructions(
+        self,
+        metadata: Dict[str, Any],
+        classification: Dict[str, Any],
+        task: str = "Extract 5-15 ATOMIC concepts from the source document above."
+    ) -> str:
+        """Concept extraction instructions (follow the document prefix)."""
+
+        return f"""You are an expert knowledge curator following Zettelkasten principles.
 
-Extract 5-15 ATOMIC concepts from this text. Each concept must be:
+{task} Each concept must be:
 1. **Atomic**: One clear idea that stands alone
 2. **Autonomous**: Makes sense without the source
 3. **Valuable**: Worth remembering long-term
 4. **Specific**: Concrete, not vague
 
-Source title: {metadata.get('title', 'Unknown')}
 Domain: {classification.get('domain', 'general')}
 
-Text:
-{raw_text[:4000]}
-
 For each concept, provide:
 1. **title**: Clear, descriptive title (3-8 words)
 2. **definition**: One-sentence atomic definition
@@ -328,66 +794,243 @@ Return as JSON array:
 Return ONLY valid JSON, no other text.
 """
 
-        response = self.llm.generate(prompt, max_tokens=3000)
+    def _use_chunks(
+        self,
+        raw_text: str,
+        metadata: Dict[str, Any],
+        classification: Dict[str, Any]
+    ) -> bool:
+        """Whether to distill map-reduce (auto: document exceeds one chunk)."""
+
+        if self.mode != 'auto':
+            return self.mode == 'chunked'
 
-        # Parse JSON response
-        try:
-            # Extract JSON from response (in case LLM adds extra text)
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
-            if json_match:
-                concepts = json.loads(json_match.group())
-            else:
-                concepts = json.loads(response)
+        return self.llm.count_tokens(raw_text) > self._chunk_budget(metadata, classification)
+
+    def _chunk_budget(self, metadata: Dict[str, Any], classification: Dict[str, Any]) -> int:
+        """Document tokens per chunk (chunk_tokens, capped by the context window)."""
+
+        template = document_prefix(metadata, "") + self._concepts_instructions(
+            metadata, classification, task=self._chunk_task(0, 0, "")
+        )
+        return max(1, min(self.chunk_tokens, self.llm.input_budget(CHUNK_MAX_TOKENS, template)))
+
+    @staticmethod
+    def _chunk_task(part: int, total: int, label: str) -> str:
+        section = f" (section: {label[:80]})" if label else ""
+        return (
+            f"The text above is part {part} of {total} of a longer source{section}. "
+            f"Extract up to {CHUNK_CONCEPTS} ATOMIC concepts developed in this part."
+        )
+
+    def _split_chunks(self, raw_text: str, budget: int) -> List[Tuple[str, str]]:
+        """
+        Split text into (label, text) chunks of at most budget tokens.
+
+        Consecutive sections are packed into one chunk while they fit;
+        a section larger than a chunk (or a text without sections) is
+        cut into token windows, at paragraph breaks where possible.
+        """
+
+        scanner = StructureScanner()
+        scanner.feed(raw_text)
+        scanner.finish()
+
+        spans = [(s['title'], s['start'], s['end']) for s in scanner.sections]
+        if not spans or spans[0][1] > 0:
+            spans.insert(0, ("", 0, spans[0][1] if spans else len(raw_text)))
+
+        chunks: List[Tuple[str, str]] = []
+        packed: List[Tuple[str, str]] = []
+        packed_tokens = 0
+
+        def flush() -> None:
+            nonlocal packed_tokens
+            if packed:
+                label = next((title for title, _ in packed if title), "")
+                chunks.append((label, "\n\n".join(text for _, text in packed)))
+                packed.clear()
+                packed_tokens = 0
+
+        for title, start, end in spans:
+            text = raw_text[start:end].strip()
+            if not text:
+                continue
+
+            tokens = self.llm.count_tokens(text)
+            if tokens > budget:
+                flush()
+                chunks.extend((title, window) for window in self._token_windows(text, budget))
+                continue
+
+            if packed and packed_tokens + tokens > budget:
+                flush()
+            packed.append((title, text))
+            packed_tokens += tokens
+
+        flush()
+        return chunks
+
+    def _token_windows(self, text: str, budget: int) -> Iterator[str]:
+        while text:
+            window = self.llm.fit_tokens(text, budget)
+            if len(window) < len(text):
+                cut = window.rfind('\n\n')
+                if cut > len(window) // 2:
+                    window = window[:cut]
+            if not window:
+                window = text[:budget]  # Single piece over budget
+
+            yield window.strip()
+            text = text[len(window):].lstrip()
+
+    def _extract_chunked_concepts(
+        self,
+        raw_text: str,
+        metadata: Dict[str, Any],
+        classification: Dict[str, Any]
+    ) -> List[Concept]:
+        """
+        Map-reduce concept extraction over the whole document.
+
+        Chunks are distilled up to max_parallel_chunks at a time, so wall
+        time grows with chunks / max_parallel_chunks. Failed chunks are
+        skipped; if every chunk fails the first error is raised.
+        """
+
+        # Step 1: Split
+        chunks = self._split_chunks(raw_text, self._chunk_budget(metadata, classification))
+        total = len(chunks)
+
+        # Step 2: Map (threads inherit the caller's context, e.g. the
+        # document scope that keeps calls on one Ollama host)
+        results: List[List[Concept]] = []
+        errors: List[Exception] = []
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_parallel_chunks, total) or 1,
+            thread_name_prefix="distill-chunk"
+        ) as pool:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run, self._distill_chunk,
+                    text, metadata, classification,
+                    self._chunk_task(index + 1, total, label)
+                )
+                for index, (label, text) in enumerate(chunks)
+            ]
+
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+                    results.append([])
+
+        if errors and not any(results):
+            raise errors[0]
+
+        # Step 3: Reduce
+        return self._reduce_concepts(results)
+
+    def _distill_chunk(
+        self,
+        text: str,
+        metadata: Dict[str, Any],
+        classification: Dict[str, Any],
+        task: str
+    ) -> List[Concept]:
+        """Concepts of one chunk."""
+
+        response = self.llm.generate(
+            self._concepts_instructions(metadata, classification, task=task),
+            max_tokens=CHUNK_MAX_TOKENS,
+            prefix=document_prefix(metadata, text),
+            schema=CONCEPTS_SCHEMA
+        )
+
+        return parse_list(loads_lenient(response), Concept)[:CHUNK_CONCEPTS]
+
+    def _reduce_concepts(self, chunk_concepts: List[List[Concept]]) -> List[Concept]:
+        """
+        Merge the concepts of all chunks into the MAX_CONCEPTS best.
 
-            # Validate we got 5-15 concepts
-            if len(concepts) < 5:
-                # Too few, ask for more
-                return self._extract_atomic_concepts_retry(raw_text, metadata, classification)
-            elif len(concepts) > 15:
-                # Too many, take top 15
-                concepts = concepts[:15]
+        Concepts with similar titles are merged. Ranking: found in more
+        chunks, then named more often as a connection by other concepts,
+        then rank within its chunk (so the top concept of every chunk
+        comes before any chunk's second), then document order.
+        """
+
+        groups: List[Dict[str, Any]] = []
+        by_words: Dict[frozenset, Dict[str, Any]] = {}
+
+        for chunk_index, concepts in enumerate(chunk_concepts):
+            for position, concept in enumerate(concepts):
+                words = title_words(concept.title)
+                group = by_words.get(words) or next(
+                    (g for g in groups if _titles_similar(words, g['words'])), None
+                )
+
+                if group is None:
+                    group = {
+                        'concept': concept,
+                        'words': words,
+                        'chunks': {chunk_index},
+                        'rank': (position, chunk_index)
+                    }
+                    groups.append(group)
+                else:
+                    group['concept'] = group['concept'].merge(concept)
+                    group['chunks'].add(chunk_index)
+                by_words.setdefault(words, group)
+
+        mentions = Counter(
+            title_words(name)
+            for group in groups
+            for name in group['concept'].connections
+        )
 
-            return concepts
+        groups.sort(key=lambda g: (
+            -len(g['chunks']), -mentions[g['words']], g['rank']
+        ))
 
-        except json.JSONDecodeError as e:
-            # Fallback: create minimal concepts
-            return self._fallback_concept_extraction(raw_text, metadata)
+        return [group['concept'] for group in groups[:MAX_CONCEPTS]]
 
     def _extract_atomic_concepts_retry(
         self,
         raw_text: str,
         metadata: Dict[str, Any],
         classification: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Concept]:
         """Retry concept extraction with more explicit prompt."""
 
-        prompt = f"""Extract MORE concepts. Aim for 8-12 atomic concepts.
+        prompt = """Extract MORE concepts from the source document above. Aim for 8-12 atomic concepts.
 
 Break down the text into granular, specific concepts. Don't be too general.
 
-Text:
-{raw_text[:4000]}
-
-Return JSON array of concepts (same format as before).
+Return a JSON array of concepts with: title, definition, explanation,
+why_matters, applications, connections, concept_type.
 """
+        # Same prefix as the first pass: the document is not re-encoded
+        prefix = self._document_prefix(raw_text, metadata, prompt)
+
+        response = self.llm.generate(
+            prompt,
+            max_tokens=DISTILL_MAX_TOKENS,
+            prefix=prefix,
+            schema=CONCEPTS_SCHEMA
+        )
 
-        response = self.llm.generate(prompt, max_tokens=3000)
+        concepts = parse_list(loads_lenient(response), Concept)
 
-        try:
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
-            if json_match:
-                concepts = json.loads(json_match.group())
-            else:
-                concepts = json.loads(response)
-            return concepts[:15]  # Cap at 15
-        except:
-            return self._fallback_concept_extraction(raw_text, metadata)
+        # Empty: caller falls back
+        return concepts[:MAX_CONCEPTS]
 
     def _fallback_concept_extraction(
         self,
         raw_text: str,
         metadata: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Concept]:
         """Fallback: create basic concepts from headings/structure."""
 
         concepts = []
@@ -399,33 +1042,33 @@ Return JSON array of concepts (same format as before).
             if heading_match:
                 title = heading_match.group(1).strip()
                 if len(title) > 5 and len(title) < 100:
-                    concepts.append({
-                        'title': title,
-                        'definition': f'Concept related to {title}',
-                        'explanation': f'Details about {title} from source.',
-                        'why_matters': 'Part of core content',
-                        'applications': ['To be expanded'],
-                        'connections': [],
-                        'concept_type': 'concept'
-                    })
+                    concepts.append(Concept(
+                        title=title,
+                        definition=f'Concept related to {title}',
+                        explanation=f'Details about {title} from source.',
+                        why_matters='Part of core content',
+                        applications=['To be expanded'],
+                        connections=[],
+                        concept_type='concept'
+                    ))
 
         # If still too few, create generic ones
         if len(concepts) < 5:
-            concepts.append({
-                'title': metadata.get('title', 'Main Topic'),
-                'definition': 'Core topic of the source',
-                'explanation': raw_text[:500],
-                'why_matters': 'Central theme',
-                'applications': ['To be explored'],
-                'connections': [],
-                'concept_type': 'concept'
-            })
+            concepts.append(Concept(
+                title=metadata.get('title', 'Main Topic'),
+                definition='Core topic of the source',
+                explanation=raw_text[:500],
+                why_matters='Central theme',
+                applications=['To be explored'],
+                connections=[],
+                concept_type='concept'
+            ))
 
         return concepts[:15]
 
     def _create_permanent_note(
         self,
-        concept: Dict[str, Any],
+        concept: Concept,
         literature_note: Note,
         classification: Dict[str, Any]
     ) -> Note:
@@ -437,8 +1080,8 @@ Return JSON array of concepts (same format as before).
         # Create metadata
         perm_metadata = NoteMetadata(
             id=note_id,
-            title=concept['title'],
-            aliases=[],
+            title=concept.title,
+            aliases=list(concept.aliases),
             type='permanent',
             status='seedling',
             domain=classification.get('domain'),
@@ -450,7 +1093,8 @@ Return JSON array of concepts (same format as before).
             basb_intermediate_packet=False,
             lyt_mocs=classification.get('lyt_mocs', []),
             lyt_fluid_frameworks=[],
-            zk_permanent_note_type=concept.get('concept_type', 'concept'),
+            zk_permanent_note_type=concept.concept_type,
+            zk_definition=concept.definition or None,
             zk_connections_count=0,
             zk_connections_quality=0.0,
             source_type=literature_note.metadata.source_type,
@@ -470,173 +1114,48 @@ Return JSON array of concepts (same format as before).
 
     def _render_permanent_template(
         self,
-        concept: Dict[str, Any],
+        concept: Concept,
         literature_note: Note
     ) -> str:
         """Render permanent note body with epistemic structure."""
 
-        applications_str = '\n'.join(f'- {app}' for app in concept.get('applications', []))
-        connections_str = '\n'.join(f'- [[{conn}]]' for conn in concept.get('connections', []))
+        applications_str = '\n'.join(f'- {app}' for app in concept.applications)
+        connections_str = '\n'.join(f'- [[{conn}]]' for conn in concept.connections)
+        explanation = concept.explanation
 
         next_review = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
 
-        return f"""# {concept['title']}
-
-> [!abstract] Atomic Definition
-> **{concept['definition']}**
->
-> *This is a permanent note - a single, reusable concept*
-> **Type:** {concept.get('concept_type', 'concept')} | **Status:** 🌱 Seedling | **Confidence:** 75%
-
----
-
-## 🎯 What Is This?
-
-> [!question] Core Understanding
-> - What is this, fundamentally?
-> - What makes it distinct?
-> - When does it apply?
-
-{concept.get('explanation', 'To be expanded through review')}
-
----
-
-## 💡 Why Does This Matter?
-
-> [!question] Significance
-> - Why should I care about this?
-> - What problems does it solve?
-> - What becomes possible?
-
-{concept.get('why_matters', 'Significance to be elaborated')}
-
----
-
-## 🔬 How to Apply This
-
-> [!example] Practical Use Cases
-
-{applications_str if applications_str else '- To be identified through use'}
-
-> [!question] My Applications
-> - [ ] Where can I use this in current projects?
-> - [ ] What experiments could test this?
-> - [ ] Real-world example I've observed?
-
----
-
-## 🌐 Connections
-
-> [!tip] How this connects to the knowledge graph
-> Links will be enhanced by semantic analysis
-
-{connections_str if connections_str else '- Will be linked automatically'}
-
-> [!question] Additional Connections to Explore
-> - What must someone understand first? (Prerequisites)
-> - What does this enable? (Implications)
-> - What contradicts this? (Contrasts)
-
-**Manual additions:**
-- `[[]]` ← Prerequisite
-- `[[]]` → Enables
-- `[[]]` ⚔️ Contrasts
-
----
-
-## 🧪 Evidence & Examples
-
-> [!note] What supports this concept?
-
-**From source:**
-{concept.get('explanation', '')[:200] + '...' if len(concept.get('explanation', '')) > 200 else concept.get('explanation', '')}
-
-**To add:**
-- [ ] Real-world observations
-- [ ] Counterexamples or limitations
-- [ ] Personal experiments
-
----
-
-## 📚 Source Trail
-
-> [!info] Intellectual lineage
-
-**Primary Source:** [[{literature_note.metadata.title}]]
-
-**Add related sources:**
-- `[[]]` ← Corroborates
-- `[[]]` ⚔️ Alternative view
-
----
-
-## ❓ Open Questions
-
-> [!question] To explore further
-
-- [ ] How does this connect to related concepts?
-- [ ] What are the edge cases or limitations?
-- [ ] Can I test this practically?
-- [ ] How has my understanding evolved?
-
-**Personal questions:**
--
--
-
----
-
-## 🔄 Evolution
-
-> [!info] Status Progression
-> Track journey from 🌱 Seedling → 🌳 Evergreen
-
-**Current Status:** 🌱 Seedling (new, needs review)
-
-**Path to Evergreen:**
-- [ ] ≥5 quality connections
-- [ ] Used in at least 1 project/output
-- [ ] Reviewed 3+ times
-- [ ] Evidence and examples added
-
-**Review History:**
-- {datetime.now().strftime('%Y-%m-%d')}: Created from literature note
-- Next: {next_review}
-
----
-
-## 💭 Personal Notes
-
-> [!tip] Your unique perspective
-
-**My take on this:**
-
-
-**How I've used this:**
-
-
-**Surprising connections I found:**
-
-
----
-
-**Confidence:** 75% (initial) | **Completeness:** 60% (needs depth)
-**Next Review:** {next_review}
-"""
+        return self.templates.render_named('permanent', {
+            'title': concept.title,
+            'definition': concept.definition,
+            'concept_type': concept.concept_type,
+            'explanation': explanation or 'To be expanded through review',
+            'why_matters': concept.why_matters or 'Significance to be elaborated',
+            'applications': applications_str if applications_str else '- To be identified through use',
+            'connections': connections_str if connections_str else '- Will be linked automatically',
+            'evidence': explanation[:200] + '...' if len(explanation) > 200 else explanation,
+            'source': literature_note.metadata.title,
+            'created_date': datetime.now().strftime('%Y-%m-%d'),
+            'next_review': next_review,
+        }, default=PERMANENT_TEMPLATE)
 
     def _validate_destillation(
         self,
         literature_note: Note,
-        permanent_notes: List[Note]
+        permanent_notes: List[Note],
+        merged: int = 0
     ) -> Dict[str, Any]:
-        """Validate destillation results."""
+        """Validate destillation results (merged: concepts merged into
+        existing notes instead of creating one)."""
 
         checks = {}
 
-        # Check 1: Right number of permanent notes (5-15)
+        # Check 1: Right number of concepts (5-15), new or merged
+        concept_count = len(permanent_notes) + merged
         checks['concept_count'] = {
-            'passed': 5 <= len(permanent_notes) <= 15,
+            'passed': 5 <= concept_count <= 15,
             'message': 'Should create 5-15 permanent notes',
-            'value': len(permanent_notes)
+            'value': concept_count
         }
 
         # Check 2: Each permanent note has content
@@ -704,17 +1223,20 @@ Return JSON array of concepts (same format as before).
         saved_files.append(str(lit_path))
 
         # Save permanent notes
+        permanent_paths = []
         for perm_note in permanent_notes:
             perm_path = self._get_note_path(perm_note, is_literature=False)
             perm_path.parent.mkdir(parents=True, exist_ok=True)
             perm_path.write_text(perm_note.to_markdown(), encoding='utf-8')
-            saved_files.append(str(perm_path))
+            permanent_paths.append(str(perm_path))
+        saved_files.extend(permanent_paths)
 
         return {
             'saved_count': len(saved_files),
             'files': saved_files,
             'literature_note_path': str(lit_path),
-            'permanent_notes_dir': str(perm_path.parent)
+            'permanent_note_paths': permanent_paths,
+            'permanent_notes_dir': str(Path(permanent_paths[-1]).parent) if permanent_paths else None
         }
 
     def _get_note_path(self, note: Note, is_literature: bool) -> Path:
@@ -1,17 +1,65 @@
 """Extractor: Converts PDF/Markdown/Text to structured data.
 
 Handles:
-- PDF extraction with metadata
+- PDF extraction with metadata (streamed page by page, see stream_pdf;
+  large PDFs are split into page ranges across a process pool)
+- Isolation: PDFs can be extracted in a supervised subprocess with a
+  wall-clock and memory limit, after a cheap check that rejects
+  image-only PDFs (no text layer) up front
 - Markdown parsing
 - Text normalization
 - Structure detection (sections, headings)
 """
 
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import gc
+import io
+import multiprocessing
+import os
 import re
+import threading
 from datetime import datetime
 
+from cerebrum.utils.supervisor import run_supervised, SupervisedError
+
+
+# Bump when a change alters extraction output (stored extraction
+# artifacts of older versions are then recomputed)
+EXTRACTION_VERSION = "1"
+
+# Characters of document start used for title/author detection
+HEAD_CHARS = 2000
+
+# Pages read before the PDF reader is reopened (drops its object cache,
+# keeping memory flat on very long PDFs)
+PDF_READER_RECYCLE_PAGES = 500
+
+# Separator between PDF pages in the extracted text
+PAGE_SEPARATOR = "\n\n"
+
+# PDFs with fewer pages are extracted in-process (pool overhead)
+PARALLEL_PDF_MIN_PAGES = 64
+
+# Page range per worker task: small enough to balance uneven pages,
+# large enough that reopening the PDF in the worker is negligible
+PARALLEL_PDF_CHUNK_PAGES = (8, 50)
+
+# Bytes read per step by the text-layer check
+TEXT_LAYER_SCAN_CHUNK = 1024 * 1024
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[Optional[str]]:
+    """Raw text of pages [start, end) (runs in a worker process)."""
+    from pypdf import PdfReader
+
+    with open(file_path, 'rb') as handle:
+        reader = PdfReader(handle)
+        return [reader.pages[i].extract_text() for i in range(start, end)]
+
 
 class ExtractionResult:
     """Result of extraction process."""
@@ -32,15 +80,387 @@ class ExtractionResult:
 
 
 class ExtractionError(Exception):
-    """Extraction failed."""
-    pass
+    """Extraction failed.
+
+    reason: 'error', 'timeout', 'memory', 'crashed' or 'no_text_layer'
+    """
+
+    def __init__(self, message: str, reason: str = 'error'):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _pdf_has_text_layer(file_path: Path) -> Optional[bool]:
+    """
+    Cheap byte scan for fonts, without parsing the PDF.
+
+    Text can only be drawn with a font, so a PDF whose bytes never
+    mention /Font is a scan (or otherwise image-only) and extracts to
+    nothing. Font dictionaries hidden in compressed object streams are
+    invisible to the scan, so those files are reported as unknown.
+
+    Returns:
+        True if fonts are present, False if there is no text layer,
+        None if it cannot be told without parsing
+    """
+
+    overlap = 16
+    tail = b''
+    object_streams = False
+
+    with open(file_path, 'rb') as handle:
+        while True:
+            chunk = handle.read(TEXT_LAYER_SCAN_CHUNK)
+            if not chunk:
+                break
+            data = tail + chunk
+            if b'/Font' in data:
+                return True
+            object_streams = object_streams or b'/ObjStm' in data
+            tail = data[-overlap:]
+
+    return None if object_streams else False
+
+
+def _extract_pdf_isolated(file_path: str) -> 'ExtractionResult':
+    """Whole-PDF extraction (runs in a supervised process).
+
+    Single-process: a page pool started per file would cost more in
+    process startup than it saves, and would multiply with parallel
+    documents.
+    """
+
+    extractor = Extractor(pdf_workers=1)
+    try:
+        return extractor._extract_pdf(Path(file_path))
+    finally:
+        extractor.close()
+
+
+class StructureScanner:
+    """Headings, sections and stats of a text fed in pieces.
+
+    Only the current unfinished line is buffered, so structure and
+    stats of any size of document are computed in bounded memory.
+    Pieces may split lines anywhere; call finish() after the last one.
+    """
+
+    def __init__(self):
+        self.sections: List[Dict[str, Any]] = []
+        self.headings: List[Dict[str, Any]] = []
+        self.word_count = 0
+        self.char_count = 0
+
+        self._line = 0       # Index of the next complete line
+        self._position = 0   # Offset of the next complete line
+        self._partial = ""   # Text of the current unfinished line
+
+    def feed(self, text: str) -> None:
+        """Append text to the document."""
+
+        self.char_count += len(text)
+
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+
+        for line in lines:
+            self._scan_line(line)
+
+    def finish(self) -> None:
+        """Scan the last line and close the final section."""
+
+        if self._partial:
+            self._scan_line(self._partial)
+            self._partial = ""
+
+        if self.sections:
+            self.sections[-1]['end'] = self.char_count
+
+    def _scan_line(self, line: str) -> None:
+        self.word_count += len(line.split())
+
+        # Heading detection
+        heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
+        if heading_match:
+            level = len(heading_match.group(1))
+            title = heading_match.group(2).strip()
+
+            self.headings.append({
+                'level': level,
+                'title': title,
+                'line': self._line,
+                'position': self._position
+            })
+
+            # If top-level heading, consider it a section
+            if level <= 2:
+                if self.sections:
+                    self.sections[-1]['end'] = self._position
+
+                self.sections.append({
+                    'title': title,
+                    'start': self._position,
+                    'end': None,  # Filled by next section or finish()
+                    'line': self._line
+                })
+
+        self._line += 1
+        self._position += len(line) + 1  # +1 for newline
+
+    def structure(self) -> Dict[str, Any]:
+        return {
+            'sections': self.sections,
+            'headings': self.headings,
+            'has_structure': len(self.sections) > 0
+        }
+
+
+class ExtractedPage:
+    """One normalized PDF page."""
+
+    def __init__(self, number: int, text: str, start: int):
+        self.number = number  # 1-based page number
+        self.text = text
+        self.start = start    # Offset of the page in the joined text
+
+
+class PDFStream:
+    """Normalized pages of a PDF, produced as they are parsed.
+
+    Iterate once. metadata has title/authors as soon as the first
+    pages are read; structure and stats are complete after iteration.
+    Pages are not kept: consumers that need the whole text join them
+    (see Extractor._extract_pdf), chunked consumers can start on the
+    first page.
+    """
+
+    def __init__(self, extractor: 'Extractor', file_path: Path, workers: int = 1):
+        """
+        Args:
+            extractor: Owner (normalization, title/author detection,
+                process pool)
+            file_path: PDF path
+            workers: Processes for page extraction; used only for PDFs
+                of at least extractor.parallel_min_pages pages
+        """
+        from pypdf import PdfReader
+
+        self.extractor = extractor
+        self.file_path = file_path
+        self.workers = workers
+
+        with open(file_path, 'rb') as handle:
+            reader = PdfReader(handle)
+            self.page_count = len(reader.pages)
+            self._pdf_meta = dict(reader.metadata or {})
+
+        self.metadata: Dict[str, Any] = {
+            'source_type': 'pdf',
+            'title': self._pdf_meta.get('/Title') or file_path.stem,
+            'authors': [],
+            'pages': self.page_count,
+            'file_name': file_path.name,
+            'file_size': file_path.stat().st_size,
+            'extracted_at': datetime.now().isoformat()
+        }
+
+        self.scanner = StructureScanner()
+        self.pages_read = 0
+        self._head = ""
+        self._head_done = False
+
+    def __iter__(self) -> Iterator[ExtractedPage]:
+        # A file handle (not a path) makes pypdf read objects on demand
+        # instead of loading the whole file into memory
+        with open(self.file_path, 'rb') as handle:
+            for page_text, index in self._page_texts(handle):
+                self.pages_read = index + 1
+
+                text = self.extractor._normalize_text(page_text or "")
+                if not text:
+                    continue
+
+                if self.scanner.char_count:
+                    self.scanner.feed(PAGE_SEPARATOR)
+                page = ExtractedPage(index + 1, text, self.scanner.char_count)
+                self.scanner.feed(text)
+
+                self._update_head(text)
+                yield page
+
+        self.scanner.finish()
+        if not self._head_done:
+            self._set_head_metadata()
+
+    @property
+    def parallel(self) -> bool:
+        return self.workers > 1 and self.page_count >= self.extractor.parallel_min_pages
+
+    def _page_texts(self, handle) -> Iterator[Tuple[Optional[str], int]]:
+        """(raw text, index) per page, in page order."""
+
+        start = 0
+        if self.parallel:
+            try:
+                for text, index in self._page_texts_parallel():
+                    start = index + 1
+                    yield text, index
+                return
+            except (BrokenProcessPool, OSError):
+                # No usable process pool: finish in this process
+                self.extractor._reset_pool()
+
+        yield from self._page_texts_sequential(handle, start)
+
+    def _page_texts_sequential(
+        self,
+        handle,
+        start: int = 0
+    ) -> Iterator[Tuple[Optional[str], int]]:
+        """Extract in this process, reopening the reader periodically."""
+        from pypdf import PdfReader
+
+        reader = None
+
+        for index in range(start, self.page_count):
+            if (index - start) % PDF_READER_RECYCLE_PAGES == 0:
+                # pypdf objects reference each other: collect the old
+                # reader now rather than whenever the GC gets to it
+                reader = None
+                gc.collect()
+                reader = PdfReader(handle)
+
+            yield reader.pages[index].extract_text(), index
+
+    def _page_texts_parallel(self) -> Iterator[Tuple[Optional[str], int]]:
+        """Extract page ranges in the process pool, yielding in order.
+
+        At most two ranges per worker are in flight, so results of a
+        slow consumer do not pile up in memory.
+        """
+
+        low, high = PARALLEL_PDF_CHUNK_PAGES
+        size = max(low, min(high, self.page_count // (self.workers * 4)))
+        ranges = iter(
+            (start, min(start + size, self.page_count))
+            for start in range(0, self.page_count, size)
+        )
+
+        pool = self.extractor._get_pool(self.workers)
+        path = str(self.file_path)
+        pending = deque()
+
+        def submit() -> None:
+            page_range = next(ranges, None)
+            if page_range is not None:
+                pending.append(
+                    (page_range[0], pool.submit(_extract_page_range, path, *page_range))
+                )
+
+        try:
+            for _ in range(self.workers * 2):
+                submit()
+
+            while pending:
+                start, future = pending.popleft()
+                texts = future.result()
+                submit()
+
+                for offset, text in enumerate(texts):
+                    yield text, start + offset
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _update_head(self, text: str) -> None:
+        """Fill title/authors once HEAD_CHARS of text have been seen."""
+
+        if self._head_done:
+            return
+
+        if self._head:
+            self._head += PAGE_SEPARATOR
+        self._head += text[:HEAD_CHARS]
+
+        if len(self._head) >= HEAD_CHARS:
+            self._set_head_metadata()
+
+    def _set_head_metadata(self) -> None:
+        head = self._head[:HEAD_CHARS]
+        self.metadata['title'] = (
+            self.extractor._extract_title_from_text(head) or self.metadata['title']
+        )
+        self.metadata['authors'] = self.extractor._extract_authors_from_text(head)
+        self._head = ""
+        self._head_done = True
+
+    @property
+    def structure(self) -> Dict[str, Any]:
+        return self.scanner.structure()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            'word_count': self.scanner.word_count,
+            'char_count': self.scanner.char_count,
+            'pages': self.page_count,
+            'sections': len(self.scanner.sections)
+        }
 
 
 class Extractor:
     """Extracts and structures content from various file types."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        pdf_workers: int = 1,
+        parallel_min_pages: int = PARALLEL_PDF_MIN_PAGES,
+        isolate: bool = False,
+        timeout: Optional[float] = None,
+        max_memory_mb: Optional[int] = None
+    ):
+        """
+        Args:
+            pdf_workers: Processes extracting pages of large PDFs
+                (1 = in-process only, 0 = one per CPU core); isolated
+                extraction is always single-process
+            parallel_min_pages: Smaller PDFs stay in-process
+            isolate: Extract PDFs in a supervised subprocess (a hang or
+                crash in the PDF parser cannot take the caller down)
+            timeout: Wall-clock seconds per isolated PDF (None = no limit)
+            max_memory_mb: Address-space limit of the isolated extraction
+                (None = no limit; not enforced on Windows)
+        """
         self.supported_types = {'.pdf', '.md', '.txt', '.markdown'}
+        self.pdf_workers = pdf_workers or os.cpu_count() or 1
+        self.parallel_min_pages = parallel_min_pages
+        self.isolate = isolate
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+
+        # Process pool shared by all PDFs (and threads), created on first use
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a process that runs threads can deadlock
+                self._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def _reset_pool(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def close(self) -> None:
+        """Stop the PDF worker processes."""
+        self._reset_pool()
 
     def extract(self, file_path: Path) -> ExtractionResult:
         """
@@ -68,69 +488,97 @@ class Extractor:
 
         # Route to appropriate extractor
         if suffix == '.pdf':
+            if self.isolate:
+                return self._extract_pdf_supervised(file_path)
             return self._extract_pdf(file_path)
         elif suffix in {'.md', '.markdown'}:
             return self._extract_markdown(file_path)
         elif suffix == '.txt':
             return self._extract_text(file_path)
 
-    def _extract_pdf(self, file_path: Path) -> ExtractionResult:
-        """Extract from PDF with metadata."""
+    def stream_pdf(self, file_path: Path) -> PDFStream:
+        """
+        Open a PDF for page-by-page extraction.
+
+        Args:
+            file_path: Path to PDF
+
+        Returns:
+            PDFStream yielding normalized pages (structure and stats are
+            computed along the way). Streams always run in-process;
+            isolate, timeout and max_memory_mb only apply to extract().
+
+        Raises:
+            ExtractionError: pypdf missing or file unreadable
+        """
         try:
-            from pypdf import PdfReader
+            import pypdf  # noqa: F401
         except ImportError:
             raise ExtractionError(
                 "pypdf not installed. Install with: pip install pypdf"
             )
 
         try:
-            reader = PdfReader(file_path)
+            return PDFStream(self, file_path, workers=self.pdf_workers)
+        except Exception as e:
+            raise ExtractionError(f"PDF extraction failed: {str(e)}")
 
-            # Extract text from all pages
-            text_parts = []
-            for page_num, page in enumerate(reader.pages, 1):
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+    def _extract_pdf(self, file_path: Path) -> ExtractionResult:
+        """Extract from PDF with metadata.
 
-            raw_text = "\n\n".join(text_parts)
+        Normalized pages go straight into one buffer; structure and
+        stats come from the stream, so no raw copy or word list of the
+        whole text is built.
+        """
+        stream = self.stream_pdf(file_path)
 
-            # Extract metadata
-            pdf_meta = reader.metadata if reader.metadata else {}
+        try:
+            buffer = io.StringIO()
+            for page in stream:
+                if page.start:
+                    buffer.write(PAGE_SEPARATOR)
+                buffer.write(page.text)
 
-            metadata = {
-                'source_type': 'pdf',
-                'title': self._extract_title_from_text(raw_text) or pdf_meta.get('/Title', file_path.stem),
-                'authors': self._extract_authors_from_text(raw_text),
-                'pages': len(reader.pages),
-                'file_name': file_path.name,
-                'file_size': file_path.stat().st_size,
-                'extracted_at': datetime.now().isoformat()
-            }
+            return ExtractionResult(
+                raw_text=buffer.getvalue(),
+                metadata=stream.metadata,
+                structure=stream.structure,
+                stats=stream.stats
+            )
 
-            # Detect structure
-            structure = self._analyze_structure(raw_text)
+        except Exception as e:
+            raise ExtractionError(f"PDF extraction failed: {str(e)}")
 
-            # Stats
-            stats = {
-                'word_count': len(raw_text.split()),
-                'char_count': len(raw_text),
-                'pages': len(reader.pages),
-                'sections': len(structure['sections'])
-            }
+    def _extract_pdf_supervised(self, file_path: Path) -> ExtractionResult:
+        """Extract a PDF in a time- and memory-boxed subprocess.
 
-            # Normalize text
-            normalized_text = self._normalize_text(raw_text)
+        Image-only PDFs are rejected before any process is started.
+        """
 
-            return ExtractionResult(
-                raw_text=normalized_text,
-                metadata=metadata,
-                structure=structure,
-                stats=stats
+        # Step 1: Reject PDFs without a text layer
+        try:
+            has_text = _pdf_has_text_layer(file_path)
+        except OSError as e:
+            raise ExtractionError(f"Cannot read PDF: {str(e)}")
+
+        if has_text is False:
+            raise ExtractionError(
+                "PDF has no text layer (image-only; needs OCR)",
+                reason='no_text_layer'
             )
 
-        except Exception as e:
-            raise ExtractionError(f"PDF extraction failed: {str(e)}")
+        # Step 2: Extract under supervision
+        try:
+            return run_supervised(
+                _extract_pdf_isolated,
+                args=(str(file_path),),
+                timeout=self.timeout,
+                max_memory_mb=self.max_memory_mb
+            )
+        except SupervisedError as e:
+            # Errors raised in the child already carry their context
+            message = str(e) if e.reason == 'error' else f"PDF extraction failed: {str(e)}"
+            raise ExtractionError(message, reason=e.reason)
 
     def _extract_markdown(self, file_path: Path) -> ExtractionResult:
         """Extract from Markdown file."""
@@ -228,50 +676,10 @@ class Extractor:
 
     def _analyze_structure(self, text: str) -> Dict[str, Any]:
         """Detect document structure (sections, headings)."""
-        sections = []
-        headings = []
-
-        # Detect markdown headings
-        lines = text.split('\n')
-        current_pos = 0
-
-        for i, line in enumerate(lines):
-            # Heading detection
-            heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
-            if heading_match:
-                level = len(heading_match.group(1))
-                title = heading_match.group(2).strip()
-
-                headings.append({
-                    'level': level,
-                    'title': title,
-                    'line': i,
-                    'position': current_pos
-                })
-
-                # If top-level heading, consider it a section
-                if level <= 2:
-                    sections.append({
-                        'title': title,
-                        'start': current_pos,
-                        'end': None,  # Will be filled by next section
-                        'line': i
-                    })
-
-            current_pos += len(line) + 1  # +1 for newline
-
-        # Fill end positions for sections
-        for i in range(len(sections) - 1):
-            sections[i]['end'] = sections[i + 1]['start']
-
-        if sections:
-            sections[-1]['end'] = len(text)
-
-        return {
-            'sections': sections,
-            'headings': headings,
-            'has_structure': len(sections) > 0
-        }
+        scanner = StructureScanner()
+        scanner.feed(text)
+        scanner.finish()
+        return scanner.structure()
 
     def _extract_title_from_text(self, text: str) -> Optional[str]:
         """Try to extract title from text content."""
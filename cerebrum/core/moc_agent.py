@@ -14,14 +14,153 @@ import re
 from datetime import datetime
 
 from cerebrum.models.note import Note, NoteMetadata
+from cerebrum.utils.templates import TemplateEngine
+
+# Default MOC body (override with .cerebrum/templates/moc.md)
+MOC_TEMPLATE = """# 🗺️ {moc_name}
+
+> [!abstract] Map of Content
+> **Domain:** {domain_path}
+> **Status:** 🌱 Seedling ({note_count} notes)
+> **Purpose:** Navigate and synthesize knowledge in this area
+
+---
+
+## 🎯 What Is This Map About?
+
+> [!question] Core Questions
+> - What is the central theme connecting these notes?
+> - Why did these ideas cluster together?
+> - What journey does this map enable?
+
+This map organizes knowledge in the **{domain}** domain{subdomain_focus}. It serves as an entry point to navigate atomic concepts and discover connections between ideas.
+
+The notes below represent distilled insights from various sources, organized for easy exploration and synthesis.
+
+---
+
+## 🗺️ The Landscape
+
+> [!tip] Navigate this knowledge domain
+> Below are atomic notes organized alphabetically
+
+### Core Concepts
+
+{note_list}
+
+### Related Maps
+
+> [!info] Connected MOCs
+> Add links to related maps as you discover them
+
+- `[[]]` - Related map
+
+---
+
+## 💡 Why Does This Matter?
+
+> [!question] Significance
+> - What problems does this knowledge solve?
+> - What projects could benefit from this?
+> - What becomes possible with this understanding?
+
+**Your answer:**
+-
+
+---
+
+## 🔬 Synthesis & Insights
+
+> [!tip] Emergent patterns across these notes
+> As you review notes in this map, capture emerging insights:
+
+**Patterns I've noticed:**
+-
+
+**Connections to other maps:**
+-
+
+**Surprising insights:**
+-
+
+**Key themes:**
+-
+
+---
+
+## 📋 Curated Paths
+
+> [!example] Suggested reading sequences
+> Different paths through this knowledge for different goals
+
+**For beginners:**
+1. Start: `[[]]`
+2. Then: `[[]]`
+3. Finally: `[[]]`
+
+**For deep dive:**
+-
+
+**For practical application:**
+-
+
+---
+
+## ❓ Open Questions
+
+> [!question] To explore further
+> - [ ] What's missing from this map?
+> - [ ] What contradictions exist between notes?
+> - [ ] What experiments could test these ideas?
+> - [ ] How does this connect to other domains?
+
+**Personal questions:**
+-
+
+---
+
+## 🔄 Evolution
+
+> [!info] Map Status
+> **Current:** 🌱 Seedling
+>
+> **Progress toward Evergreen:**
+> - [{mapped_check}] ≥5 notes mapped (Currently: {note_count})
+> - [ ] ≥3 curated paths created
+> - [ ] ≥2 synthesis insights captured
+> - [ ] Used in at least 1 project
+
+**Update History:**
+- {today}: Created with {note_count} notes
+
+---
+
+## 💭 Personal Notes
+
+> [!tip] Your unique perspective on this domain
+
+**Why I care about this:**
+
+
+**How I've used this map:**
+
+
+**Projects that drew from this:**
+
+
+---
+
+**Meta:** This MOC is auto-maintained by Cerebrum · [LYT Framework](https://www.linkingyourthinking.com/)
+"""
 
 
 class MOCAgent:
     """Creates and maintains Maps of Content (MOCs) automatically."""
 
-    def __init__(self, vault_path: Path):
+    def __init__(self, vault_path: Path, templates: Optional[TemplateEngine] = None):
         self.vault_path = vault_path
         self.mocs_path = vault_path / '04-MOCs'
+        self.templates = templates or TemplateEngine.for_vault(vault_path)
 
         # Ensure MOCs directory exists
         self.mocs_path.mkdir(parents=True, exist_ok=True)
@@ -191,141 +330,16 @@ class MOCAgent:
 
         today = datetime.now().strftime('%Y-%m-%d')
 
-        return f"""# 🗺️ {moc_name}
-
-> [!abstract] Map of Content
-> **Domain:** {domain_path}
-> **Status:** 🌱 Seedling ({note_count} notes)
-> **Purpose:** Navigate and synthesize knowledge in this area
-
----
-
-## 🎯 What Is This Map About?
-
-> [!question] Core Questions
-> - What is the central theme connecting these notes?
-> - Why did these ideas cluster together?
-> - What journey does this map enable?
-
-This map organizes knowledge in the **{domain}** domain{f', specifically focusing on **{subdomain}**' if subdomain else ''}. It serves as an entry point to navigate atomic concepts and discover connections between ideas.
-
-The notes below represent distilled insights from various sources, organized for easy exploration and synthesis.
-
----
-
-## 🗺️ The Landscape
-
-> [!tip] Navigate this knowledge domain
-> Below are atomic notes organized alphabetically
-
-### Core Concepts
-
-{note_list}
-
-### Related Maps
-
-> [!info] Connected MOCs
-> Add links to related maps as you discover them
-
-- `[[]]` - Related map
-
----
-
-## 💡 Why Does This Matter?
-
-> [!question] Significance
-> - What problems does this knowledge solve?
-> - What projects could benefit from this?
-> - What becomes possible with this understanding?
-
-**Your answer:**
--
-
----
-
-## 🔬 Synthesis & Insights
-
-> [!tip] Emergent patterns across these notes
-> As you review notes in this map, capture emerging insights:
-
-**Patterns I've noticed:**
--
-
-**Connections to other maps:**
--
-
-**Surprising insights:**
--
-
-**Key themes:**
--
-
----
-
-## 📋 Curated Paths
-
-> [!example] Suggested reading sequences
-> Different paths through this knowledge for different goals
-
-**For beginners:**
-1. Start: `[[]]`
-2. Then: `[[]]`
-3. Finally: `[[]]`
-
-**For deep dive:**
--
-
-**For practical application:**
--
-
----
-
-## ❓ Open Questions
-
-> [!question] To explore further
-> - [ ] What's missing from this map?
-> - [ ] What contradictions exist between notes?
-> - [ ] What experiments could test these ideas?
-> - [ ] How does this connect to other domains?
-
-**Personal questions:**
--
-
----
-
-## 🔄 Evolution
-
-> [!info] Map Status
-> **Current:** 🌱 Seedling
->
-> **Progress toward Evergreen:**
-> - [{'x' if note_count >= 5 else ' '}] ≥5 notes mapped (Currently: {note_count})
-> - [ ] ≥3 curated paths created
-> - [ ] ≥2 synthesis insights captured
-> - [ ] Used in at least 1 project
-
-**Update History:**
-- {today}: Created with {note_count} notes
-
----
-
-## 💭 Personal Notes
-
-> [!tip] Your unique perspective on this domain
-
-**Why I care about this:**
-
-
-**How I've used this map:**
-
-
-**Projects that drew from this:**
-
-
----
-
-**Meta:** This MOC is auto-maintained by Cerebrum · [LYT Framework](https://www.linkingyourthinking.com/)
-"""
+        return self.templates.render_named('moc', {
+            'moc_name': moc_name,
+            'domain': domain,
+            'domain_path': domain_path,
+            'subdomain_focus': f', specifically focusing on **{subdomain}**' if subdomain else '',
+            'note_count': note_count,
+            'note_list': note_list,
+            'mapped_check': 'x' if note_count >= 5 else ' ',
+            'today': today,
+        }, default=MOC_TEMPLATE)
 
     def _update_moc_note_list(
         self,
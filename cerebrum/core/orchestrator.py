@@ -9,19 +9,38 @@ Pipeline:
 6. Save: persist all notes to vault
 
 Validates at each step. Returns complete result.
+
+Results of stages 1-3 are kept in the artifact store; a re-run of an
+unchanged file starts at the first stage whose code version or model
+changed (e.g. straight at linking).
 """
 
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import json
-
-from cerebrum.core.extractor import Extractor
-from cerebrum.core.classificador import ClassificadorAgent
-from cerebrum.core.destilador import DestiladorAgent
-from cerebrum.core.conector import ConectorAgent
+import threading
+import time
+
+from cerebrum.core.extractor import (
+    Extractor, ExtractionError, ExtractionResult,
+    EXTRACTION_VERSION, PARALLEL_PDF_MIN_PAGES
+)
+from cerebrum.core.classificador import ClassificadorAgent, CLASSIFICATION_VERSION
+from cerebrum.core.destilador import DestiladorAgent, DESTILLATION_VERSION, DISTILL_INPUT_TOKENS
+from cerebrum.core.conector import ConectorAgent, LINK_INPUT_TOKENS
+from cerebrum.core.deduplicador import DeduplicadorAgent, DUPLICATE_THRESHOLD
 from cerebrum.core.moc_agent import MOCAgent
 from cerebrum.services.llm_service import LLMService
+from cerebrum.services.llm_cache import LLMCache
+from cerebrum.services.artifact_store import ArtifactStore
+from cerebrum.models.schemas import Concept
+from cerebrum.services.embedding_store import EmbeddingStore
+from cerebrum.utils.config import Config
+from cerebrum.utils.templates import TemplateEngine
+from cerebrum.utils.output import route_stdout, buffered
 
 
 class ProcessingResult:
@@ -79,27 +98,182 @@ class ProcessingResult:
 class Orchestrator:
     """ATHENA - Orchestrates the complete knowledge refinement pipeline."""
 
+    # Stages whose LLM can be routed via config llm.stages
+    STAGES = ('classification', 'distillation', 'linking')
+
     def __init__(
         self,
         llm_service: LLMService,
         vault_path: Path,
-        verbose: bool = False
+        verbose: bool = False,
+        stage_models: Optional[Dict[str, Any]] = None
     ):
+        """
+        Args:
+            llm_service: Default LLM (and shared transport/cache)
+            vault_path: Vault root
+            verbose: Print progress
+            stage_models: Per-stage routing, e.g. {'classification':
+                'llama3.2:1b', 'distillation': {'model': 'llama3.1:8b'}}.
+                Defaults to llm.stages in .cerebrum/config.yaml.
+        """
         self.llm = llm_service
         self.vault_path = vault_path
         self.verbose = verbose
 
-        # Initialize agents
-        self.extractor = Extractor()
-        self.classificador = ClassificadorAgent(llm_service)
-        self.destilador = DestiladorAgent(llm_service, vault_path)
-        self.conector = ConectorAgent(llm_service, vault_path)
-        self.moc_agent = MOCAgent(vault_path)
+        # Persistent LLM response cache (re-runs skip the model).
+        # Attached before routing so every route shares it.
+        if self.llm.cache is None:
+            self.llm.cache = LLMCache.for_vault(vault_path)
+
+        # Stored extraction/classification/destillation results
+        artifacts_config = self._load_config_section(vault_path, 'artifacts')
+        self.artifacts: Optional[ArtifactStore] = (
+            ArtifactStore.for_vault(vault_path)
+            if artifacts_config.get('enabled', True) else None
+        )
+
+        llm_config = self._load_llm_config(vault_path)
+        if llm_config.get('keep_alive'):
+            self.llm.keep_alive = llm_config['keep_alive']
+
+        # Several Ollama servers (set before routing so routes share them)
+        if llm_config.get('ollama_hosts'):
+            self.llm.set_ollama_hosts(
+                llm_config['ollama_hosts'],
+                routing=llm_config.get('host_routing'),
+                max_per_host=llm_config.get('max_per_host')
+            )
+
+        # Documents processed at once by batch_process (default: one
+        # per Ollama host)
+        self.parallel_documents = llm_config.get('parallel_documents')
+
+        # Vault writes (links, MOCs, saves) of parallel documents take turns
+        self._vault_lock = threading.Lock()
+
+        # Step 0: Route stages to models (cheap models for cheap tasks)
+        if stage_models is None:
+            stage_models = llm_config.get('stages') or {}
+
+        # Each route tags its calls with the stage in llm.telemetry
+        self.routes = {
+            stage: self._route(stage_models.get(stage)).for_stage(stage)
+            for stage in self.STAGES
+        }
+
+        # Initialize agents (each PDF in a supervised single-process child
+        # so one bad file cannot stall a batch; without isolation large
+        # PDFs extract on the shared process pool)
+        extraction_config = self._load_config_section(vault_path, 'extraction')
+        self.extractor = Extractor(
+            pdf_workers=extraction_config.get('pdf_workers', 0),
+            parallel_min_pages=extraction_config.get(
+                'parallel_min_pages', PARALLEL_PDF_MIN_PAGES
+            ),
+            isolate=extraction_config.get('isolate', True),
+            timeout=extraction_config.get('timeout', 300),
+            max_memory_mb=extraction_config.get('max_memory_mb', 2048)
+        )
+        # Classification on the distillation model reads the same document
+        # block, so distillation reuses its KV cache
+        classification_llm = self.routes['classification']
+        distillation_llm = self.routes['distillation']
+        self.classificador = ClassificadorAgent(
+            classification_llm,
+            share_prefix=(
+                (classification_llm.provider, classification_llm.model)
+                == (distillation_llm.provider, distillation_llm.model)
+            )
+        )
+        # Shared by linking, search and deduplication
+        self.embedding_store = EmbeddingStore.for_vault(
+            vault_path, model=llm_service.embedding_model
+        )
+
+        # Concepts already in the vault are merged, not written again
+        dedup_config = self._load_config_section(vault_path, 'deduplication')
+        self.deduplicador = None
+        if dedup_config.get('enabled', True):
+            self.deduplicador = DeduplicadorAgent(
+                self.llm, vault_path, self.embedding_store,
+                threshold=dedup_config.get('threshold', DUPLICATE_THRESHOLD)
+            )
+
+        # Note templates (compiled once, user overrides in .cerebrum/templates)
+        self.templates = TemplateEngine.for_vault(vault_path)
+
+        # Long documents are distilled map-reduce over their sections
+        distillation_config = self._load_config_section(vault_path, 'distillation')
+        self.destilador = DestiladorAgent(
+            self.routes['distillation'], vault_path,
+            mode=distillation_config.get('mode', 'auto'),
+            chunk_tokens=distillation_config.get('chunk_tokens', DISTILL_INPUT_TOKENS),
+            max_parallel_chunks=distillation_config.get('max_parallel_chunks', 4),
+            deduplicator=self.deduplicador,
+            templates=self.templates
+        )
+
+        linking_config = self._load_config_section(vault_path, 'linking')
+        self.conector = ConectorAgent(
+            self.routes['linking'], vault_path, embedding_store=self.embedding_store,
+            input_tokens=linking_config.get('input_tokens', LINK_INPUT_TOKENS)
+        )
+        self.moc_agent = MOCAgent(vault_path, templates=self.templates)
+
+        # Load every routed model in the background while the first
+        # document is being extracted
+        if llm_config.get('warm_up', True):
+            self.llm.warm_up(self._models_in_use(), background=True)
+
+    @classmethod
+    def _load_llm_config(cls, vault_path: Path) -> Dict[str, Any]:
+        """Read the llm section of the vault config (empty if absent)."""
+        return cls._load_config_section(vault_path, 'llm')
+
+    @staticmethod
+    def _load_config_section(vault_path: Path, section: str) -> Dict[str, Any]:
+        """Read one section of the vault config (empty if absent)."""
+
+        config_path = vault_path / '.cerebrum' / 'config.yaml'
+        if not config_path.exists():
+            return {}
+
+        config = Config.load(config_path) or {}
+        return config.get(section) or {}
+
+    def _models_in_use(self) -> List[str]:
+        """Generation models of all routes plus the embedding model."""
+        models = [llm.model for llm in self.routes.values() if llm.provider == 'ollama']
+        models.append(self.llm.embedding_model)
+        return list(dict.fromkeys(models))
+
+    def model_states(self) -> Dict[str, str]:
+        """Warm/cold state of the models this pipeline uses."""
+        states = self.llm.model_states()
+        return {m: states.get(m, 'cold') for m in self._models_in_use()}
+
+    def _route(self, spec: Any) -> LLMService:
+        """LLMService for a stage spec (model name, dict or None)."""
+
+        if not spec:
+            return self.llm
+
+        if isinstance(spec, str):
+            return self.llm.with_model(spec)
+
+        return self.llm.with_model(
+            model=spec.get('model'),
+            provider=spec.get('provider'),
+            context_window=spec.get('context_window')
+        )
 
     def process(self, file_path: Path) -> ProcessingResult:
         """
         Process file through complete pipeline.
 
+        Safe to call from several threads at once (see batch_process).
+
         Args:
             file_path: Path to PDF, Markdown, or text file
 
@@ -107,16 +281,42 @@ class Orchestrator:
             ProcessingResult with all generated notes and stats
         """
 
+        # LLM calls for this file stick to one Ollama host (warm prefix
+        # cache) and are tagged with it in telemetry
+        document = str(file_path)
+        with self.llm.document(document):
+            return self._process(file_path, document)
+
+    def _process(self, file_path: Path, document: str) -> ProcessingResult:
+        """process() body, run inside the document's LLM scope."""
+
         result = ProcessingResult()
         start_time = datetime.now()
 
+        # Per-stage wall time and LLM calls made by this run
+        telemetry_mark = self.llm.telemetry.mark()
+        stage_seconds = {}
+        lap = [time.monotonic()]
+
+        def end_stage(stage: str) -> None:
+            now = time.monotonic()
+            stage_seconds[stage] = now - lap[0]
+            lap[0] = now
+
         try:
             # Stage 1: Extraction
             if self.verbose:
                 print(f"📄 Stage 1: Extracting content from {file_path.name}...")
 
-            extraction = self._run_extraction(file_path)
+            try:
+                extraction = self._run_extraction(file_path)
+            except ExtractionError as e:
+                result.errors.append(f"Extraction failed ({e.reason}): {str(e)}")
+                if self.verbose:
+                    print(f"❌ Extraction failed ({e.reason}): {str(e)}")
+                return result
             result.stages['extraction'] = extraction
+            end_stage('extraction')
 
             if not extraction['validation']['passed']:
                 result.errors.append("Extraction validation failed")
@@ -128,9 +328,11 @@ class Orchestrator:
 
             classification = self._run_classification(
                 extraction['raw_text'],
-                extraction['metadata']
+                extraction['metadata'],
+                extraction['artifact']
             )
             result.stages['classification'] = classification
+            end_stage('classification')
 
             if not classification['validation']['passed']:
                 result.warnings.append("Classification has issues (continuing anyway)")
@@ -142,9 +344,11 @@ class Orchestrator:
             destillation = self._run_destillation(
                 extraction['raw_text'],
                 extraction['metadata'],
-                classification
+                classification,
+                classification['artifact']
             )
             result.stages['destillation'] = destillation
+            end_stage('destillation')
 
             if not destillation['validation']['passed']:
                 result.errors.append("Destillation validation failed")
@@ -153,50 +357,73 @@ class Orchestrator:
             result.literature_note = destillation['literature_note']
             result.permanent_notes = destillation['permanent_notes']
 
-            # Stage 4: Connection
-            if self.verbose:
-                print("🔗 Stage 4: Creating semantic connections...")
+            # Stages 4-6 read and rewrite shared vault notes
+            with self._vault_lock:
+                end_stage('vault_wait')  # Other documents writing
 
-            connection = self._run_connection(
-                destillation['permanent_notes']
-            )
-            result.stages['connection'] = connection
+                # Concepts a document saved meanwhile already created
+                if self.deduplicador is not None:
+                    self._recheck_duplicates(destillation)
+                    result.permanent_notes = destillation['permanent_notes']
 
-            result.links_created = connection['links_created']
+                # Stage 4: Connection
+                if self.verbose:
+                    print("🔗 Stage 4: Creating semantic connections...")
 
-            # Stage 5: MOC Creation/Update
-            if self.verbose:
-                print("🗺️  Stage 5: Creating/updating MOCs...")
+                connection = self._run_connection(
+                    destillation['permanent_notes']
+                )
+                result.stages['connection'] = connection
+                end_stage('connection')
 
-            moc_result = self._run_moc_creation(
-                destillation['permanent_notes'],
-                classification
-            )
-            result.stages['moc'] = moc_result
+                result.links_created = connection['links_created']
 
-            result.mocs_created = moc_result['mocs_created']
-            result.mocs_updated = moc_result['mocs_updated']
+                # Stage 5: MOC Creation/Update
+                if self.verbose:
+                    print("🗺️  Stage 5: Creating/updating MOCs...")
 
-            # Stage 6: Save to vault
-            if self.verbose:
-                print("💾 Stage 6: Saving to vault...")
+                moc_result = self._run_moc_creation(
+                    destillation['permanent_notes'],
+                    classification
+                )
+                result.stages['moc'] = moc_result
+                end_stage('moc')
 
-            save_result = self.destilador.save_notes(
-                result.literature_note,
-                result.permanent_notes
-            )
+                result.mocs_created = moc_result['mocs_created']
+                result.mocs_updated = moc_result['mocs_updated']
 
-            # Save MOCs
-            for moc in result.mocs_created + result.mocs_updated:
-                self.moc_agent.save_moc(moc)
+                # Stage 6: Save to vault
                 if self.verbose:
-                    status = "Created" if moc in result.mocs_created else "Updated"
-                    print(f"   {status}: {moc.metadata.title} ({moc.metadata.moc_note_count} notes)")
+                    print("💾 Stage 6: Saving to vault...")
 
-            # Update links in vault
-            self.conector.update_vault_links(result.permanent_notes)
+                save_result = self.destilador.save_notes(
+                    result.literature_note,
+                    result.permanent_notes
+                )
 
-            result.stages['save'] = save_result
+                # Merge duplicates into their existing notes; index the
+                # new notes for the next document's deduplication
+                if self.deduplicador is not None:
+                    save_result['merged_into'] = self.deduplicador.apply(
+                        destillation['duplicates'], result.literature_note
+                    )
+                    self.deduplicador.register(
+                        result.permanent_notes, save_result['permanent_note_paths'],
+                        destillation['concept_vectors']
+                    )
+
+                # Save MOCs
+                for moc in result.mocs_created + result.mocs_updated:
+                    self.moc_agent.save_moc(moc)
+                    if self.verbose:
+                        status = "Created" if moc in result.mocs_created else "Updated"
+                        print(f"   {status}: {moc.metadata.title} ({moc.metadata.moc_note_count} notes)")
+
+                # Update links in vault
+                self.conector.update_vault_links(result.permanent_notes)
+
+                result.stages['save'] = save_result
+                end_stage('save')
 
             # Calculate duration
             end_time = datetime.now()
@@ -208,12 +435,25 @@ class Orchestrator:
                 'source_type': extraction['metadata']['source_type'],
                 'words_processed': extraction['stats']['word_count'],
                 'notes_created': 1 + len(result.permanent_notes),  # lit + perm
+                'duplicates_merged': destillation['stats']['duplicates_merged'],
+                'merged_in_document': destillation['stats']['merged_in_document'],
                 'literature_notes': 1,
                 'permanent_notes': len(result.permanent_notes),
                 'links_created': result.links_created,
                 'avg_links_per_note': connection['avg_links_per_note'],
                 'orphan_rate': connection['orphan_rate'],
                 'processing_time': result.duration_seconds,
+                'stage_seconds': stage_seconds,
+                'reused_stages': [
+                    stage for stage in ('extraction', 'classification', 'destillation')
+                    if result.stages[stage]['artifact'].get('reused')
+                ],
+                'llm': self.llm.telemetry.summary(since=telemetry_mark, document=document),
+                'llm_usage': self.llm.usage.summary(),
+                'llm_routes': {
+                    stage: f"{llm.provider}/{llm.model}"
+                    for stage, llm in self.routes.items()
+                },
                 'validation_passed': all(
                     s.get('validation', {}).get('passed', True)
                     for s in result.stages.values()
@@ -237,10 +477,63 @@ class Orchestrator:
 
             return result
 
+    def _recheck_duplicates(self, destillation: Dict[str, Any]) -> None:
+        """Turn new notes that now duplicate a vault note into duplicates
+        (call under the vault lock, before anything is written)."""
+
+        notes = destillation['permanent_notes']
+        concepts = destillation['new_concepts']
+        vectors = destillation['concept_vectors']
+
+        kept, late = self.deduplicador.recheck(concepts, vectors)
+        if not late:
+            return
+
+        kept_set = set(kept)
+        dropped = [i for i in range(len(notes)) if i not in kept_set]
+        self.destilador.redirect_links(destillation['literature_note'], {
+            notes[i].metadata.title: duplicate['target_title']
+            for i, duplicate in zip(dropped, late)
+        })
+
+        destillation['permanent_notes'] = [notes[i] for i in kept]
+        destillation['new_concepts'] = [concepts[i] for i in kept]
+        destillation['concept_vectors'] = [vectors[i] for i in kept] if vectors else []
+        destillation['duplicates'] = destillation['duplicates'] + late
+        destillation['stats']['permanent_notes_created'] = len(kept)
+        destillation['stats']['duplicates_merged'] += len(late)
+
     def _run_extraction(self, file_path: Path) -> Dict[str, Any]:
-        """Run extraction stage."""
+        """Run extraction stage (reused while the file is unchanged).
 
-        extraction_result = self.extractor.extract(file_path)
+        The key includes the file name: metadata (file_name, a title
+        taken from the name) is path-derived, so a renamed or copied
+        file is extracted again rather than citing the old name.
+        """
+
+        artifact = {'key': None, 'source': None, 'reused': False}
+        stored = None
+
+        if self.artifacts is not None and file_path.exists():
+            artifact['source'] = ArtifactStore.source_hash(file_path)
+            artifact['key'] = ArtifactStore.make_key(
+                'extraction', EXTRACTION_VERSION, artifact['source'],
+                file_name=file_path.name
+            )
+            stored = self.artifacts.get('extraction', artifact['key'])
+
+        if stored is not None:
+            extraction_result = ExtractionResult(**stored)
+            artifact['reused'] = True
+        else:
+            extraction_result = self.extractor.extract(file_path)
+            if artifact['key'] is not None:
+                self.artifacts.set('extraction', artifact['key'], artifact['source'], {
+                    'raw_text': extraction_result.raw_text,
+                    'metadata': extraction_result.metadata,
+                    'structure': extraction_result.structure,
+                    'stats': extraction_result.stats
+                })
 
         # Validate
         validation = self.extractor.validate_extraction(extraction_result)
@@ -250,40 +543,102 @@ class Orchestrator:
             'metadata': extraction_result.metadata,
             'structure': extraction_result.structure,
             'stats': extraction_result.stats,
-            'validation': validation
+            'validation': validation,
+            'artifact': artifact
         }
 
     def _run_classification(
         self,
         raw_text: str,
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        upstream: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Run classification stage."""
+        """Run classification stage (reused while extraction and model are unchanged)."""
+
+        artifact = self._stage_artifact(
+            'classification', CLASSIFICATION_VERSION, upstream, self.routes['classification'],
+            document_tokens=self.classificador.document_tokens
+        )
+        stored = self._load_artifact('classification', artifact)
 
-        classification = self.classificador.classify(raw_text, metadata)
+        classification = stored or self.classificador.classify(raw_text, metadata)
 
         # Validate
         validation = self.classificador.validate_classification(classification)
 
+        # Failed classifications are retried next run, not stored
+        if stored is None and validation['passed']:
+            self._store_artifact('classification', artifact, classification)
+
         return {
             **classification,
-            'validation': validation
+            'validation': validation,
+            'artifact': artifact
         }
 
     def _run_destillation(
         self,
         raw_text: str,
         metadata: Dict[str, Any],
-        classification: Dict[str, Any]
+        classification: Dict[str, Any],
+        upstream: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Run destillation stage."""
+        """Run destillation stage (notes are rebuilt from stored concepts)."""
+
+        artifact = self._stage_artifact(
+            'destillation', DESTILLATION_VERSION, upstream, self.routes['distillation'],
+            mode=self.destilador.mode, chunk_tokens=self.destilador.chunk_tokens
+        )
+        stored = self._load_artifact('destillation', artifact)
 
         destillation_result = self.destilador.destilate(
-            raw_text, metadata, classification
+            raw_text, metadata, classification,
+            concepts=[Concept.from_dict(c) for c in stored] if stored is not None else None
         )
 
+        # Fallback concepts (LLM output unusable) are retried next run
+        if stored is None and destillation_result['stats']['concepts_source'] in ('llm', 'retry', 'chunked'):
+            self._store_artifact('destillation', artifact, [
+                concept.to_dict() for concept in destillation_result['concepts']
+            ])
+
+        destillation_result['artifact'] = artifact
         return destillation_result
 
+    def _stage_artifact(
+        self,
+        stage: str,
+        version: str,
+        upstream: Dict[str, Any],
+        llm: LLMService,
+        **params
+    ) -> Dict[str, Any]:
+        """Artifact key of an LLM stage: upstream key, version, model and
+        any settings that change the stage's output."""
+
+        key = None
+        if upstream['key'] is not None:
+            key = ArtifactStore.make_key(
+                stage, version, upstream['key'],
+                model=f"{llm.provider}/{llm.model}",
+                context_window=llm.context_window,
+                **params
+            )
+
+        return {'key': key, 'source': upstream['source'], 'reused': False}
+
+    def _load_artifact(self, stage: str, artifact: Dict[str, Any]) -> Optional[Any]:
+        if self.artifacts is None or artifact['key'] is None:
+            return None
+
+        stored = self.artifacts.get(stage, artifact['key'])
+        artifact['reused'] = stored is not None
+        return stored
+
+    def _store_artifact(self, stage: str, artifact: Dict[str, Any], value: Any) -> None:
+        if self.artifacts is not None and artifact['key'] is not None:
+            self.artifacts.set(stage, artifact['key'], artifact['source'], value)
+
     def _run_connection(self, permanent_notes: List) -> Dict[str, Any]:
         """Run connection stage."""
 
@@ -330,6 +685,8 @@ class Orchestrator:
         print(f"\n⏱️  Performance:")
         print(f"   Total time: {result.duration_seconds:.1f}s")
         print(f"   Words processed: {result.stats.get('words_processed', 0):,}")
+        if result.stats.get('reused_stages'):
+            print(f"   Reused: {', '.join(result.stats['reused_stages'])}")
 
         if result.warnings:
             print(f"\n⚠️  Warnings:")
@@ -345,28 +702,70 @@ class Orchestrator:
 
     def batch_process(
         self,
-        file_paths: List[Path]
+        file_paths: List[Path],
+        max_workers: Optional[int] = None,
+        on_result: Optional[Callable[[Path, ProcessingResult], None]] = None
     ) -> List[ProcessingResult]:
-        """Process multiple files in batch."""
+        """
+        Process multiple files in batch.
 
-        results = []
+        Files run one at a time unless max_workers (or
+        llm.parallel_documents) allows more; then extraction,
+        classification and distillation overlap while vault writes take
+        turns, and each file's progress output is printed in one piece
+        when it finishes. With several Ollama hosts each document stays
+        on one host, so throughput grows with the number of hosts.
 
-        for i, file_path in enumerate(file_paths, 1):
-            if self.verbose:
-                print(f"\n{'='*60}")
-                print(f"Processing {i}/{len(file_paths)}: {file_path.name}")
-                print(f"{'='*60}\n")
+        Args:
+            file_paths: Files to process
+            max_workers: Files at once (default: llm.parallel_documents,
+                else 1)
+            on_result: Called with (file_path, result) as each file finishes
 
-            result = self.process(file_path)
-            results.append(result)
+        Returns:
+            Results in file_paths order
+        """
+
+        if max_workers is None:
+            max_workers = self.parallel_documents or 1
+        max_workers = max(1, min(max_workers, len(file_paths) or 1))
+
+        def run(item) -> ProcessingResult:
+            i, file_path = item
+            with buffered() if max_workers > 1 else nullcontext():
+                if self.verbose:
+                    print(f"\n{'='*60}")
+                    print(f"Processing {i}/{len(file_paths)}: {file_path.name}")
+                    print(f"{'='*60}\n")
+
+                result = self.process(file_path)
+            if on_result:
+                on_result(file_path, result)
+            return result
+
+        items = list(enumerate(file_paths, 1))
+        started = time.monotonic()
+
+        if max_workers == 1:
+            results = [run(item) for item in items]
+        else:
+            # Each document's output is buffered (see run)
+            with route_stdout(), ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="cerebrum-doc"
+            ) as executor:
+                results = list(executor.map(run, items))
 
         # Batch summary
         if self.verbose:
-            self._print_batch_summary(results)
+            self._print_batch_summary(results, time.monotonic() - started)
 
         return results
 
-    def _print_batch_summary(self, results: List[ProcessingResult]):
+    def _print_batch_summary(
+        self,
+        results: List[ProcessingResult],
+        wall_seconds: Optional[float] = None
+    ):
         """Print batch processing summary."""
 
         total = len(results)
@@ -390,6 +789,8 @@ class Orchestrator:
 
         print(f"\nTotal time: {total_time:.1f}s")
         print(f"Avg time per file: {total_time/total:.1f}s")
+        if wall_seconds is not None and wall_seconds < total_time:
+            print(f"Wall time (parallel): {wall_seconds:.1f}s")
 
         print("\n" + "="*60)
 
@@ -45,6 +45,7 @@ class NoteMetadata:
     zk_connections_quality: float = 0.0
     zk_centrality_score: float = 0.0
     zk_cluster_id: Optional[str] = None
+    zk_definition: Optional[str] = None  # Concept definition (deduplication)
 
     # === SOURCE ===
     source_type: Optional[str] = None
@@ -53,6 +54,7 @@ class NoteMetadata:
     source_year: Optional[int] = None
     source_doi: Optional[str] = None
     source_url: Optional[str] = None
+    source_blob: Optional[str] = None  # Full text in .cerebrum/blobs (see BlobStore)
 
     # === MANAGEMENT ===
     created: str = field(default_factory=lambda: datetime.now().isoformat())
@@ -104,7 +106,8 @@ class NoteMetadata:
                 'connections_count': self.zk_connections_count,
                 'connections_quality': self.zk_connections_quality,
                 'centrality_score': self.zk_centrality_score,
-                'cluster_id': self.zk_cluster_id
+                'cluster_id': self.zk_cluster_id,
+                'definition': self.zk_definition
             },
             'source': {
                 'type': self.source_type,
@@ -112,7 +115,8 @@ class NoteMetadata:
                 'authors': self.source_authors,
                 'year': self.source_year,
                 'doi': self.source_doi,
-                'url': self.source_url
+                'url': self.source_url,
+                'blob': self.source_blob
             },
             'created': self.created,
             'modified': self.modified,
@@ -207,12 +211,14 @@ class Note:
             zk_connections_quality=meta_dict.get('zettelkasten', {}).get('connections_quality', 0.0),
             zk_centrality_score=meta_dict.get('zettelkasten', {}).get('centrality_score', 0.0),
             zk_cluster_id=meta_dict.get('zettelkasten', {}).get('cluster_id'),
+            zk_definition=meta_dict.get('zettelkasten', {}).get('definition'),
             source_type=meta_dict.get('source', {}).get('type'),
             source_title=meta_dict.get('source', {}).get('title'),
             source_authors=meta_dict.get('source', {}).get('authors', []),
             source_year=meta_dict.get('source', {}).get('year'),
             source_doi=meta_dict.get('source', {}).get('doi'),
             source_url=meta_dict.get('source', {}).get('url'),
+            source_blob=meta_dict.get('source', {}).get('blob'),
             created=meta_dict.get('created', datetime.now().isoformat()),
             modified=meta_dict.get('modified', datetime.now().isoformat()),
             reviewed=meta_dict.get('reviewed', 0),
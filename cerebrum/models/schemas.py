@@ -0,0 +1,256 @@
+"""Structured LLM outputs: JSON schemas and the typed objects they map to.
+
+Schemas are sent to the provider's constrained-output mode (Ollama
+`format`, Gemini `responseSchema`); responses are validated and coerced
+into dataclasses so agents never index into raw dicts.
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Any, Optional
+import re
+import unicodedata
+
+
+CONTENT_TYPES = ['concept', 'principle', 'model', 'evidence', 'mechanism', 'application']
+LINK_TYPES = ['supports', 'extends', 'applies', 'prerequisite', 'contrasts', 'related']
+
+
+CLASSIFICATION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'domain': {'type': 'string'},
+        'subdomain': {'type': 'string'},
+        'content_type': {'type': 'string', 'enum': CONTENT_TYPES},
+        'mocs': {'type': 'array', 'items': {'type': 'string'}},
+        'key_topics': {'type': 'array', 'items': {'type': 'string'}},
+        'confidence': {'type': 'number', 'minimum': 0, 'maximum': 1}
+    },
+    'required': ['domain', 'subdomain', 'content_type', 'mocs', 'key_topics', 'confidence']
+}
+
+CONCEPT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'definition': {'type': 'string'},
+        'explanation': {'type': 'string'},
+        'why_matters': {'type': 'string'},
+        'applications': {'type': 'array', 'items': {'type': 'string'}},
+        'connections': {'type': 'array', 'items': {'type': 'string'}},
+        'concept_type': {'type': 'string', 'enum': CONTENT_TYPES}
+    },
+    'required': ['title', 'definition', 'explanation', 'why_matters',
+                 'applications', 'connections', 'concept_type']
+}
+
+CONCEPTS_SCHEMA = {
+    'type': 'array',
+    'items': CONCEPT_SCHEMA
+}
+
+LINKS_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {
+            'note_number': {'type': 'integer', 'minimum': 1},
+            'link_type': {'type': 'string', 'enum': LINK_TYPES},
+            'context': {'type': 'string'},
+            'confidence': {'type': 'number', 'minimum': 0, 'maximum': 1}
+        },
+        'required': ['note_number', 'link_type', 'context', 'confidence']
+    }
+}
+
+
+class SchemaError(ValueError):
+    """LLM output cannot be turned into the expected object."""
+    pass
+
+
+def _text(value: Any, default: str = "") -> str:
+    if value is None:
+        return default
+    return str(value).strip() or default
+
+
+def _text_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [v for v in value.replace(';', ',').split(',')]
+    if not isinstance(value, list):
+        return []
+    return [str(v).strip() for v in value if v is not None and str(v).strip()]
+
+
+def _number(value: Any, default: float, low: float = 0.0, high: float = 1.0) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return min(high, max(low, number))
+
+
+def _choice(value: Any, choices: List[str], default: str) -> str:
+    value = _text(value).lower()
+    return value if value in choices else default
+
+
+def title_words(title: str) -> frozenset:
+    """Significant words of a title (case, accents and plurals folded)."""
+
+    folded = unicodedata.normalize('NFKD', title.lower())
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    words = set()
+    for word in re.findall(r'\w+', folded):
+        if len(word) <= 2:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.add(word)
+    return frozenset(words)
+
+
+@dataclass
+class Classification:
+    """LLM taxonomy classification of a document."""
+
+    domain: str = "general"
+    subdomain: Optional[str] = None
+    content_type: str = "concept"
+    mocs: List[str] = field(default_factory=list)
+    key_topics: List[str] = field(default_factory=list)
+    confidence: float = 0.5
+
+    @classmethod
+    def from_dict(cls, data: Any) -> 'Classification':
+        if not isinstance(data, dict):
+            raise SchemaError(f"Classification must be an object, got {type(data).__name__}")
+
+        return cls(
+            domain=_text(data.get('domain'), 'general').lower(),
+            subdomain=_text(data.get('subdomain')) or None,
+            content_type=_choice(data.get('content_type'), CONTENT_TYPES, 'concept'),
+            mocs=_text_list(data.get('mocs')),
+            key_topics=_text_list(data.get('key_topics')),
+            confidence=_number(data.get('confidence'), 0.75)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class Concept:
+    """Atomic concept extracted from a document."""
+
+    title: str
+    definition: str = ""
+    explanation: str = ""
+    why_matters: str = ""
+    applications: List[str] = field(default_factory=list)
+    connections: List[str] = field(default_factory=list)
+    concept_type: str = "concept"
+    aliases: List[str] = field(default_factory=list)  # Titles of merged duplicates
+
+    @classmethod
+    def from_dict(cls, data: Any) -> 'Concept':
+        if not isinstance(data, dict):
+            raise SchemaError(f"Concept must be an object, got {type(data).__name__}")
+
+        title = _text(data.get('title'))
+        if not title:
+            raise SchemaError("Concept has no title")
+
+        return cls(
+            title=title,
+            definition=_text(data.get('definition')),
+            explanation=_text(data.get('explanation')),
+            why_matters=_text(data.get('why_matters')),
+            applications=_text_list(data.get('applications')),
+            connections=_text_list(data.get('connections')),
+            concept_type=_choice(data.get('concept_type'), CONTENT_TYPES, 'concept'),
+            aliases=_text_list(data.get('aliases'))
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def merge(self, other: 'Concept') -> 'Concept':
+        """One concept from two duplicates: this title, the richer text,
+        combined lists; the other title becomes an alias."""
+
+        def longer(x: str, y: str) -> str:
+            return y if len(y) > len(x) else x
+
+        aliases = self.aliases + [other.title] + other.aliases
+        aliases = [a for a in dict.fromkeys(aliases) if a.lower() != self.title.lower()]
+
+        return Concept(
+            title=self.title,
+            definition=longer(self.definition, other.definition),
+            explanation=longer(self.explanation, other.explanation),
+            why_matters=longer(self.why_matters, other.why_matters),
+            applications=list(dict.fromkeys(self.applications + other.applications))[:5],
+            connections=list(dict.fromkeys(self.connections + other.connections))[:10],
+            concept_type=self.concept_type,
+            aliases=aliases
+        )
+
+
+@dataclass
+class LinkSuggestion:
+    """LLM-proposed link to a numbered candidate note."""
+
+    note_number: int
+    link_type: str = "related"
+    context: str = ""
+    confidence: float = 0.7
+
+    @classmethod
+    def from_dict(cls, data: Any) -> 'LinkSuggestion':
+        if not isinstance(data, dict):
+            raise SchemaError(f"Link must be an object, got {type(data).__name__}")
+
+        try:
+            note_number = int(data.get('note_number'))
+        except (TypeError, ValueError):
+            raise SchemaError(f"Invalid note_number: {data.get('note_number')!r}")
+
+        return cls(
+            note_number=note_number,
+            link_type=_choice(data.get('link_type'), LINK_TYPES, 'related'),
+            context=_text(data.get('context')),
+            confidence=_number(data.get('confidence'), 0.7)
+        )
+
+
+def parse_list(data: Any, model) -> List[Any]:
+    """
+    Typed objects from a JSON array, skipping items that do not fit.
+
+    Args:
+        data: Parsed JSON. An object wrapping the list (e.g.
+            {"concepts": [...]}) is unwrapped; any other object is
+            treated as a one-item list.
+        model: Dataclass with from_dict (Concept, LinkSuggestion)
+
+    Returns:
+        List of model instances
+    """
+
+    if isinstance(data, dict):
+        wrapped = [v for v in data.values() if isinstance(v, list)]
+        data = wrapped[0] if len(wrapped) == 1 and len(data) == 1 else [data]
+    if not isinstance(data, list):
+        return []
+
+    items = []
+    for item in data:
+        try:
+            items.append(model.from_dict(item))
+        except SchemaError:
+            continue
+
+    return items
@@ -0,0 +1,165 @@
+"""Artifact Store: Persistent results of the expensive pipeline stages.
+
+Stored in SQLite under `.cerebrum/artifacts.db` (zlib-compressed JSON):
+- extraction: raw text, metadata, structure, stats
+- classification: the classification dict
+- destillation: the distilled concepts
+
+Keys chain through the pipeline: a stage's key hashes its name, its code
+version and its upstream key (the source content hash and file name
+for extraction, plus the model for LLM stages). Changing a file, a stage version or a
+model invalidates that stage and everything after it; earlier stages
+are still reused.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+class ArtifactStore:
+    """Disk-backed store of per-stage results, keyed by content and version."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+        self._lock = threading.Lock()
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS artifacts (
+                key TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                source TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                created REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_artifacts_source ON artifacts(source)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def for_vault(cls, vault_path: Path) -> 'ArtifactStore':
+        """Create store in the vault's .cerebrum directory."""
+        return cls(vault_path / ".cerebrum" / "artifacts.db")
+
+    @staticmethod
+    def source_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 of a file's bytes (read in chunks)."""
+
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(stage: str, version: str, upstream: str, **params) -> str:
+        """Key of a stage result: stage, code version, upstream key, params."""
+        key_data = {
+            'stage': stage,
+            'version': version,
+            'upstream': upstream,
+            'params': params
+        }
+        encoded = json.dumps(key_data, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """Stored result (None on miss)."""
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM artifacts WHERE key = ?", (key,)
+            ).fetchone()
+
+            counter = self.misses if row is None else self.hits
+            counter[stage] = counter.get(stage, 0) + 1
+
+        if row is None:
+            return None
+
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def set(self, stage: str, key: str, source: str, value: Any) -> None:
+        """
+        Store a stage result.
+
+        Args:
+            stage: Stage name
+            key: make_key() of the result
+            source: Source content hash (for invalidate)
+            value: JSON-serializable result (non-JSON values become strings)
+        """
+
+        payload = zlib.compress(
+            json.dumps(value, default=str, ensure_ascii=False).encode('utf-8')
+        )
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts "
+                "(key, stage, source, payload, created) VALUES (?, ?, ?, ?, ?)",
+                (key, stage, source, payload, time.time())
+            )
+            self._conn.commit()
+
+    def invalidate(self, source: Optional[str] = None, stage: Optional[str] = None) -> int:
+        """
+        Drop stored results.
+
+        Args:
+            source: Only results of this source hash
+            stage: Only results of this stage
+
+        Returns:
+            Number of results removed
+        """
+
+        clauses, params = [], []
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source)
+        if stage is not None:
+            clauses.append("stage = ?")
+            params.append(stage)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            removed = self._conn.execute(f"DELETE FROM artifacts{where}", params).rowcount
+            self._conn.commit()
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Stored results per stage and this session's hits/misses."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) "
+                "FROM artifacts GROUP BY stage"
+            ).fetchall()
+
+        return {
+            'stages': {
+                stage: {'entries': count, 'size_bytes': size}
+                for stage, count, size in rows
+            },
+            'hits': dict(self.hits),
+            'misses': dict(self.misses)
+        }
+
+    def close(self) -> None:
+        """Close database connection."""
+        with self._lock:
+            self._conn.close()
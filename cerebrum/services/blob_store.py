@@ -0,0 +1,110 @@
+"""Blob Store: Source texts stored once, compressed and content-addressed.
+
+Layout under `.cerebrum/blobs/`:
+- <hash[:2]>/<hash>.txt.gz: gzip of the UTF-8 text, hash = SHA-256 of it
+
+Literature notes carry the hash (source.blob in frontmatter) and a short
+excerpt instead of the whole text, so vault scans and Obsidian never
+read multi-megabyte notes. Readers decompress only when asked, and
+open()/excerpt() stream, so a head never inflates the whole blob.
+"""
+
+import gzip
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Dict, Any, IO
+
+
+class BlobStore:
+    """Write-once gzip blobs addressed by content hash."""
+
+    SUFFIX = ".txt.gz"
+
+    def __init__(self, root: Path, compresslevel: int = 6):
+        self.root = root
+        self.compresslevel = compresslevel
+
+    @classmethod
+    def for_vault(cls, vault_path: Path, **options) -> 'BlobStore':
+        """Create store in the vault's .cerebrum directory."""
+        return cls(vault_path / ".cerebrum" / "blobs", **options)
+
+    @staticmethod
+    def digest(text: str) -> str:
+        """Content hash of text (the blob's address)."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}{self.SUFFIX}"
+
+    def relative_path(self, digest: str) -> str:
+        """Blob path relative to the vault (for links in notes)."""
+        return f".cerebrum/blobs/{digest[:2]}/{digest}{self.SUFFIX}"
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def put(self, text: str) -> str:
+        """
+        Store text (no-op if already stored).
+
+        Returns:
+            Digest to read it back with
+        """
+
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+
+        if path.exists():
+            return digest
+
+        # Write to a temp file and rename: readers never see a partial blob
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=self.compresslevel, mtime=0) as gz:
+                    gz.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        return digest
+
+    def open(self, digest: str) -> IO[str]:
+        """
+        Text stream of a blob, decompressed as it is read.
+
+        Raises:
+            FileNotFoundError: No blob with this digest
+        """
+        return gzip.open(self.path(digest), mode='rt', encoding='utf-8')
+
+    def read(self, digest: str) -> str:
+        """Whole text of a blob."""
+        with self.open(digest) as stream:
+            return stream.read()
+
+    def excerpt(self, digest: str, chars: int = 800) -> str:
+        """First chars characters (only that much is decompressed)."""
+        with self.open(digest) as stream:
+            return stream.read(chars)
+
+    def stats(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Compressed and original size of a blob (None if missing)."""
+
+        path = self.path(digest)
+        if not path.exists():
+            return None
+
+        # gzip trailer: original size mod 2^32 in the last 4 bytes
+        with open(path, 'rb') as handle:
+            handle.seek(-4, os.SEEK_END)
+            original = int.from_bytes(handle.read(4), 'little')
+
+        return {'compressed_bytes': path.stat().st_size, 'original_bytes': original}
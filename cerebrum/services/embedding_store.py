@@ -0,0 +1,448 @@
+"""Embedding Store: Content-addressed vector store for vault notes.
+
+Layout under `.cerebrum/embedding_store/`:
+- vectors.f32: float32 matrix (rows x dim), memory-mapped
+- index.db: SQLite id → row, content hash, model, metadata
+
+A note is only re-embedded when the normalized hash of its embedding
+text (or the embedding model) changes. Shared by linking, search and
+deduplication so every feature reuses the same vectors.
+
+Searches filtered by kind (e.g. {'kind': 'note'}) read that kind's rows
+from a per-kind row index, rebuilt only after the set of entries of the
+kind changes.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """Memory-mapped float32 vectors with a SQLite id index."""
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, store_path: Path, model: str):
+        self.store_path = store_path
+        self.model = model
+
+        self.store_path.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = store_path / "vectors.f32"
+
+        self._lock = threading.RLock()
+
+        self._conn = sqlite3.connect(
+            str(store_path / "index.db"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                id TEXT PRIMARY KEY,
+                row INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                updated REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.commit()
+
+        self.dim: Optional[int] = self._get_meta('dim', int)
+        self.capacity: int = self._get_meta('capacity', int) or 0
+        self._matrix: Optional[np.memmap] = None
+
+        if self.dim and self.vectors_path.exists():
+            self._open_matrix()
+
+        # In-memory view of the index (refreshed on writes)
+        self._entries: Dict[str, Tuple[int, str, str, Dict[str, Any]]] = {}
+        self._load_entries()
+
+        used = {entry[0] for entry in self._entries.values()}
+        self._free_rows = [r for r in range(self.capacity - 1, -1, -1) if r not in used]
+
+        # kind (None = any) → (rows ascending, ids in row order) of
+        # entries of the current model; built on first search
+        self._kind_rows: Dict[Optional[str], Tuple[np.ndarray, List[str]]] = {}
+
+    @classmethod
+    def for_vault(cls, vault_path: Path, model: str) -> 'EmbeddingStore':
+        """Create store in the vault's .cerebrum directory."""
+        return cls(vault_path / ".cerebrum" / "embedding_store", model=model)
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Hash of normalized text (unicode form, case and whitespace)."""
+        normalized = unicodedata.normalize('NFC', text)
+        normalized = re.sub(r'\s+', ' ', normalized).strip().lower()
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def ensure(
+        self,
+        items: List[Tuple[str, str, Dict[str, Any]]],
+        embed_fn: Callable[[List[str]], List[Optional[List[float]]]]
+    ) -> Dict[str, Any]:
+        """
+        Make sure every item has an up-to-date vector.
+
+        Args:
+            items: (id, embedding_text, metadata) tuples
+            embed_fn: Batched embedder, e.g. LLMService.embed (None = failed)
+
+        Returns:
+            Dict with:
+                - embedded: ids sent to the model
+                - unchanged: count of ids whose hash matched
+                - failed: ids the model could not embed
+        """
+
+        stale = []
+        unchanged = 0
+
+        with self._lock:
+            for item_id, text, metadata in items:
+                digest = self.content_hash(text)
+                entry = self._entries.get(item_id)
+
+                if entry and entry[1] == digest and entry[2] == self.model:
+                    unchanged += 1
+                    if entry[3] != metadata:
+                        self._update_metadata(item_id, metadata)
+                    continue
+
+                stale.append((item_id, text, metadata, digest))
+
+        if not stale:
+            return {'embedded': [], 'unchanged': unchanged, 'failed': []}
+
+        vectors = embed_fn([text for _, text, _, _ in stale])
+
+        embedded = []
+        failed = []
+
+        with self._lock:
+            for (item_id, _, metadata, digest), vector in zip(stale, vectors):
+                if not vector:
+                    failed.append(item_id)
+                    continue
+
+                self._put(item_id, vector, digest, metadata)
+                embedded.append(item_id)
+
+            self._conn.commit()
+            if self._matrix is not None:
+                self._matrix.flush()
+
+        return {'embedded': embedded, 'unchanged': unchanged, 'failed': failed}
+
+    def get(self, item_id: str) -> Optional[np.ndarray]:
+        """Get (unit-length) vector for id."""
+
+        with self._lock:
+            entry = self._entries.get(item_id)
+            if entry is None or self._matrix is None:
+                return None
+            return np.array(self._matrix[entry[0]])
+
+    def metadata(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Get stored metadata for id."""
+        entry = self._entries.get(item_id)
+        return entry[3] if entry else None
+
+    def search(
+        self,
+        vector,
+        top_k: int = 10,
+        exclude_ids: Optional[set] = None,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Cosine similarity search.
+
+        Args:
+            vector: Query vector
+            top_k: Number of results
+            exclude_ids: Ids to skip
+            where: Metadata equality filter, e.g. {'kind': 'note'}
+
+        Returns:
+            List of {'id', 'score', 'metadata'} sorted by score desc
+        """
+
+        query = self._normalize(np.asarray(vector, dtype=np.float32))
+
+        with self._lock:
+            if self._matrix is None or query.shape[0] != self.dim:
+                return []
+
+            rows, ids = self._rows(where)
+            scores = self._vectors(rows) @ query
+
+            available = len(ids)
+            if exclude_ids:
+                excluded = [
+                    self._entries[i][0] for i in exclude_ids if i in self._entries
+                ]
+                mask = np.isin(rows, excluded)
+                scores[mask] = -np.inf
+                available -= int(mask.sum())
+
+            if available <= 0:
+                return []
+
+            k = min(top_k, available)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [self._result(ids[i], scores[i]) for i in top]
+
+    def search_batch(
+        self,
+        vectors: List[Any],
+        top_k: int = 1,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Cosine similarity search for several queries in one matrix product.
+
+        Args:
+            vectors: Query vectors (all of the store's dimension)
+            top_k: Results per query
+            where: Metadata equality filter
+
+        Returns:
+            One result list per query, as in search()
+        """
+
+        if not vectors:
+            return []
+
+        queries = np.stack([
+            self._normalize(np.asarray(v, dtype=np.float32)) for v in vectors
+        ])
+
+        with self._lock:
+            if self._matrix is None or queries.shape[1] != self.dim:
+                return [[] for _ in vectors]
+
+            rows, ids = self._rows(where)
+            if not ids:
+                return [[] for _ in vectors]
+
+            scores = queries @ self._vectors(rows).T  # queries x candidates
+
+            k = min(top_k, len(ids))
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+            results = []
+            for query_scores, query_top in zip(scores, top):
+                query_top = query_top[np.argsort(-query_scores[query_top])]
+                results.append([self._result(ids[i], query_scores[i]) for i in query_top])
+
+        return results
+
+    def ids(self, where: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Ids whose metadata matches where."""
+        with self._lock:
+            return [
+                item_id for item_id, entry in self._entries.items()
+                if self._matches(entry[3], where)
+            ]
+
+    def _rows(self, where: Optional[Dict[str, Any]]) -> Tuple[np.ndarray, List[str]]:
+        """(rows, ids) of searchable entries matching where (lock held).
+
+        A filter on kind alone (or no filter) comes from the per-kind row
+        index; other filters scan the entries.
+        """
+
+        where = where or {}
+        if set(where) - {'kind'}:
+            return self._select(lambda metadata: self._matches(metadata, where))
+
+        kind = where.get('kind')
+        cached = self._kind_rows.get(kind)
+        if cached is None:
+            cached = self._select(
+                lambda metadata: kind is None or metadata.get('kind') == kind
+            )
+            self._kind_rows[kind] = cached
+        return cached
+
+    def _select(
+        self,
+        keep: Callable[[Dict[str, Any]], bool]
+    ) -> Tuple[np.ndarray, List[str]]:
+        """(rows ascending, ids) of current-model entries kept (lock held)."""
+
+        selected = sorted(
+            (entry[0], item_id)
+            for item_id, entry in self._entries.items()
+            if entry[2] == self.model and keep(entry[3])
+        )
+        rows = np.fromiter((row for row, _ in selected), dtype=np.int64, count=len(selected))
+        return rows, [item_id for _, item_id in selected]
+
+    def _vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Matrix rows; a contiguous run is read as a slice (lock held)."""
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            return self._matrix[rows[0]:rows[-1] + 1]
+        return self._matrix[rows]
+
+    def _result(self, item_id: str, score: float) -> Dict[str, Any]:
+        return {'id': item_id, 'score': float(score), 'metadata': self._entries[item_id][3]}
+
+    def remove(self, ids: List[str]) -> None:
+        """Remove ids from the index (their rows become free)."""
+
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM entries WHERE id = ?", [(i,) for i in ids]
+            )
+            self._conn.commit()
+            for item_id in ids:
+                entry = self._entries.pop(item_id, None)
+                if entry:
+                    self._free_rows.append(entry[0])
+            self._kind_rows.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(
+        self,
+        item_id: str,
+        vector: List[float],
+        digest: str,
+        metadata: Dict[str, Any]
+    ) -> None:
+        """Write vector and index entry (lock held)."""
+
+        array = np.asarray(vector, dtype=np.float32)
+
+        if self.dim is None or array.shape[0] != self.dim:
+            # First vector, or embedding model changed dimension
+            self._reset(array.shape[0])
+
+        entry = self._entries.get(item_id)
+        row = entry[0] if entry else self._allocate_row()
+        if entry is None or entry[2] != self.model or entry[3].get('kind') != metadata.get('kind'):
+            self._kind_rows.clear()
+
+        self._matrix[row] = self._normalize(array)
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries "
+            "(id, row, content_hash, model, metadata, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            (item_id, row, digest, self.model, json.dumps(metadata), time.time())
+        )
+        self._entries[item_id] = (row, digest, self.model, metadata)
+
+    def _update_metadata(self, item_id: str, metadata: Dict[str, Any]) -> None:
+        """Refresh metadata of an unchanged entry (lock held)."""
+        row, digest, model, previous = self._entries[item_id]
+        if previous.get('kind') != metadata.get('kind'):
+            self._kind_rows.clear()
+        self._conn.execute(
+            "UPDATE entries SET metadata = ? WHERE id = ?",
+            (json.dumps(metadata), item_id)
+        )
+        self._entries[item_id] = (row, digest, model, metadata)
+
+    def _allocate_row(self) -> int:
+        """Take a free row, growing the matrix if needed (lock held)."""
+
+        if not self._free_rows:
+            self._grow(max(self.INITIAL_CAPACITY, self.capacity * 2))
+
+        return self._free_rows.pop()
+
+    def _grow(self, new_capacity: int) -> None:
+        """Extend vectors file and remap (lock held)."""
+
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(new_capacity * self.dim * 4)
+
+        # Pop order hands out low rows first
+        self._free_rows = (
+            list(range(new_capacity - 1, self.capacity - 1, -1)) + self._free_rows
+        )
+        self.capacity = new_capacity
+        self._set_meta('capacity', new_capacity)
+        self._open_matrix()
+
+    def _reset(self, dim: int) -> None:
+        """Drop all vectors and start over with new dimension (lock held)."""
+
+        self._matrix = None
+        self._conn.execute("DELETE FROM entries")
+        self._entries = {}
+        self._kind_rows.clear()
+
+        if self.vectors_path.exists():
+            self.vectors_path.unlink()
+
+        self.dim = dim
+        self.capacity = 0
+        self._free_rows = []
+        self._set_meta('dim', dim)
+        self._grow(self.INITIAL_CAPACITY)
+
+    def _open_matrix(self) -> None:
+        self._matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode='r+',
+            shape=(self.capacity, self.dim)
+        )
+
+    def _load_entries(self) -> None:
+        for item_id, row, digest, model, metadata in self._conn.execute(
+            "SELECT id, row, content_hash, model, metadata FROM entries"
+        ):
+            self._entries[item_id] = (row, digest, model, json.loads(metadata))
+
+    def _get_meta(self, key: str, cast):
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return cast(row[0]) if row else None
+
+    def _set_meta(self, key: str, value) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, str(value))
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    @staticmethod
+    def _matches(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+        if not where:
+            return True
+        return all(metadata.get(k) == v for k, v in where.items())
+
+    def close(self) -> None:
+        """Flush vectors and close index."""
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._conn.close()
@@ -0,0 +1,532 @@
+"""Fake LLM: Deterministic stand-in backend for benchmarks and CI.
+
+Two ways to use it:
+- In-process: LLMService(provider="fake", fake_backend=FakeBackend(...))
+- HTTP: FakeOllamaServer speaks the Ollama API (/api/generate,
+  /api/embed, /api/embeddings, /api/tags, /api/ps), so the real Ollama
+  client path (pooling, retries, streaming, warm-up) is exercised too
+
+Responses come from a replay file (recorded with ResponseRecorder),
+from canned {substring: response} rules, or are synthesized per
+pipeline stage so Orchestrator.process runs end to end. Latency is
+modeled as prompt eval (tokens/sec) + time to first token + output
+tokens/sec; error injection fails a fraction of calls with HTTP 503.
+Like Ollama, the prefix shared with the previous prompt is not
+re-evaluated (and not counted in prompt_eval_count).
+
+Run a server:
+    python -m cerebrum.services.fake_llm --port 11434 --output-tps 30
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, List
+
+from cerebrum.services.resilience import RetryableLLMError
+from cerebrum.services.tokens import TokenEstimator
+
+
+def prompt_key(prompt: str) -> str:
+    """Replay key of a prompt."""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+class ResponseRecorder:
+    """Appends (prompt, response) pairs to a JSONL replay file.
+
+    Attach to a real service (llm.recorder = ResponseRecorder(path)) and
+    replay later with FakeBackend(replay_path=path).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def record(self, model: str, prompt: str, response: str) -> None:
+        line = json.dumps({
+            'key': prompt_key(prompt),
+            'model': model,
+            'prompt_preview': prompt[:200],
+            'response': response
+        }, ensure_ascii=False)
+
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+class FakeBackend:
+    """Deterministic responses with a simple latency and failure model."""
+
+    def __init__(
+        self,
+        replay_path: Optional[Path] = None,
+        canned: Optional[Dict[str, str]] = None,
+        strict: bool = False,
+        ttft: float = 0.0,
+        prompt_tps: float = 0.0,
+        output_tps: float = 0.0,
+        error_rate: float = 0.0,
+        embedding_dim: int = 384,
+        seed: int = 0,
+        slots: Optional[int] = None
+    ):
+        """
+        Args:
+            replay_path: JSONL from ResponseRecorder (matched by prompt hash)
+            canned: {substring: response}; first rule found in the prompt wins
+            strict: Fail prompts with no replay/canned match instead of
+                synthesizing a response
+            ttft: Seconds before the first output token
+            prompt_tps: Prompt eval speed in tokens/sec (0 = instant)
+            output_tps: Generation speed in tokens/sec (0 = instant)
+            error_rate: Fraction of calls failing with a retryable 503
+            embedding_dim: Size of fake embedding vectors
+            seed: Seed for error injection
+            slots: Generations run at once (like OLLAMA_NUM_PARALLEL);
+                further requests wait. None = unlimited
+        """
+        self.canned = canned or {}
+        self.strict = strict
+        self.ttft = ttft
+        self.prompt_tps = prompt_tps
+        self.output_tps = output_tps
+        self.error_rate = error_rate
+        self.embedding_dim = embedding_dim
+
+        self.replay: Dict[str, str] = {}
+        if replay_path:
+            self.load_replay(Path(replay_path))
+
+        self.tokens = TokenEstimator()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(slots) if slots else None
+        self._kv_prompt = ""  # Last evaluated prompt (single KV slot)
+
+        # Counters
+        self.calls = 0
+        self.errors = 0
+
+    def load_replay(self, path: Path) -> None:
+        """Load recorded responses (later lines override earlier ones)."""
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.replay[entry['key']] = entry['response']
+
+    def respond(self, prompt: str) -> str:
+        """Response text for prompt (no delay, no failure injection)."""
+
+        recorded = self.replay.get(prompt_key(prompt))
+        if recorded is not None:
+            return recorded
+
+        for needle, response in self.canned.items():
+            if needle in prompt:
+                return response
+
+        if self.strict:
+            raise KeyError(f"No recorded response for prompt {prompt_key(prompt)[:12]}")
+
+        return synthesize_response(prompt)
+
+    def maybe_fail(self) -> None:
+        """Count a call and raise RetryableLLMError at error_rate."""
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+
+        if failed:
+            raise RetryableLLMError("Fake backend injected error (HTTP 503)", status_code=503)
+
+    def count_tokens(self, text: str) -> int:
+        return self.tokens.estimate(text)
+
+    def prefill(self, prompt: str) -> Dict[str, Any]:
+        """Evaluate the part of prompt not shared with the previous one.
+
+        Returns:
+            Dict with prompt_tokens (evaluated) and prompt_eval_seconds
+        """
+
+        with self._lock:
+            shared = len(os.path.commonprefix([self._kv_prompt, prompt]))
+            self._kv_prompt = prompt
+
+        evaluated = self.count_tokens(prompt[shared:])
+        seconds = self._prompt_eval_seconds(evaluated)
+        time.sleep(seconds)
+
+        return {'prompt_tokens': evaluated, 'prompt_eval_seconds': seconds}
+
+    def generate(self, prompt: str, max_tokens: int = 1000) -> Dict[str, Any]:
+        """Blocking generate; returns text and token counts."""
+
+        self.maybe_fail()
+        text = self._truncate(self.respond(prompt), max_tokens)
+
+        with self._slot():
+            usage = self.prefill(prompt)
+            completion_tokens = self.count_tokens(text)
+
+            time.sleep(self.ttft + self._per_token_seconds() * completion_tokens)
+
+        return {
+            'text': text,
+            'completion_tokens': completion_tokens,
+            **usage
+        }
+
+    def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        usage: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """Yield response in token-sized pieces at output_tps.
+
+        usage, if given, receives the prefill() counts.
+        """
+
+        self.maybe_fail()
+        text = self._truncate(self.respond(prompt), max_tokens)
+
+        with self._slot():
+            prefill = self.prefill(prompt)
+            if usage is not None:
+                usage.update(prefill)
+
+            time.sleep(self.ttft)
+
+            delay = self._per_token_seconds()
+            for piece in re.findall(r'\S+\s*|\s+', text):
+                if delay:
+                    time.sleep(delay * self.count_tokens(piece))
+                yield piece
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        """Hold one of the backend's generation slots."""
+        if self._slots is None:
+            yield
+            return
+
+        with self._slots:
+            yield
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Deterministic unit vectors from word hashes (similar text, similar vector)."""
+
+        self.maybe_fail()
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.embedding_dim
+
+        for word in re.findall(r'\w+', text.lower()):
+            digest = hashlib.md5(word.encode('utf-8')).digest()
+            index = int.from_bytes(digest[:4], 'little') % self.embedding_dim
+            vector[index] += 1.0 if digest[4] % 2 else -1.0
+
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        return self.tokens.truncate(text, max_tokens) if max_tokens else text
+
+    def _prompt_eval_seconds(self, prompt_tokens: int) -> float:
+        return prompt_tokens / self.prompt_tps if self.prompt_tps else 0.0
+
+    def _per_token_seconds(self) -> float:
+        return 1.0 / self.output_tps if self.output_tps else 0.0
+
+    def stats(self) -> Dict[str, int]:
+        return {'calls': self.calls, 'errors': self.errors, 'replay_entries': len(self.replay)}
+
+
+def synthesize_response(prompt: str) -> str:
+    """Plausible response for the pipeline stage the prompt belongs to.
+
+    Deterministic in the prompt, so caches and replays stay stable.
+    """
+
+    words = [
+        w for w in re.findall(r'[A-Za-z][a-z]{4,}', prompt)
+        if w.lower() not in _PROMPT_WORDS
+    ]
+    rng = random.Random(prompt_key(prompt))
+
+    def topic(i: int) -> str:
+        if not words:
+            return f"Topic {i + 1}"
+        return words[rng.randrange(len(words))].lower()
+
+    # Step 1: Classification
+    if "knowledge taxonomist" in prompt:
+        return json.dumps({
+            'domain': 'computer-science',
+            'subdomain': topic(0),
+            'content_type': 'concept',
+            'mocs': [f"{topic(1).title()} MOC", f"{topic(2).title()} MOC"],
+            'key_topics': [topic(i) for i in range(4)],
+            'confidence': 0.8
+        }, indent=2)
+
+    # Step 2: Concept extraction (first pass or retry)
+    if "Zettelkasten principles" in prompt or "Extract MORE concepts" in prompt:
+        concepts = []
+        seen = set()
+        for i in range(8):
+            title = f"{topic(i).title()} {topic(i + 1)} principle"
+            if title in seen:
+                title = f"{title} {i + 1}"
+            seen.add(title)
+            concepts.append({
+                'title': title,
+                'definition': f"{title} describes how {topic(i)} relates to {topic(i + 2)}.",
+                'explanation': ' '.join(topic(j) for j in range(60)) + '.',
+                'why_matters': f"It clarifies {topic(i + 3)}.",
+                'applications': [f"Apply to {topic(i + 4)}", f"Apply to {topic(i + 5)}"],
+                'connections': [topic(i + 6).title(), topic(i + 7).title()],
+                'concept_type': 'concept'
+            })
+        return json.dumps(concepts, indent=2)
+
+    # Step 3: LLM linking
+    if "Zettelkasten connections" in prompt:
+        count = len(re.findall(r'^\d+\. \[\[', prompt, re.MULTILINE))
+        return json.dumps([
+            {
+                'note_number': n + 1,
+                'link_type': 'related',
+                'context': f"Both discuss {topic(n)}",
+                'confidence': 0.8
+            }
+            for n in range(min(count, 3))
+        ], indent=2)
+
+    # Anything else: prose
+    return ' '.join(topic(i) for i in range(80)).capitalize() + '.'
+
+
+# Instruction words skipped when picking topics from a prompt
+_PROMPT_WORDS = {
+    'return', 'valid', 'other', 'concept', 'concepts', 'title', 'content',
+    'source', 'provide', 'classification', 'domain', 'subdomain', 'should',
+    'specific', 'which', 'their', 'there', 'these', 'about', 'expert',
+    'clear', 'descriptive', 'definition', 'explanation', 'matters',
+    'applications', 'connections', 'related', 'principle', 'model',
+    'evidence', 'mechanism', 'application', 'confidence', 'sample',
+    'array', 'format', 'atomic', 'notes', 'links', 'candidate',
+}
+
+
+class FakeOllamaServer:
+    """Threaded HTTP server speaking the subset of the Ollama API we use."""
+
+    def __init__(
+        self,
+        backend: Optional[FakeBackend] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        models: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            backend: Response/latency model (default FakeBackend())
+            host: Bind address
+            port: Bind port (0 = pick a free one)
+            models: Names reported by /api/tags
+        """
+        self.backend = backend or FakeBackend()
+        self.models = models or ["llama3.2:latest", "nomic-embed-text:latest"]
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve in a background thread; returns base URL."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like Ollama
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path in ("/api/tags", "/api/ps"):
+                    self._json(200, {
+                        'models': [{'name': m, 'model': m} for m in server.models]
+                    })
+                else:
+                    self._json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                except json.JSONDecodeError:
+                    self._json(400, {'error': 'invalid JSON'})
+                    return
+
+                try:
+                    if self.path == "/api/generate":
+                        self._generate(payload)
+                    elif self.path == "/api/embed":
+                        inputs = payload.get('input', [])
+                        if isinstance(inputs, str):
+                            inputs = [inputs]
+                        self._json(200, {
+                            'model': payload.get('model'),
+                            'embeddings': server.backend.embed(inputs)
+                        })
+                    elif self.path == "/api/embeddings":
+                        vector = server.backend.embed([payload.get('prompt', '')])[0]
+                        self._json(200, {'embedding': vector})
+                    else:
+                        self._json(404, {'error': 'not found'})
+                except RetryableLLMError as e:
+                    self._json(503, {'error': str(e)})
+                except KeyError as e:
+                    self._json(404, {'error': str(e)})
+
+            def _generate(self, payload: Dict[str, Any]) -> None:
+                backend = server.backend
+                prompt = payload.get('prompt', '')
+                model = payload.get('model')
+                max_tokens = (payload.get('options') or {}).get('num_predict', 1000)
+
+                if not prompt:
+                    # Load request (warm-up): nothing to generate
+                    self._json(200, {'model': model, 'response': '', 'done': True,
+                                     'done_reason': 'load'})
+                    return
+
+                if payload.get('stream', True) is False:
+                    result = backend.generate(prompt, max_tokens)
+                    self._json(200, {
+                        'model': model,
+                        'response': result['text'],
+                        'done': True,
+                        'prompt_eval_count': result['prompt_tokens'],
+                        'prompt_eval_duration': int(result['prompt_eval_seconds'] * 1e9),
+                        'eval_count': result['completion_tokens']
+                    })
+                    return
+
+                usage: Dict[str, Any] = {}
+                pieces = backend.stream(prompt, max_tokens, usage)
+                first = next(pieces, None)  # Errors surface before headers
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+                text = []
+                try:
+                    for piece in ([first] if first is not None else []):
+                        text.append(piece)
+                        self._chunk({'model': model, 'response': piece, 'done': False})
+                    for piece in pieces:
+                        text.append(piece)
+                        self._chunk({'model': model, 'response': piece, 'done': False})
+
+                    self._chunk({
+                        'model': model,
+                        'response': '',
+                        'done': True,
+                        'prompt_eval_count': usage.get('prompt_tokens', 0),
+                        'prompt_eval_duration': int(usage.get('prompt_eval_seconds', 0) * 1e9),
+                        'eval_count': backend.count_tokens(''.join(text))
+                    })
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pieces.close()  # Client stopped reading: stop generating
+
+            def _chunk(self, data: Dict[str, Any]) -> None:
+                body = (json.dumps(data) + "\n").encode('utf-8')
+                self.wfile.write(f"{len(body):x}\r\n".encode('ascii') + body + b"\r\n")
+                self.wfile.flush()
+
+            def _json(self, status: int, data: Dict[str, Any]) -> None:
+                body = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fake Ollama server for benchmarks")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--replay', type=Path, help="JSONL recorded with ResponseRecorder")
+    parser.add_argument('--strict', action='store_true', help="404 on prompts not in replay")
+    parser.add_argument('--ttft', type=float, default=0.0, help="Seconds to first token")
+    parser.add_argument('--prompt-tps', type=float, default=0.0, help="Prompt eval tokens/sec")
+    parser.add_argument('--output-tps', type=float, default=0.0, help="Output tokens/sec")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of 503s")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--slots', type=int, help="Concurrent generations (default unlimited)")
+    args = parser.parse_args(argv)
+
+    backend = FakeBackend(
+        replay_path=args.replay,
+        strict=args.strict,
+        ttft=args.ttft,
+        prompt_tps=args.prompt_tps,
+        output_tps=args.output_tps,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        slots=args.slots
+    )
+    server = FakeOllamaServer(backend, host=args.host, port=args.port)
+
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
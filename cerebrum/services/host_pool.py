@@ -0,0 +1,293 @@
+"""Host Pool: Spread Ollama requests over several servers.
+
+- Routing: least outstanding requests (default) or latency-weighted
+  (outstanding requests x recent response time)
+- Per-host concurrency caps: match each server's OLLAMA_NUM_PARALLEL;
+  callers wait for a free slot instead of queueing inside Ollama
+- Health: a host failing failure_threshold times in a row leaves the
+  rotation; it is let back in after cooldown (or as soon as a health
+  check sees it answer again). This is the per-host circuit breaker:
+  while every host is down, requests fail fast with CircuitOpenError.
+  Waiting for a free slot is not a host failure (BackendBusyError)
+- Affinity: requests with the same key (one document) prefer the same
+  host, so its KV cache still holds the document prefix. Preference is
+  rendezvous hashing over healthy hosts, so a host going down only moves
+  its own documents. When the preferred host is full the request spills
+  to the least loaded one rather than waiting.
+
+A pool of one host behaves like a plain host URL.
+"""
+
+import hashlib
+import threading
+import time
+from typing import List, Dict, Any, Optional, Union, Callable
+
+from cerebrum.services.resilience import BackendBusyError, CircuitOpenError
+
+
+HostSpec = Union[str, Dict[str, Any]]
+
+
+class OllamaHost:
+    """One Ollama server and its live routing state."""
+
+    def __init__(self, url: str, max_concurrency: int = 4):
+        self.url = url.rstrip('/')
+        self.max_concurrency = max_concurrency
+
+        self.outstanding = 0
+        self.latency: Optional[float] = None  # EWMA seconds to response
+        self.healthy = True
+        self.failures = 0  # Consecutive
+        self.down_since = 0.0
+
+        # Counters
+        self.requests = 0
+        self.errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'healthy': self.healthy,
+            'outstanding': self.outstanding,
+            'max_concurrency': self.max_concurrency,
+            'latency_seconds': self.latency,
+            'requests': self.requests,
+            'errors': self.errors
+        }
+
+
+class HostLease:
+    """A slot on a host; release() exactly once when the response is consumed."""
+
+    def __init__(self, pool: 'HostPool', host: OllamaHost):
+        self.pool = pool
+        self.host = host
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.pool._release(self.host)
+
+
+class HostPool:
+    """Thread-safe set of Ollama hosts with routing, caps and health."""
+
+    ROUTING = ('least_outstanding', 'latency')
+
+    def __init__(
+        self,
+        hosts: List[HostSpec],
+        max_per_host: int = 4,
+        routing: str = 'least_outstanding',
+        failure_threshold: int = 3,
+        cooldown: float = 15.0,
+        latency_alpha: float = 0.2
+    ):
+        """
+        Args:
+            hosts: URLs or {'url': ..., 'max_concurrency': ...}
+            max_per_host: Cap for hosts that do not set their own
+            routing: 'least_outstanding' or 'latency'
+            failure_threshold: Consecutive failures that take a host down
+            cooldown: Seconds before a down host is tried again
+            latency_alpha: EWMA weight of the newest latency sample
+        """
+
+        if routing not in self.ROUTING:
+            raise ValueError(f"Unknown routing: {routing} (use one of {self.ROUTING})")
+
+        self.hosts = [self._parse(spec, max_per_host) for spec in hosts]
+        if not self.hosts:
+            raise ValueError("At least one Ollama host is required")
+
+        self.routing = routing
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_alpha = latency_alpha
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._checker: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _parse(spec: HostSpec, max_per_host: int) -> OllamaHost:
+        if isinstance(spec, OllamaHost):
+            return spec
+        if isinstance(spec, dict):
+            return OllamaHost(spec['url'], spec.get('max_concurrency') or max_per_host)
+        return OllamaHost(spec, max_per_host)
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    @property
+    def urls(self) -> List[str]:
+        return [host.url for host in self.hosts]
+
+    def capacity(self) -> int:
+        """Total concurrent requests the healthy hosts accept."""
+        with self._cond:
+            return sum(h.max_concurrency for h in self.hosts if h.healthy)
+
+    def acquire(
+        self,
+        affinity: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> HostLease:
+        """
+        Lease a slot on the best host, waiting while all are at their cap.
+
+        Args:
+            affinity: Key whose requests should stay on one host
+            timeout: Max seconds to wait for a slot (None = no limit)
+
+        Raises:
+            CircuitOpenError: No healthy host
+            BackendBusyError: No free slot within timeout
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                healthy = self._healthy_hosts()
+                if not healthy:
+                    raise CircuitOpenError(
+                        f"No healthy Ollama host ({', '.join(self.urls)})"
+                    )
+
+                host = self._pick(healthy, affinity)
+                if host is not None:
+                    host.outstanding += 1
+                    host.requests += 1
+                    return HostLease(self, host)
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise BackendBusyError("All Ollama hosts busy (no free slot)")
+
+                # Re-check periodically: a down host may come back
+                self._cond.wait(min(remaining, 1.0) if remaining is not None else 1.0)
+
+    def _healthy_hosts(self) -> List[OllamaHost]:
+        """Healthy hosts; down hosts past their cooldown get another chance."""
+
+        now = time.monotonic()
+        for host in self.hosts:
+            if not host.healthy and now - host.down_since >= self.cooldown:
+                host.healthy = True
+                host.failures = self.failure_threshold - 1  # One strike left
+
+        return [h for h in self.hosts if h.healthy]
+
+    def _pick(self, healthy: List[OllamaHost], affinity: Optional[str]) -> Optional[OllamaHost]:
+        """Host for the next request, or None while all are full."""
+
+        free = [h for h in healthy if h.outstanding < h.max_concurrency]
+        if not free:
+            return None
+
+        if affinity is not None and len(healthy) > 1:
+            preferred = max(healthy, key=lambda h: self._rendezvous(affinity, h.url))
+            if preferred in free:
+                return preferred
+
+        return min(free, key=self._load)
+
+    def _load(self, host: OllamaHost):
+        """Sort key: lower is a better target."""
+
+        share = host.outstanding / host.max_concurrency
+
+        if self.routing == 'latency':
+            # Unmeasured hosts count as fast so they get sampled
+            return ((host.outstanding + 1) * (host.latency or 0.0), share)
+
+        return (share, host.latency or 0.0)
+
+    @staticmethod
+    def _rendezvous(key: str, url: str) -> int:
+        digest = hashlib.blake2b(f"{key}\0{url}".encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    def _release(self, host: OllamaHost) -> None:
+        with self._cond:
+            host.outstanding -= 1
+            self._cond.notify_all()
+
+    def record_success(self, host: OllamaHost, seconds: float) -> None:
+        """Host answered; seconds is the time to its response."""
+
+        with self._cond:
+            host.failures = 0
+            host.healthy = True
+            if host.latency is None:
+                host.latency = seconds
+            else:
+                host.latency += self.latency_alpha * (seconds - host.latency)
+
+    def record_failure(self, host: OllamaHost) -> None:
+        """Host unreachable or overloaded; enough in a row take it down."""
+
+        with self._cond:
+            host.errors += 1
+            host.failures += 1
+            if host.healthy and host.failures >= self.failure_threshold:
+                host.healthy = False
+                host.down_since = time.monotonic()
+            self._cond.notify_all()
+
+    def check_health(self, probe: Callable[[str], bool]) -> int:
+        """
+        Probe every host now and update its health.
+
+        Args:
+            probe: probe(url) -> True if the server answers
+
+        Returns:
+            Number of healthy hosts
+        """
+
+        for host in self.hosts:
+            try:
+                ok = probe(host.url)
+            except Exception:
+                ok = False
+
+            with self._cond:
+                if ok:
+                    host.healthy = True
+                    host.failures = 0
+                elif host.healthy:
+                    host.healthy = False
+                    host.down_since = time.monotonic()
+                self._cond.notify_all()
+
+        with self._cond:
+            return sum(1 for h in self.hosts if h.healthy)
+
+    def start_health_checks(
+        self,
+        probe: Callable[[str], bool],
+        interval: float = 10.0
+    ) -> None:
+        """Probe hosts every interval seconds in a daemon thread."""
+
+        if self._checker is not None:
+            return
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                self.check_health(probe)
+
+        self._checker = threading.Thread(target=run, name="ollama-health", daemon=True)
+        self._checker.start()
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            return {host.url: host.stats() for host in self.hosts}
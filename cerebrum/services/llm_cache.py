@@ -0,0 +1,187 @@
+"""LLM Cache: Persistent, content-addressed cache of LLM responses.
+
+Stored in SQLite under `.cerebrum/llm_cache.db`:
+- Key: hash of provider + model + prompt hash + sampling params
+- LRU eviction once total size exceeds max_bytes
+- Entries older than ttl_seconds are treated as misses
+
+Re-running the same prompts costs a disk read instead of model time.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+class LLMCache:
+    """Disk-backed LRU cache for LLM responses."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 30 * 24 * 3600
+    ):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)"
+        )
+        self._conn.commit()
+
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    @classmethod
+    def for_vault(cls, vault_path: Path, **options) -> 'LLMCache':
+        """Create cache in the vault's .cerebrum directory."""
+        return cls(vault_path / ".cerebrum" / "llm_cache.db", **options)
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        **params
+    ) -> str:
+        """Build content-addressed cache key for a request."""
+        key_data = {
+            'provider': provider,
+            'model': model,
+            'prompt': hashlib.sha256(prompt.encode('utf-8')).hexdigest(),
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'params': params
+        }
+        encoded = json.dumps(key_data, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get cached response (None on miss or expiry)."""
+
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created, size FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created, size = row
+
+            if self.ttl_seconds is not None and now - created > self.ttl_seconds:
+                # Expired: drop it
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total_bytes -= size
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return response
+
+    def set(self, key: str, response: str) -> None:
+        """Store response, evicting least recently used entries if needed."""
+
+        now = time.time()
+        size = len(response.encode('utf-8'))
+
+        if size > self.max_bytes:
+            return  # Would evict everything else
+
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, response, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Evict LRU entries down to 90% of max_bytes (lock held)."""
+
+        target = int(self.max_bytes * 0.9)
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        )
+
+        to_delete = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            to_delete.append((key,))
+            self._total_bytes -= size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+        lookups = self.hits + self.misses
+
+        return {
+            'entries': entries,
+            'size_bytes': self._total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0.0
+        }
+
+    def close(self) -> None:
+        """Close database connection."""
+        with self._lock:
+            self._conn.close()
@@ -4,14 +4,78 @@ Priority:
 1. Ollama (local) - llama3.2 or similar
 2. Gemini (fallback) - if Ollama unavailable
 
+provider="fake" runs against an in-process FakeBackend (benchmarks, CI);
+CEREBRUM_LLM_PROVIDER=fake makes create_default() pick it.
+
+Prompt prefixes: generate(prompt, prefix=document) sends prefix + prompt.
+Stages that open with the same document prefix let Ollama reuse the
+prefix's KV cache (same model, num_ctx and loaded instance); the tokens
+and prefill time it skipped are recorded in telemetry.
+
+Several Ollama servers: pass ollama_hosts (or set CEREBRUM_OLLAMA_HOSTS)
+to spread requests over a HostPool. Calls made inside
+`with llm.document(key):` stick to one host so that host's KV cache
+keeps the document prefix.
+
 Simple, reliable, works.
 """
 
 import os
-from typing import Optional, Dict, Any
+import copy
+import time
+import asyncio
+import threading
+import weakref
+import contextvars
+from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
+from cerebrum.services.llm_cache import LLMCache
+from cerebrum.utils.config import Config
+from cerebrum.services.singleflight import SingleFlight
+from cerebrum.services.resilience import (
+    LLMError, RetryableLLMError, RetryPolicy, CircuitBreaker,
+    call_with_policy, DEFAULT_POLICIES, RETRYABLE_STATUS
+)
+from cerebrum.services.tokens import TokenEstimator, TokenUsage
+from cerebrum.services import tokens as token_utils
+from cerebrum.services.fake_llm import FakeBackend, ResponseRecorder
+from cerebrum.services.telemetry import Telemetry, CallRecord
+from cerebrum.services.host_pool import HostPool, HostLease
+
+
+# Reported prompt tokens below this share of the estimate mean the
+# provider reused a cached prefix
+PREFIX_REUSE_RATIO = 0.6
+
+# llm config keys passed to the constructor by create_default(vault_path)
+CONFIG_OPTIONS = ('pool_connections', 'pool_maxsize', 'max_concurrency')
+
+# Document the current call belongs to (host affinity, telemetry).
+# A context variable, so asyncio.to_thread workers inherit it.
+_DOCUMENT: contextvars.ContextVar = contextvars.ContextVar('llm_document', default=None)
+
+
+class EmbeddingResult:
+    """Result of a batched embedding call.
+
+    embeddings[i] is None when text i failed; errors maps that index
+    to the reason.
+    """
+
+    def __init__(self, size: int):
+        self.embeddings: List[Optional[List[float]]] = [None] * size
+        self.errors: Dict[int, str] = {}
+
+    @property
+    def success(self) -> bool:
+        return not self.errors
+
 
 class LLMService:
     """Unified LLM service supporting Ollama and Gemini."""
@@ -21,12 +85,74 @@ class LLMService:
         provider: str = "ollama",
         model: Optional[str] = None,
         ollama_host: str = "http://localhost:11434",
-        gemini_api_key: Optional[str] = None
+        gemini_api_key: Optional[str] = None,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        max_concurrency: int = 8,
+        cache: Optional[LLMCache] = None,
+        embedding_model: Optional[str] = None,
+        embed_batch_size: int = 64,
+        embed_batch_chars: int = 64000,
+        retry_policies: Optional[Dict[str, Any]] = None,
+        context_window: Optional[int] = None,
+        fake_backend: Optional[FakeBackend] = None,
+        recorder: Optional[ResponseRecorder] = None,
+        keep_alive: str = "30m",
+        ollama_hosts: Optional[List[Any]] = None,
+        host_routing: str = "least_outstanding",
+        max_per_host: Optional[int] = None
     ):
         self.provider = provider
-        self.ollama_host = ollama_host
         self.gemini_api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
 
+        # Deadlines, retries and circuit breaker per provider.
+        # retry_policies: {provider: RetryPolicy or config dict}; keys a
+        # dict leaves out keep the provider's default
+        self.policies = dict(DEFAULT_POLICIES)
+        for name, policy in (retry_policies or {}).items():
+            if isinstance(policy, dict):
+                policy = RetryPolicy.from_dict(policy, base=self.policies.get(name))
+            self.policies[name] = policy
+
+        # Ollama has no provider-wide breaker: the host pool keeps one
+        # per host (its health), so a dead or saturated host does not
+        # fail requests the other hosts could serve
+        self.breakers = {
+            name: CircuitBreaker(name, policy.failure_threshold, policy.cooldown)
+            for name, policy in self.policies.items()
+            if name != "ollama"
+        }
+
+        # Ollama servers: URLs or {'url', 'max_concurrency'} dicts.
+        # max_per_host caps in-flight requests per server (default
+        # pool_maxsize, i.e. only the connection pool limits a lone host)
+        self.hosts = HostPool(
+            ollama_hosts or [ollama_host],
+            max_per_host=max_per_host or pool_maxsize,
+            routing=host_routing,
+            **self._host_health()
+        )
+        self.ollama_host = self.hosts.urls[0]
+
+        # Pooled keep-alive transport shared by every call (and thread).
+        # pool_connections: number of hosts kept in the pool
+        # pool_maxsize: max open connections per host
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.session = self._create_session(
+            max(pool_connections, len(self.hosts)), pool_maxsize
+        )
+
+        # Async calls in flight per event loop (keep <= pool_maxsize)
+        self.max_concurrency = max_concurrency
+        self._semaphores = weakref.WeakKeyDictionary()
+
+        # Optional persistent response cache (see LLMCache)
+        self.cache = cache
+
+        # Identical concurrent requests share one backend call
+        self.singleflight = SingleFlight()
+
         # Set default models
         if model:
             self.model = model
@@ -34,6 +160,43 @@ class LLMService:
             self.model = "llama3.2"  # Or llama2, mistral, etc.
         elif provider == "gemini":
             self.model = "gemini-1.5-flash"
+        elif provider == "fake":
+            self.model = "fake"
+
+        # Fake backend (provider="fake") and optional response recording
+        # for later replay (see cerebrum.services.fake_llm)
+        self.fake = fake_backend or (FakeBackend() if provider == "fake" else None)
+        self.recorder = recorder
+
+        # Token budgeting (offline estimates, calibrated from usage)
+        self.tokens = TokenEstimator()
+        self.usage = TokenUsage()
+        self.context_window = context_window or self._default_context_window()
+
+        # How long Ollama keeps models loaded after a request, and the
+        # warm-up state per model (see warm_up)
+        self.keep_alive = keep_alive
+        self._warm_state: Dict[str, str] = {}
+        self._warm_lock = threading.Lock()
+
+        # Per-call telemetry, tagged with the calling stage (see for_stage)
+        self.telemetry = Telemetry()
+        self.stage = "default"
+        self._local = threading.local()  # Record of the call in progress
+
+        # Dedicated embedding model (never the generation model)
+        if embedding_model:
+            self.embedding_model = embedding_model
+        elif provider == "gemini":
+            self.embedding_model = "text-embedding-004"
+        elif provider == "fake":
+            self.embedding_model = "fake-embed"
+        else:
+            self.embedding_model = "nomic-embed-text"
+
+        # Batches are capped by item count and total characters
+        self.embed_batch_size = embed_batch_size
+        self.embed_batch_chars = embed_batch_chars
 
         # Test provider
         if provider == "ollama":
@@ -41,36 +204,730 @@ class LLMService:
         elif provider == "gemini" and not self.gemini_api_key:
             raise ValueError("Gemini API key required. Set GEMINI_API_KEY env var.")
 
-    def _test_ollama(self):
-        """Test if Ollama is available."""
+    def _default_context_window(self) -> int:
+        return token_utils.context_window(self.model)
+
+    def count_tokens(self, text: str) -> int:
+        """Estimate tokens of text for this model."""
+        return self.tokens.estimate(text, self.model)
+
+    def fit_tokens(self, text: str, max_tokens: int) -> str:
+        """Truncate text to at most max_tokens (estimated)."""
+        return self.tokens.truncate(text, max_tokens, self.model)
+
+    def input_budget(
+        self,
+        max_output_tokens: int,
+        template: str = "",
+        reserve: int = 64
+    ) -> int:
+        """
+        Tokens left for variable input in a prompt.
+
+        Args:
+            max_output_tokens: Tokens reserved for the completion
+            template: Fixed prompt text around the input
+            reserve: Safety margin for chat template / estimate error
+        """
+        budget = (
+            self.context_window
+            - max_output_tokens
+            - self.count_tokens(template)
+            - reserve
+        )
+        return max(0, budget)
+
+    def _record_usage(
+        self,
+        prompt: str,
+        completion: str,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        prompt_eval_seconds: Optional[float] = None
+    ) -> None:
+        """Record token usage of one call (estimated if not reported).
+
+        prompt_tokens is what the provider evaluated. When it is well
+        below the estimate, the rest was served from the KV cache of a
+        previous prompt with the same prefix (Ollama only counts the
+        tokens it actually evaluates); those are recorded as reused and
+        priced at this call's prefill speed.
+        """
+
+        estimated = prompt_tokens is None or completion_tokens is None
+        reused = 0
+
+        if prompt_tokens is not None:
+            expected = self.count_tokens(prompt)
+            if prompt_tokens < PREFIX_REUSE_RATIO * expected:
+                reused = expected - prompt_tokens  # Not a calibration sample
+            else:
+                self.tokens.calibrate(self.model, prompt, prompt_tokens)
+        else:
+            prompt_tokens = self.count_tokens(prompt)
+
+        if completion_tokens is None:
+            completion_tokens = self.count_tokens(completion)
+
+        self.usage.record(self.model, prompt_tokens + reused, completion_tokens, estimated)
+
+        record = self._active_record()
+        if record is not None:
+            record.prompt_tokens = prompt_tokens + reused
+            record.completion_tokens = completion_tokens
+            record.cached_prompt_tokens = reused
+            if reused and prompt_tokens and prompt_eval_seconds:
+                record.prefill_seconds_saved = (
+                    reused * prompt_eval_seconds / prompt_tokens
+                )
+
+    def _active_record(self) -> Optional[CallRecord]:
+        return getattr(self._local, 'record', None)
+
+    def _activate(self, record: Optional[CallRecord]) -> Optional[CallRecord]:
+        """Make record the call in progress; returns the previous one."""
+        previous = self._active_record()
+        self._local.record = record
+        return previous
+
+    @contextmanager
+    def document(self, key: str) -> Iterator[None]:
+        """
+        Tag calls in this block (and threads it starts via asyncio) as
+        belonging to one document.
+
+        Ollama requests of a document go to the same host while it has
+        a free slot; telemetry records carry the key.
+
+        Args:
+            key: Document identity (e.g. its path)
+        """
+        token = _DOCUMENT.set(key)
         try:
-            response = requests.get(f"{self.ollama_host}/api/tags", timeout=2)
-            if response.status_code != 200:
-                raise Exception("Ollama not responding")
-        except Exception as e:
+            yield
+        finally:
+            _DOCUMENT.reset(token)
+
+    def _start_record(self, kind: str, queue_seconds: float = 0.0) -> CallRecord:
+        return CallRecord(
+            stage=self.stage,
+            provider=self.provider,
+            model=self.embedding_model if kind == "embed" else self.model,
+            kind=kind,
+            queue_seconds=queue_seconds,
+            document=_DOCUMENT.get()
+        )
+
+    def _finish_record(self, record: CallRecord, started: float) -> None:
+        record.wall_seconds = time.monotonic() - started
+        self.telemetry.record(record)
+
+    def _count_retry(self, attempt: int, error: Exception) -> None:
+        record = self._active_record()
+        if record is not None:
+            record.retries += 1
+
+    @staticmethod
+    def _create_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+        """Create HTTP session with a connection pool per host.
+
+        The underlying urllib3 pool is thread-safe, so one session can
+        serve concurrent callers; pool_block makes extra callers wait for
+        a free connection instead of opening throwaway ones.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def close(self):
+        """Close pooled connections and stop host health checks."""
+        self.hosts.close()
+        self.session.close()
+
+    def with_model(
+        self,
+        model: Optional[str] = None,
+        provider: Optional[str] = None,
+        context_window: Optional[int] = None
+    ) -> 'LLMService':
+        """
+        Route to another model/provider, sharing this service's state.
+
+        The returned service reuses the connection pool, response cache,
+        single-flight table, circuit breakers, token calibration and
+        usage counters; only model, provider and context window differ.
+        Cache keys include provider and model, so routes never collide.
+
+        Args:
+            model: Model name (None = keep current, or provider default)
+            provider: 'ollama' or 'gemini' (None = keep current)
+            context_window: Override context window (None = model default)
+
+        Returns:
+            LLMService for the route (self if nothing changes)
+        """
+
+        provider = provider or self.provider
+
+        if model is None:
+            if provider == self.provider:
+                model = self.model
+            elif provider == "gemini":
+                model = "gemini-1.5-flash"
+            elif provider == "fake":
+                model = "fake"
+            else:
+                model = "llama3.2"
+
+        if (
+            provider == self.provider
+            and model == self.model
+            and context_window in (None, self.context_window)
+        ):
+            return self
+
+        if provider == "gemini" and not self.gemini_api_key:
+            raise ValueError("Gemini API key required. Set GEMINI_API_KEY env var.")
+        if provider not in ("ollama", "gemini", "fake"):
+            raise ValueError(f"Unknown provider: {provider}")
+
+        routed = copy.copy(self)
+        routed.provider = provider
+        routed.model = model
+        routed.context_window = context_window or routed._default_context_window()
+        if provider == "fake" and routed.fake is None:
+            routed.fake = FakeBackend()
+
+        return routed
+
+    def for_stage(self, stage: str) -> 'LLMService':
+        """Same service, with calls tagged as `stage` in telemetry."""
+        tagged = copy.copy(self)
+        tagged.stage = stage
+        return tagged
+
+    def set_ollama_hosts(
+        self,
+        hosts: List[Any],
+        routing: Optional[str] = None,
+        max_per_host: Optional[int] = None
+    ) -> None:
+        """
+        Replace the Ollama host pool (shared by routes created afterwards).
+
+        Args:
+            hosts: URLs or {'url', 'max_concurrency'} dicts
+            routing: 'least_outstanding' or 'latency' (None = keep)
+            max_per_host: Default per-host cap (None = keep)
+        """
+
+        previous = self.hosts
+        self.hosts = HostPool(
+            hosts,
+            max_per_host=max_per_host or previous.hosts[0].max_concurrency,
+            routing=routing or previous.routing,
+            **self._host_health()
+        )
+        self.ollama_host = self.hosts.urls[0]
+        previous.close()
+
+        # One cached connection pool per host
+        if len(self.hosts) > max(self.pool_connections, len(previous)):
+            self.session.close()
+            self.session = self._create_session(len(self.hosts), self.pool_maxsize)
+
+        if self.provider == "ollama":
+            self._test_ollama()
+
+    def _host_health(self) -> Dict[str, float]:
+        """Per-host breaker settings (from the ollama retry policy)."""
+        policy = self.policies["ollama"]
+        return {'failure_threshold': policy.failure_threshold, 'cooldown': policy.cooldown}
+
+    def _test_ollama(self):
+        """Test if Ollama is available (at least one host answers)."""
+        if self.hosts.check_health(self._probe_host) == 0:
             raise Exception(
-                f"Ollama not available at {self.ollama_host}. "
+                f"Ollama not available at {', '.join(self.hosts.urls)}. "
                 f"Start with: ollama serve\n"
-                f"Install model with: ollama pull {self.model}\n"
-                f"Error: {str(e)}"
+                f"Install model with: ollama pull {self.model}"
+            )
+
+        # Several hosts: keep probing so dead ones leave the rotation
+        # and recovered ones rejoin without waiting for a request
+        if len(self.hosts) > 1:
+            self.hosts.start_health_checks(self._probe_host)
+
+    def _probe_host(self, url: str) -> bool:
+        response = self.session.get(f"{url}/api/tags", timeout=2)
+        response.close()
+        return response.status_code == 200
+
+    def warm_up(
+        self,
+        models: Optional[List[str]] = None,
+        background: bool = True
+    ) -> Optional[threading.Thread]:
+        """
+        Preload models so the first real request skips the cold load.
+
+        Ollama loads a model on a request with no prompt/input and keeps
+        it for keep_alive; every host loads in parallel. Other providers
+        have nothing to load.
+
+        Args:
+            models: Generation or embedding models (default: this
+                service's model and embedding model)
+            background: Load in a daemon thread and return immediately
+
+        Returns:
+            The warm-up thread when background, else None
+        """
+
+        if self.provider != "ollama":
+            return None
+
+        models = list(dict.fromkeys(models or [self.model, self.embedding_model]))
+
+        with self._warm_lock:
+            models = [m for m in models if self._warm_state.get(m) not in ('loading', 'warm')]
+            for model in models:
+                self._warm_state[model] = 'loading'
+
+        if not models:
+            return None
+
+        if not background:
+            self._load_models(models)
+            return None
+
+        thread = threading.Thread(
+            target=self._load_models, args=(models,), name="llm-warm-up", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _load_models(self, models: List[str]) -> None:
+        """Load each model on every host (records warm/failed state)."""
+
+        with ThreadPoolExecutor(max_workers=len(self.hosts)) as executor:
+            failures = list(executor.map(
+                lambda url: self._load_models_on(url, models), self.hosts.urls
+            ))
+
+        for model in models:
+            errors = [f[model] for f in failures if model in f]
+            with self._warm_lock:
+                self._warm_state[model] = f"failed: {errors[0]}" if errors else 'warm'
+
+    def _load_models_on(self, host: str, models: List[str]) -> Dict[str, str]:
+        """Load models on one host; returns {model: error} for failures."""
+
+        errors = {}
+
+        for model in models:
+            # Embedding models cannot be loaded through /api/generate
+            if model == self.embedding_model:
+                url = f"{host}/api/embed"
+                payload = {"model": model, "input": [], "keep_alive": self.keep_alive}
+            else:
+                url = f"{host}/api/generate"
+                payload = {"model": model, "keep_alive": self.keep_alive}
+
+            try:
+                self._post("ollama", url, payload)
+            except Exception as e:
+                errors[model] = f"{host}: {str(e)}"
+
+        return errors
+
+    def model_states(self) -> Dict[str, str]:
+        """
+        Warm/cold state per model.
+
+        Returns:
+            {model: 'warm' | 'cold' | 'loading' | 'failed: ...'}; models
+            every reachable host reports as loaded (/api/ps) are warm,
+            known models some host has since unloaded are cold.
+        """
+
+        with self._warm_lock:
+            states = dict(self._warm_state)
+
+        if self.provider != "ollama":
+            return states
+
+        loaded = None
+        for host in self.hosts.urls:
+            try:
+                response = self.session.get(f"{host}/api/ps", timeout=2)
+                names = {m.get("name") for m in response.json().get("models", [])}
+            except Exception:
+                continue  # Host unreachable: judge by the others
+
+            names |= {name.split(':')[0] for name in names if name.endswith(':latest')}
+            loaded = names if loaded is None else loaded & names
+
+        if loaded is None:
+            return states  # No host reachable: report what we know
+
+        for model in set(states) | {self.model, self.embedding_model}:
+            if model in loaded:
+                states[model] = 'warm'
+            elif states.get(model) != 'loading':
+                states[model] = 'cold'
+
+        return states
+
+    def _post(
+        self,
+        provider: str,
+        url: str,
+        payload: Dict[str, Any],
+        stream: bool = False
+    ) -> requests.Response:
+        """POST under the provider's retry/deadline/breaker policy.
+
+        Returns a 200 response. Raises RetryableLLMError-derived LLMError
+        once retries are exhausted, CircuitOpenError while the backend is
+        marked down, or LLMError for non-retryable HTTP errors.
+        """
+
+        return self._call(
+            provider,
+            lambda timeout: self._send(provider.title(), url, payload, timeout, stream)
+        )
+
+    def _post_ollama(self, path: str, payload: Dict[str, Any]) -> requests.Response:
+        """POST to the best Ollama host (see _ollama_request)."""
+        response, lease = self._ollama_request(path, payload)
+        lease.release()  # Body already read
+        return response
+
+    def _ollama_request(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        stream: bool = False
+    ) -> Tuple[requests.Response, HostLease]:
+        """POST to a host from the pool under the ollama policy.
+
+        Each attempt leases a slot on the host picked for the current
+        document (see document()); a retry may land on another host.
+        Failures count against that host only (HostPool health), not a
+        provider-wide breaker. The caller releases the lease once the
+        response is consumed.
+        """
+
+        def attempt(timeout: float) -> Tuple[requests.Response, HostLease]:
+            waited = time.monotonic()
+            lease = self.hosts.acquire(_DOCUMENT.get(), timeout)
+            host = lease.host
+            started = time.monotonic()
+
+            record = self._active_record()
+            if record is not None:
+                record.host = host.url
+
+            try:
+                response = self._send(
+                    "Ollama", f"{host.url}{path}", payload,
+                    max(0.1, timeout - (started - waited)), stream
+                )
+            except RetryableLLMError:
+                self.hosts.record_failure(host)
+                lease.release()
+                raise
+            except BaseException:
+                lease.release()
+                raise
+
+            self.hosts.record_success(host, time.monotonic() - started)
+            return response, lease
+
+        return self._call("ollama", attempt)
+
+    def _send(
+        self,
+        label: str,
+        url: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        stream: bool
+    ) -> requests.Response:
+        """One POST attempt; raises RetryableLLMError or LLMError unless 200."""
+
+        try:
+            response = self.session.post(
+                url,
+                headers={"Content-Type": "application/json"},
+                json=payload,
+                timeout=timeout,
+                stream=stream
             )
+        except (requests.Timeout, requests.ConnectionError) as e:
+            raise RetryableLLMError(f"{label} request failed: {str(e)}")
+
+        if response.status_code == 200:
+            return response
+
+        text = response.text
+        response.close()
+        message = f"{label} error (HTTP {response.status_code}): {text}"
+
+        if response.status_code in RETRYABLE_STATUS:
+            raise RetryableLLMError(message, status_code=response.status_code)
+        raise LLMError(message, status_code=response.status_code)
+
+    def _call(self, provider: str, attempt):
+        """Run attempt(timeout) under the provider's policy and breaker."""
+        return call_with_policy(
+            attempt,
+            self.policies.get(provider, RetryPolicy()),
+            self.breakers.get(provider),
+            on_retry=self._count_retry
+        )
 
     def generate(
         self,
         prompt: str,
         max_tokens: int = 1000,
         temperature: float = 0.7,
+        use_cache: bool = True,
+        prefix: str = "",
         **kwargs
     ) -> str:
-        """Generate text from prompt."""
+        """Generate text from prompt.
+
+        Responses are served from / stored in self.cache when one is
+        attached; pass use_cache=False to always hit the model. prefix
+        is prepended to the prompt; keep it identical across calls on
+        the same document so the backend can reuse its KV cache.
+        schema=<JSON schema> constrains the output to matching JSON
+        (Ollama format, Gemini responseSchema); it is part of the
+        cache key.
+        """
+        return self._generate(
+            prefix + prompt, max_tokens, temperature, use_cache, 0.0, kwargs,
+            prefix=prefix
+        )
+
+    def _generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        use_cache: bool,
+        queue_seconds: float,
+        kwargs: Dict[str, Any],
+        prefix: str = ""
+    ) -> str:
+        """generate() body; records one telemetry entry per call."""
+
+        started = time.monotonic()
+        record = self._start_record("generate", queue_seconds)
+        if prefix:
+            record.prefix_tokens = self.count_tokens(prefix)
+
+        try:
+            return self._generate_recorded(
+                record, prompt, max_tokens, temperature, use_cache, kwargs
+            )
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            self._finish_record(record, started)
+
+    def _generate_recorded(
+        self,
+        record: CallRecord,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        use_cache: bool,
+        kwargs: Dict[str, Any]
+    ) -> str:
+        request_key = self._request_key(prompt, max_tokens, temperature, **kwargs)
+
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(request_key)
+            if cached is not None:
+                record.cache_hit = True
+                return cached
+
+        executed = []
+
+        def call_backend() -> str:
+            executed.append(True)
+            previous = self._activate(record)
+            try:
+                return call_provider()
+            finally:
+                self._activate(previous)
+
+        def call_provider() -> str:
+            if self.provider == "ollama":
+                response = self._generate_ollama(prompt, max_tokens, temperature, **kwargs)
+            elif self.provider == "gemini":
+                response = self._generate_gemini(prompt, max_tokens, temperature, **kwargs)
+            elif self.provider == "fake":
+                response = self._generate_fake(prompt, max_tokens, temperature, **kwargs)
+            else:
+                raise ValueError(f"Unknown provider: {self.provider}")
+
+            if self.cache is not None and use_cache and response:
+                self.cache.set(request_key, response)
+
+            if self.recorder is not None and response:
+                self.recorder.record(self.model, prompt, response)
+
+            return response
+
+        response = self.singleflight.do(request_key, call_backend)
+        record.coalesced = not executed  # Shared another caller's call
+        return response
+
+    def _request_key(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> str:
+        """Identity of a request (cache key and single-flight key)."""
+        return LLMCache.make_key(
+            self.provider, self.model, prompt, temperature, max_tokens, **kwargs
+        )
+
+    def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        use_cache: bool = True,
+        prefix: str = "",
+        **kwargs
+    ) -> Iterator[str]:
+        """Generate text from prompt, yielding chunks as they arrive.
+
+        Closing the iterator early closes the HTTP stream, which stops
+        generation on the server. Only fully streamed responses are
+        cached; a cache hit yields the whole response at once. prefix
+        works as in generate().
+        """
+
+        started = time.monotonic()
+        record = self._start_record("stream")
+        if prefix:
+            record.prefix_tokens = self.count_tokens(prefix)
+            prompt = prefix + prompt
+
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self._request_key(prompt, max_tokens, temperature, **kwargs)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                record.cache_hit = True
+                self._finish_record(record, started)
+                yield cached
+                return
 
         if self.provider == "ollama":
-            return self._generate_ollama(prompt, max_tokens, temperature, **kwargs)
+            stream = self._stream_ollama(prompt, max_tokens, temperature, **kwargs)
         elif self.provider == "gemini":
-            return self._generate_gemini(prompt, max_tokens, temperature, **kwargs)
+            stream = self._stream_gemini(prompt, max_tokens, temperature, **kwargs)
+        elif self.provider == "fake":
+            stream = self._stream_fake(prompt, max_tokens, temperature, **kwargs)
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
 
+        parts = []
+        try:
+            while True:
+                # The record is only active while the provider runs, not
+                # while the consumer handles a chunk
+                previous = self._activate(record)
+                try:
+                    chunk = next(stream)
+                except StopIteration:
+                    break
+                finally:
+                    self._activate(previous)
+
+                if record.ttft_seconds is None:
+                    record.ttft_seconds = time.monotonic() - started
+
+                parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            previous = self._activate(record)
+            try:
+                stream.close()  # Records usage of partial streams
+            finally:
+                self._activate(previous)
+            self._finish_record(record, started)
+
+        response = ''.join(parts)
+        if cache_key is not None and response:
+            self.cache.set(cache_key, response)
+
+        if self.recorder is not None and response:
+            self.recorder.record(self.model, prompt, response)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> str:
+        """Async generate, bounded by max_concurrency.
+
+        The blocking HTTP call runs in a worker thread over the shared
+        connection pool, so many prompts can be awaited at once without
+        blocking the event loop. Identical concurrent requests are
+        coalesced before they take a thread.
+        """
+
+        options = dict(kwargs)
+        use_cache = options.pop('use_cache', True)
+        prefix = options.pop('prefix', "")
+
+        async def call() -> str:
+            queued = time.monotonic()
+            async with self._get_semaphore():
+                return await asyncio.to_thread(
+                    self._generate, prefix + prompt, max_tokens, temperature,
+                    use_cache, time.monotonic() - queued, options, prefix
+                )
+
+        request_key = self._request_key(prefix + prompt, max_tokens, temperature, **options)
+        return await self.singleflight.ado(request_key, call)
+
+    async def aembed(self, texts: list) -> list:
+        """Async embed, bounded by max_concurrency."""
+        async with self._get_semaphore():
+            return await asyncio.to_thread(self.embed, texts)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get concurrency semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
     def _generate_ollama(
         self,
         prompt: str,
@@ -86,25 +943,138 @@ class LLMService:
             "stream": False,
             "options": {
                 "temperature": temperature,
-                "num_predict": max_tokens
-            }
+                "num_predict": max_tokens,
+                "num_ctx": self.context_window
+            },
+            "keep_alive": self.keep_alive
         }
 
-        try:
-            response = requests.post(
-                f"{self.ollama_host}/api/generate",
-                json=payload,
-                timeout=120
+        if kwargs.get("schema"):
+            payload["format"] = kwargs["schema"]  # Grammar-constrained JSON
+
+        response = self._post_ollama("/api/generate", payload)
+        result = response.json()
+        text = result.get("response", "")
+
+        # Server-side time to first token: model load + prompt eval
+        record = self._active_record()
+        if record is not None and result.get("prompt_eval_duration") is not None:
+            record.ttft_seconds = self._seconds(
+                result.get("load_duration", 0) + result["prompt_eval_duration"]
             )
 
-            if response.status_code != 200:
-                raise Exception(f"Ollama error: {response.text}")
+        self._record_usage(
+            prompt, text,
+            result.get("prompt_eval_count"), result.get("eval_count"),
+            self._seconds(result.get("prompt_eval_duration"))
+        )
 
-            result = response.json()
-            return result.get("response", "")
+        return text
 
-        except Exception as e:
-            raise Exception(f"Ollama generation failed: {str(e)}")
+    @classmethod
+    def _gemini_config(
+        cls,
+        max_tokens: int,
+        temperature: float,
+        schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Gemini generationConfig, with JSON mode when a schema is given."""
+
+        config = {
+            "temperature": temperature,
+            "maxOutputTokens": max_tokens,
+        }
+
+        if schema:
+            config["responseMimeType"] = "application/json"
+            config["responseSchema"] = cls._gemini_schema(schema)
+
+        return config
+
+    @classmethod
+    def _gemini_schema(cls, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert JSON Schema to Gemini's OpenAPI-style Schema subset."""
+
+        converted = {}
+
+        for key, value in schema.items():
+            if key == "type":
+                converted["type"] = value.upper()
+            elif key == "properties":
+                converted["properties"] = {
+                    name: cls._gemini_schema(sub) for name, sub in value.items()
+                }
+            elif key == "items":
+                converted["items"] = cls._gemini_schema(value)
+            elif key in ("required", "enum", "description", "nullable",
+                         "format", "minItems", "maxItems", "minimum", "maximum"):
+                converted[key] = value
+
+        return converted
+
+    @staticmethod
+    def _seconds(nanoseconds: Optional[int]) -> Optional[float]:
+        """Ollama durations are in nanoseconds."""
+        return nanoseconds / 1e9 if nanoseconds is not None else None
+
+    def _stream_ollama(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream tokens from Ollama (newline-delimited JSON)."""
+
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+                "num_ctx": self.context_window
+            },
+            "keep_alive": self.keep_alive
+        }
+
+        if kwargs.get("schema"):
+            payload["format"] = kwargs["schema"]  # Grammar-constrained JSON
+
+        # Retries only cover opening the stream, not a broken one.
+        # The host slot is held until the stream is closed.
+        response, lease = self._ollama_request("/api/generate", payload, stream=True)
+
+        parts = []
+        counted = False
+
+        with response:
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise LLMError(f"Ollama generation failed: {data['error']}")
+                    if data.get("response"):
+                        parts.append(data["response"])
+                        yield data["response"]
+                    if data.get("done"):
+                        # Final message carries the token counts
+                        counted = True
+                        self._record_usage(
+                            prompt, ''.join(parts),
+                            data.get("prompt_eval_count"), data.get("eval_count"),
+                            self._seconds(data.get("prompt_eval_duration"))
+                        )
+                        break
+            except requests.RequestException as e:
+                raise LLMError(f"Ollama stream interrupted: {str(e)}")
+            finally:
+                lease.release()
+                if not counted:
+                    # Closed before the final message: estimate
+                    self._record_usage(prompt, ''.join(parts))
 
     def _generate_gemini(
         self,
@@ -117,94 +1087,329 @@ class LLMService:
 
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent"
 
-        headers = {
-            "Content-Type": "application/json"
+        payload = {
+            "contents": [{
+                "parts": [{"text": prompt}]
+            }],
+            "generationConfig": self._gemini_config(max_tokens, temperature, kwargs.get("schema"))
         }
 
+        response = self._post("gemini", f"{url}?key={self.gemini_api_key}", payload)
+        result = response.json()
+
+        # Extract text from response
+        text = ""
+        candidates = result.get("candidates", [])
+        if candidates:
+            content = candidates[0].get("content", {})
+            parts = content.get("parts", [])
+            if parts:
+                text = parts[0].get("text", "")
+
+        usage = result.get("usageMetadata", {})
+        self._record_usage(
+            prompt, text,
+            usage.get("promptTokenCount"), usage.get("candidatesTokenCount")
+        )
+
+        return text
+
+    def _stream_gemini(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream text from Gemini (server-sent events)."""
+
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:streamGenerateContent"
+
         payload = {
             "contents": [{
                 "parts": [{"text": prompt}]
             }],
-            "generationConfig": {
-                "temperature": temperature,
-                "maxOutputTokens": max_tokens,
-            }
+            "generationConfig": self._gemini_config(max_tokens, temperature, kwargs.get("schema"))
         }
 
+        # Retries only cover opening the stream, not a broken one
+        response = self._post(
+            "gemini", f"{url}?alt=sse&key={self.gemini_api_key}", payload, stream=True
+        )
+
+        texts = []
+        usage = {}
+
+        with response:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = json.loads(line[len("data:"):])
+                    usage = data.get("usageMetadata", usage)
+                    for candidate in data.get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                texts.append(part["text"])
+                                yield part["text"]
+            except requests.RequestException as e:
+                raise LLMError(f"Gemini stream interrupted: {str(e)}")
+
+        self._record_usage(
+            prompt, ''.join(texts),
+            usage.get("promptTokenCount"), usage.get("candidatesTokenCount")
+        )
+
+    def _generate_fake(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> str:
+        """Generate using the in-process fake backend."""
+
+        result = self._call("fake", lambda timeout: self.fake.generate(prompt, max_tokens))
+
+        self._record_usage(
+            prompt, result['text'],
+            result['prompt_tokens'], result['completion_tokens'],
+            result['prompt_eval_seconds']
+        )
+
+        return result['text']
+
+    def _stream_fake(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream from the in-process fake backend."""
+
+        usage: Dict[str, Any] = {}
+
+        def attempt(timeout: float):
+            pieces = self.fake.stream(prompt, max_tokens, usage)
+            return next(pieces, None), pieces  # Injected errors raise here
+
+        first, pieces = self._call("fake", attempt)
+
+        texts = []
         try:
-            response = requests.post(
-                f"{url}?key={self.gemini_api_key}",
-                headers=headers,
-                json=payload,
-                timeout=120
+            if first is not None:
+                texts.append(first)
+                yield first
+
+            for piece in pieces:
+                texts.append(piece)
+                yield piece
+        finally:
+            pieces.close()
+            # Counts partial streams too
+            self._record_usage(
+                prompt, ''.join(texts),
+                usage.get('prompt_tokens'), None, usage.get('prompt_eval_seconds')
             )
 
-            if response.status_code != 200:
-                raise Exception(f"Gemini error: {response.text}")
+    def embed(self, texts: list) -> list:
+        """
+        Generate embeddings with the embedding model.
 
-            result = response.json()
+        Returns one vector per text; failed texts get None (never a
+        placeholder vector). Use embed_batch() for the failure reasons.
+        """
+        return self.embed_batch(texts).embeddings
 
-            # Extract text from response
-            candidates = result.get("candidates", [])
-            if candidates:
-                content = candidates[0].get("content", {})
-                parts = content.get("parts", [])
-                if parts:
-                    return parts[0].get("text", "")
+    def embed_batch(self, texts: List[str]) -> EmbeddingResult:
+        """Embed texts in as few requests as possible.
 
-            return ""
+        Texts are packed into batches of at most embed_batch_size items
+        and embed_batch_chars characters. A failing batch is split in
+        half and retried, so one bad item only fails itself.
+        """
 
-        except Exception as e:
-            raise Exception(f"Gemini generation failed: {str(e)}")
+        if self.provider not in ("ollama", "gemini", "fake"):
+            raise NotImplementedError(f"Embeddings not supported for {self.provider}")
 
-    def embed(self, texts: list) -> list:
-        """Generate embeddings (Ollama only for now)."""
+        result = EmbeddingResult(len(texts))
 
-        if self.provider != "ollama":
-            raise NotImplementedError("Embeddings only supported for Ollama")
+        started = time.monotonic()
+        record = self._start_record("embed")
+        record.items = len(texts)
+        previous = self._activate(record)
 
-        embeddings = []
+        try:
+            for batch in self._plan_embed_batches(texts):
+                self._embed_indices(texts, batch, result)
+        finally:
+            self._activate(previous)
+            if result.errors:
+                record.error = f"{len(result.errors)} failed"
+            self._finish_record(record, started)
 
-        for text in texts:
-            payload = {
-                "model": self.model,
-                "prompt": text
-            }
+        return result
 
-            try:
-                response = requests.post(
-                    f"{self.ollama_host}/api/embeddings",
-                    json=payload,
-                    timeout=30
+    def _plan_embed_batches(self, texts: List[str]) -> List[List[int]]:
+        """Group text indices into batches by count and size."""
+
+        batches = []
+        current = []
+        current_chars = 0
+
+        for i, text in enumerate(texts):
+            if current and (
+                len(current) >= self.embed_batch_size
+                or current_chars + len(text) > self.embed_batch_chars
+            ):
+                batches.append(current)
+                current = []
+                current_chars = 0
+
+            current.append(i)
+            current_chars += len(text)
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    def _embed_indices(
+        self,
+        texts: List[str],
+        indices: List[int],
+        result: EmbeddingResult
+    ) -> None:
+        """Embed one batch, splitting it on failure."""
+
+        batch = [texts[i] for i in indices]
+
+        try:
+            if self.provider == "gemini":
+                vectors = self._embed_gemini(batch)
+            elif self.provider == "fake":
+                vectors = self._call("fake", lambda timeout: self.fake.embed(batch))
+            else:
+                vectors = self._embed_ollama(batch)
+
+            if len(vectors) != len(batch):
+                raise Exception(
+                    f"Expected {len(batch)} embeddings, got {len(vectors)}"
                 )
 
-                if response.status_code == 200:
-                    result = response.json()
-                    embeddings.append(result.get("embedding", []))
-                else:
-                    # Fallback: empty embedding
-                    embeddings.append([0.0] * 768)
+        except Exception as e:
+            if len(indices) == 1:
+                result.errors[indices[0]] = str(e)
+                return
 
-            except Exception:
-                # Fallback: empty embedding
-                embeddings.append([0.0] * 768)
+            middle = len(indices) // 2
+            self._embed_indices(texts, indices[:middle], result)
+            self._embed_indices(texts, indices[middle:], result)
+            return
+
+        for i, vector in zip(indices, vectors):
+            if vector:
+                result.embeddings[i] = vector
+            else:
+                result.errors[i] = "Empty embedding returned"
 
-        return embeddings
+    def _embed_ollama(self, batch: List[str]) -> List[List[float]]:
+        """Embed batch using Ollama's /api/embed (many inputs per request)."""
+
+        try:
+            response = self._post_ollama(
+                "/api/embed",
+                {"model": self.embedding_model, "input": batch, "keep_alive": self.keep_alive}
+            )
+        except LLMError as e:
+            if e.status_code != 404 or len(batch) != 1:
+                raise
+
+            # Older Ollama without /api/embed: single-text endpoint
+            response = self._post_ollama(
+                "/api/embeddings",
+                {"model": self.embedding_model, "prompt": batch[0], "keep_alive": self.keep_alive}
+            )
+            return [response.json().get("embedding", [])]
+
+        return response.json().get("embeddings", [])
+
+    def _embed_gemini(self, batch: List[str]) -> List[List[float]]:
+        """Embed batch using Gemini batchEmbedContents."""
+
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.embedding_model}:batchEmbedContents"
+
+        payload = {
+            "requests": [
+                {
+                    "model": f"models/{self.embedding_model}",
+                    "content": {"parts": [{"text": text}]}
+                }
+                for text in batch
+            ]
+        }
+
+        response = self._post("gemini", f"{url}?key={self.gemini_api_key}", payload)
+
+        return [e.get("values", []) for e in response.json().get("embeddings", [])]
+
+    @staticmethod
+    def config_options(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Constructor options set in a Cerebrum config (llm and
+        embeddings sections)."""
+
+        llm_config = config.get('llm') or {}
+        options = {
+            key: llm_config[key]
+            for key in CONFIG_OPTIONS
+            if llm_config.get(key) is not None
+        }
+
+        # Deadlines/retries per provider: {provider: {max_attempts, ...}}
+        if llm_config.get('retry'):
+            options['retry_policies'] = llm_config['retry']
+
+        embeddings_config = config.get('embeddings') or {}
+        if embeddings_config.get('batch_size'):
+            options['embed_batch_size'] = embeddings_config['batch_size']
+
+        return options
 
     @classmethod
-    def create_default(cls) -> 'LLMService':
-        """Create default LLM service (tries Ollama first, falls back to Gemini)."""
+    def create_default(cls, vault_path: Optional[Path] = None, **options) -> 'LLMService':
+        """Create default LLM service (tries Ollama first, falls back to Gemini).
+
+        With vault_path, options set in the vault's .cerebrum/config.yaml
+        (see config_options) apply. Extra options (e.g. pool_connections,
+        pool_maxsize) are passed through to the constructor and win over
+        the config. CEREBRUM_LLM_PROVIDER=fake selects the fake backend
+        (no model needed); CEREBRUM_OLLAMA_HOSTS (comma-separated URLs)
+        spreads Ollama calls over several servers.
+        """
+
+        if vault_path is not None:
+            config_path = vault_path / '.cerebrum' / 'config.yaml'
+            if config_path.exists():
+                options = {**cls.config_options(Config.load(config_path) or {}), **options}
+
+        if os.getenv("CEREBRUM_LLM_PROVIDER") == "fake":
+            return cls(provider="fake", **options)
+
+        hosts = os.getenv("CEREBRUM_OLLAMA_HOSTS")
+        if hosts and 'ollama_hosts' not in options:
+            options['ollama_hosts'] = [h.strip() for h in hosts.split(',') if h.strip()]
 
         # Try Ollama first
         try:
-            return cls(provider="ollama")
+            return cls(provider="ollama", **options)
         except Exception:
             pass
 
         # Fall back to Gemini
         gemini_key = os.getenv("GEMINI_API_KEY")
         if gemini_key:
-            return cls(provider="gemini", gemini_api_key=gemini_key)
+            return cls(provider="gemini", gemini_api_key=gemini_key, **options)
 
         # No LLM available
         raise Exception(
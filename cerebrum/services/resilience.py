@@ -0,0 +1,215 @@
+"""Resilience: Deadlines, retries and circuit breaking for LLM calls.
+
+Policy per provider:
+- Per-attempt timeout, capped by an overall per-call deadline
+- Jittered exponential backoff for retryable errors only
+- Circuit breaker: fail fast while the backend is down, probe it
+  again after a cooldown
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, TypeVar, Dict, Any, Optional
+
+
+T = TypeVar('T')
+
+
+class LLMError(Exception):
+    """LLM call failed."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RetryableLLMError(LLMError):
+    """Transient failure (timeout, connection, 429, 5xx) worth retrying."""
+    pass
+
+
+class CircuitOpenError(LLMError):
+    """Backend marked down; call rejected without trying."""
+    pass
+
+
+class BackendBusyError(RetryableLLMError):
+    """No free request slot on our side; the backend was never called.
+
+    Worth retrying, but says nothing about the backend's health, so it
+    does not count against a circuit breaker.
+    """
+    pass
+
+
+@dataclass
+class RetryPolicy:
+    """Retry/deadline/breaker settings for one provider."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5  # seconds, doubled per retry
+    max_delay: float = 8.0
+    request_timeout: float = 120.0  # per HTTP attempt
+    deadline: float = 300.0  # whole call, including retries
+    failure_threshold: int = 5  # consecutive failures to open circuit
+    cooldown: float = 30.0  # seconds before probing an open circuit
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base: Optional['RetryPolicy'] = None) -> 'RetryPolicy':
+        """Build policy from config dict (unknown keys ignored; missing
+        keys come from base, else the class defaults)."""
+        fields = cls.__dataclass_fields__
+        values = {k: v for k, v in data.items() if k in fields}
+        return replace(base, **values) if base is not None else cls(**values)
+
+
+# HTTP statuses worth retrying
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+DEFAULT_POLICIES = {
+    'ollama': RetryPolicy(),
+    'gemini': RetryPolicy(max_attempts=4, base_delay=1.0, request_timeout=60.0),
+    'fake': RetryPolicy(base_delay=0.01, max_delay=0.1),
+}
+
+
+class CircuitBreaker:
+    """Closed → open after N consecutive failures → half-open after cooldown."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+
+        self._lock = threading.Lock()
+        self._probing = False
+
+    def allow(self) -> None:
+        """Raise CircuitOpenError unless a call may proceed."""
+
+        with self._lock:
+            if self.state == 'closed':
+                return
+
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = 'half_open'
+                self._probing = False
+
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True  # Let exactly one probe through
+                return
+
+            self.rejected += 1
+            remaining = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(
+                f"{self.name} circuit open (backend failing); retry in {remaining:.0f}s"
+            )
+
+    def record_skipped(self) -> None:
+        """Allowed call never reached the backend (no verdict either way)."""
+        with self._lock:
+            self._probing = False  # Next caller may probe instead
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'rejected': self.rejected
+        }
+
+
+def call_with_policy(
+    fn: Callable[[float], T],
+    policy: RetryPolicy,
+    breaker: Optional[CircuitBreaker] = None,
+    on_retry: Optional[Callable[[int, Exception], None]] = None
+) -> T:
+    """
+    Call fn(timeout) under policy.
+
+    Args:
+        fn: Performs one attempt; receives the timeout it must honor.
+            Raises RetryableLLMError for transient failures
+            (BackendBusyError when it could not start the request).
+        policy: Retry and deadline settings
+        breaker: Optional circuit breaker shared per backend
+        on_retry: Called with (attempt, error) before each retry
+
+    Raises:
+        CircuitOpenError: Breaker is open
+        LLMError: Non-retryable failure, retries exhausted or deadline hit
+    """
+
+    deadline = time.monotonic() + policy.deadline
+    attempt = 0
+
+    while True:
+        attempt += 1
+
+        if breaker:
+            breaker.allow()
+
+        remaining = deadline - time.monotonic()
+        timeout = min(policy.request_timeout, remaining)
+
+        try:
+            result = fn(timeout)
+        except RetryableLLMError as e:
+            if breaker and isinstance(e, BackendBusyError):
+                breaker.record_skipped()
+            elif breaker:
+                breaker.record_failure()
+
+            delay = policy.backoff(attempt)
+            out_of_time = time.monotonic() + delay >= deadline
+
+            if attempt >= policy.max_attempts or out_of_time:
+                raise LLMError(
+                    f"{str(e)} (gave up after {attempt} attempt(s))",
+                    status_code=e.status_code
+                ) from e
+
+            if on_retry:
+                on_retry(attempt, e)
+
+            time.sleep(delay)
+            continue
+        except LLMError:
+            # Backend answered (e.g. bad request): it is up
+            if breaker:
+                breaker.record_success()
+            raise
+        except Exception:
+            if breaker:
+                breaker.record_failure()
+            raise
+
+        if breaker:
+            breaker.record_success()
+
+        return result
@@ -0,0 +1,109 @@
+"""Single-flight: Coalesce identical concurrent calls.
+
+While a call for a key is in flight, further callers with the same key
+wait for it and share its result (or exception) instead of starting
+their own. Works for threads (do) and asyncio tasks (ado); an ado() leader is
+expected to end up in do(), which counts the actual execution.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Call:
+    """In-flight call shared by its waiters."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Deduplicates identical in-flight calls by key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls = weakref.WeakKeyDictionary()  # loop -> {key: Future}
+
+        # Counters
+        self.executed = 0
+        self.collapsed = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn() once per key among concurrent threads."""
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.collapsed += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() once per key among concurrent tasks of this loop."""
+
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            calls = self._async_calls.setdefault(loop, {})
+            future = calls.get(key)
+            if future is not None:
+                self.collapsed += 1
+                leader = False
+            else:
+                future = loop.create_future()
+                calls[key] = future
+                leader = True
+
+        if not leader:
+            # Shield: a cancelled waiter must not cancel the shared call
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unshared failure is not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                calls.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Executed vs collapsed call counts."""
+        return {
+            'executed': self.executed,
+            'collapsed': self.collapsed,
+            'in_flight': len(self._calls)
+        }
@@ -0,0 +1,222 @@
+"""Telemetry: Per-call LLM timings, token counts and cache behaviour.
+
+Every LLM call (generate, stream, embed) becomes one CallRecord tagged
+with the pipeline stage that made it:
+- wall time, time to first token, queue time (waiting for a slot)
+- prompt/completion tokens and output tokens/sec
+- shared prompt prefix size, prefix tokens the backend reused from its
+  KV cache and the prefill time that saved
+- retries, cache hit, coalesced (shared an identical in-flight call)
+- document the call was made for and the Ollama host that served it
+
+Summaries aggregate records per stage into histograms; records can be
+exported as JSONL for offline analysis.
+"""
+
+import bisect
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+
+@dataclass
+class CallRecord:
+    """One LLM call."""
+
+    stage: str
+    provider: str
+    model: str
+    kind: str  # generate | stream | embed
+    started: float = field(default_factory=time.time)
+    seq: int = 0
+    wall_seconds: float = 0.0
+    ttft_seconds: Optional[float] = None
+    queue_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    prefix_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    prefill_seconds_saved: float = 0.0
+    items: int = 1  # texts in an embed call
+    retries: int = 0
+    cache_hit: bool = False
+    coalesced: bool = False
+    error: Optional[str] = None
+    document: Optional[str] = None
+    host: Optional[str] = None
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        """Output tokens/sec after the first token (None if unknown)."""
+        if self.cache_hit or self.coalesced or not self.completion_tokens:
+            return None
+        generation = self.wall_seconds - (self.ttft_seconds or 0.0)
+        return self.completion_tokens / generation if generation > 0 else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['tokens_per_sec'] = self.tokens_per_sec
+        return data
+
+
+class Histogram:
+    """Fixed exponential buckets; percentiles are bucket upper bounds."""
+
+    BOUNDS = [0.001 * 1.5 ** i for i in range(40)]  # 1ms .. ~3 days
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+
+        rank = p * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.BOUNDS[i], self.max) if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'max': self.max
+        }
+
+
+class Telemetry:
+    """Thread-safe store of recent call records."""
+
+    def __init__(self, max_records: int = 50000):
+        self._lock = threading.Lock()
+        self._records: deque = deque(maxlen=max_records)
+        self._seq = 0
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            self._seq += 1
+            record.seq = self._seq
+            self._records.append(record)
+
+    def mark(self) -> int:
+        """Sequence number to pass as `since` to scope a summary."""
+        with self._lock:
+            return self._seq
+
+    def records(self, since: int = 0, document: Optional[str] = None) -> List[CallRecord]:
+        with self._lock:
+            return [
+                r for r in self._records
+                if r.seq > since and (document is None or r.document == document)
+            ]
+
+    def summary(self, since: int = 0, document: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Aggregate records per stage.
+
+        Args:
+            since: Only records after this mark()
+            document: Only records of this document (parallel runs)
+
+        Returns:
+            Dict with totals, 'hosts': {url: calls} and 'stages':
+            {stage: {calls, cache_hits, coalesced, retries, errors,
+            prompt_tokens, completion_tokens, cached_prompt_tokens,
+            prefill_seconds_saved, wall_seconds, ttft_seconds,
+            queue_seconds, tokens_per_sec}}, each timing a histogram
+            summary.
+        """
+
+        stages: Dict[str, Dict[str, Any]] = {}
+        histograms: Dict[str, Dict[str, Histogram]] = {}
+        hosts: Dict[str, int] = {}
+
+        for r in self.records(since, document):
+            if r.host:
+                hosts[r.host] = hosts.get(r.host, 0) + 1
+
+            stats = stages.setdefault(r.stage, {
+                'calls': 0,
+                'cache_hits': 0,
+                'coalesced': 0,
+                'retries': 0,
+                'errors': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'cached_prompt_tokens': 0,
+                'prefill_seconds_saved': 0.0,
+                'models': set()
+            })
+            hists = histograms.setdefault(r.stage, {
+                'wall_seconds': Histogram(),
+                'ttft_seconds': Histogram(),
+                'queue_seconds': Histogram(),
+                'tokens_per_sec': Histogram()
+            })
+
+            stats['calls'] += 1
+            stats['cache_hits'] += r.cache_hit
+            stats['coalesced'] += r.coalesced
+            stats['retries'] += r.retries
+            stats['errors'] += r.error is not None
+            stats['prompt_tokens'] += r.prompt_tokens
+            stats['completion_tokens'] += r.completion_tokens
+            stats['cached_prompt_tokens'] += r.cached_prompt_tokens
+            stats['prefill_seconds_saved'] += r.prefill_seconds_saved
+            stats['models'].add(f"{r.provider}/{r.model}")
+
+            hists['wall_seconds'].add(r.wall_seconds)
+            hists['queue_seconds'].add(r.queue_seconds)
+            if r.ttft_seconds is not None:
+                hists['ttft_seconds'].add(r.ttft_seconds)
+            if r.tokens_per_sec is not None:
+                hists['tokens_per_sec'].add(r.tokens_per_sec)
+
+        for stage, stats in stages.items():
+            stats['models'] = sorted(stats['models'])
+            for name, hist in histograms[stage].items():
+                stats[name] = hist.summary()
+
+        return {
+            'calls': sum(s['calls'] for s in stages.values()),
+            'wall_seconds': sum(s['wall_seconds']['mean'] * s['calls'] for s in stages.values()),
+            'cache_hits': sum(s['cache_hits'] for s in stages.values()),
+            'retries': sum(s['retries'] for s in stages.values()),
+            'prefill_seconds_saved': sum(
+                s['prefill_seconds_saved'] for s in stages.values()
+            ),
+            'hosts': hosts,
+            'stages': stages
+        }
+
+    def export_jsonl(self, path: Path, since: int = 0) -> int:
+        """Append records to a JSONL file; returns number written."""
+
+        records = self.records(since)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, 'a', encoding='utf-8') as f:
+            for r in records:
+                f.write(json.dumps(r.to_dict()) + '\n')
+
+        return len(records)
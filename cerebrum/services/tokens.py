@@ -0,0 +1,148 @@
+"""Tokens: Offline token estimation and prompt budgeting.
+
+No tokenizer download needed:
+- Base estimate from word pieces (~4 chars each), punctuation and
+  non-Latin characters (roughly one token per CJK character)
+- Per-model calibration factor learned from the token counts the
+  providers report back (EWMA)
+
+Prompt builders use budgets in tokens instead of character slices.
+"""
+
+import math
+import re
+import threading
+from typing import Dict, Optional, Any
+
+
+# Context windows (tokens) used for budgeting. For Ollama this is also
+# sent as num_ctx so the server actually allocates it.
+MODEL_CONTEXT_WINDOWS = {
+    'llama3.2': 8192,
+    'llama3.1': 8192,
+    'llama3': 8192,
+    'mistral': 8192,
+    'qwen2.5': 8192,
+    'gemma2': 8192,
+    'phi3': 4096,
+    'gemini-1.5-flash': 1048576,
+    'gemini-1.5-pro': 2097152,
+    'gemini-2.0-flash': 1048576,
+}
+
+DEFAULT_CONTEXT_WINDOW = 4096
+
+_PIECE_PATTERN = re.compile(
+    r'[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]'  # CJK/Kana/Hangul: ~1 token each
+    r'|[^\W\d_]+'  # Letters (any script)
+    r'|\d+'
+    r'|[^\w\s]'  # Punctuation/symbols
+)
+
+
+def context_window(model: str) -> int:
+    """Context window for model (matches 'llama3.2:1b' to 'llama3.2')."""
+    name = model.split(':')[0]
+    return MODEL_CONTEXT_WINDOWS.get(name, DEFAULT_CONTEXT_WINDOW)
+
+
+def _piece_cost(piece: str) -> int:
+    if piece.isdigit():
+        return max(1, math.ceil(len(piece) / 3))
+    if len(piece) == 1:
+        return 1
+    return max(1, math.ceil(len(piece) / 4))
+
+
+class TokenEstimator:
+    """Estimates token counts; calibrated per model from observed usage."""
+
+    def __init__(self, smoothing: float = 0.2):
+        self.smoothing = smoothing
+        self._factors: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, text: str, model: Optional[str] = None) -> int:
+        """Estimate tokens in text for model."""
+        base = sum(_piece_cost(m.group()) for m in _PIECE_PATTERN.finditer(text))
+        return math.ceil(base * self.factor(model))
+
+    def factor(self, model: Optional[str]) -> float:
+        """Calibration factor (1.0 until observations arrive)."""
+        if model is None:
+            return 1.0
+        return self._factors.get(model, 1.0)
+
+    def calibrate(self, model: str, text: str, actual_tokens: int) -> None:
+        """Update model factor from a provider-reported token count."""
+
+        base = sum(_piece_cost(m.group()) for m in _PIECE_PATTERN.finditer(text))
+        if base < 50 or actual_tokens <= 0:
+            return  # Too small to be informative
+
+        observed = actual_tokens / base
+
+        with self._lock:
+            current = self._factors.get(model)
+            if current is None:
+                self._factors[model] = observed
+            else:
+                self._factors[model] = (
+                    (1 - self.smoothing) * current + self.smoothing * observed
+                )
+
+    def truncate(self, text: str, max_tokens: int, model: Optional[str] = None) -> str:
+        """Longest prefix of text that fits in max_tokens (cut at a piece boundary)."""
+
+        if max_tokens <= 0:
+            return ""
+
+        budget = max_tokens / self.factor(model)
+        used = 0
+
+        for match in _PIECE_PATTERN.finditer(text):
+            used += _piece_cost(match.group())
+            if used > budget:
+                return text[:match.start()].rstrip()
+
+        return text
+
+
+class TokenUsage:
+    """Thread-safe aggregate of prompt/completion tokens per model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_model: Dict[str, Dict[str, int]] = {}
+
+    def record(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        estimated: bool = False
+    ) -> None:
+        with self._lock:
+            stats = self._by_model.setdefault(model, {
+                'calls': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'estimated_calls': 0
+            })
+            stats['calls'] += 1
+            stats['prompt_tokens'] += prompt_tokens
+            stats['completion_tokens'] += completion_tokens
+            if estimated:
+                stats['estimated_calls'] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals plus per-model breakdown."""
+        with self._lock:
+            by_model = {m: dict(s) for m, s in self._by_model.items()}
+
+        return {
+            'calls': sum(s['calls'] for s in by_model.values()),
+            'prompt_tokens': sum(s['prompt_tokens'] for s in by_model.values()),
+            'completion_tokens': sum(s['completion_tokens'] for s in by_model.values()),
+            'by_model': by_model
+        }
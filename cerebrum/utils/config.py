@@ -31,9 +31,83 @@ class Config:
                 'provider': 'ollama',
                 'model': 'llama3.2:latest',
                 'temperature': 0.3,
+                'pool_connections': 4,
+                'pool_maxsize': 16,
+                'max_concurrency': 8,
+                # Several Ollama servers: URLs or {url, max_concurrency};
+                # null uses localhost (or CEREBRUM_OLLAMA_HOSTS).
+                # host_routing: least_outstanding | latency
+                'ollama_hosts': None,
+                'host_routing': 'least_outstanding',
+                'max_per_host': 4,
+                # Files processed at once in a batch (null: one at a time)
+                'parallel_documents': None,
+                # Keep models loaded between requests; preload at startup
+                'keep_alive': '30m',
+                'warm_up': True,
+                # Per-stage routing: model name or {model, provider,
+                # context_window}; null uses the model above
+                'stages': {
+                    'classification': None,
+                    'distillation': None,
+                    'linking': None,
+                },
+                'retry': {
+                    # Ollama: failure_threshold and cooldown apply per
+                    # host (a down host leaves the rotation)
+                    'ollama': {
+                        'max_attempts': 3,
+                        'request_timeout': 120,
+                        'deadline': 300,
+                        'failure_threshold': 5,
+                        'cooldown': 30,
+                    },
+                    'gemini': {
+                        'max_attempts': 4,
+                        'request_timeout': 60,
+                        'deadline': 300,
+                    },
+                },
+            },
+            'extraction': {
+                # Processes extracting large PDFs (0 = one per CPU core,
+                # 1 = in-process); smaller PDFs always stay in-process.
+                # Isolated PDFs are extracted single-process, so the pool
+                # only applies with isolate: false
+                'pdf_workers': 0,
+                'parallel_min_pages': 64,
+                # Each PDF runs in a supervised subprocess: killed after
+                # timeout seconds or when it needs more than max_memory_mb
+                # (per process); image-only PDFs are rejected up front
+                'isolate': True,
+                'timeout': 300,
+                'max_memory_mb': 2048,
+            },
+            'distillation': {
+                # auto: map-reduce over sections when the document does
+                # not fit one prompt | single | chunked
+                'mode': 'auto',
+                'chunk_tokens': 4096,
+                'max_parallel_chunks': 4,
+                # agents.DistillerAgent: concept notes generated at once,
+                # or all in one prompt (packed)
+                'note_workers': 4,
+                'packed_notes': False,
+            },
+            'deduplication': {
+                # Concepts whose title + definition embedding is at least
+                # this similar to an existing note are merged into it
+                'enabled': True,
+                'threshold': 0.9,
+            },
+            'artifacts': {
+                # Reuse extraction, classification and destillation
+                # results of unchanged files (.cerebrum/artifacts.db)
+                'enabled': True,
             },
             'embeddings': {
                 'model': 'nomic-embed-text',
+                'batch_size': 64,
                 'cache': '.cerebrum/embeddings.db',
             },
             'vault': {
@@ -52,6 +126,9 @@ class Config:
                 'similarity_threshold': 0.75,
                 'max_suggestions': 5,
                 'auto_apply': False,
+                # Input tokens of one LLM linking prompt (source note +
+                # candidates; the context window may allow fewer)
+                'input_tokens': 2048,
             },
             'reviews': {
                 'seedling_interval': '7d',
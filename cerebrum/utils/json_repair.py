@@ -0,0 +1,215 @@
+"""Local repair of almost-JSON LLM output (no extra model call).
+
+Handles what small models typically get wrong:
+- Markdown fences and prose around the JSON
+- Trailing commas, // and /* */ comments
+- Python literals (True/False/None) and single-quoted strings
+- Unquoted object keys
+- Output cut off by max_tokens (unterminated string, open brackets)
+"""
+
+import json
+import re
+from typing import Any, Optional
+
+
+_SENTINEL = object()
+
+
+def loads_lenient(text: str) -> Optional[Any]:
+    """
+    Parse JSON from LLM output, repairing it if needed.
+
+    Args:
+        text: Raw model response
+
+    Returns:
+        Parsed value, or None if it cannot be recovered
+    """
+
+    if not text:
+        return None
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    value = _repair(text)
+    return None if value is _SENTINEL else value
+
+
+def _repair(text: str) -> Any:
+    """Repair and parse; returns _SENTINEL on failure (null is valid JSON)."""
+
+    body = _extract_body(text)
+    if body is None:
+        return _SENTINEL
+
+    for candidate in (body, _close_truncated(_normalize(body))):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+
+    # Last resort: drop the trailing (incomplete) element and close
+    trimmed = _drop_incomplete_tail(_normalize(body))
+    if trimmed is not None:
+        try:
+            return json.loads(_close_truncated(trimmed))
+        except json.JSONDecodeError:
+            pass
+
+    return _SENTINEL
+
+
+def _extract_body(text: str) -> Optional[str]:
+    """Text from the first { or [ on, without fences or trailing prose."""
+
+    text = re.sub(r'```(?:json)?', '', text)
+
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if not starts:
+        return None
+    text = text[min(starts):]
+
+    # Cut after the bracket that closes the first value, if it closes
+    end = _matching_end(text)
+    return text[:end + 1] if end is not None else text
+
+
+def _matching_end(text: str) -> Optional[int]:
+    """Index of the bracket closing text[0], or None if never closed."""
+
+    depth = 0
+    in_string = None
+    escaped = False
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == in_string:
+                in_string = None
+        elif ch in '"\'':
+            in_string = ch
+        elif ch in '{[':
+            depth += 1
+        elif ch in '}]':
+            depth -= 1
+            if depth == 0:
+                return i
+
+    return None
+
+
+def _normalize(text: str) -> str:
+    """Fix token-level mistakes outside of strings."""
+
+    out = []
+    i = 0
+    n = len(text)
+
+    while i < n:
+        ch = text[i]
+
+        # Strings: re-emit with double quotes
+        if ch in '"\'':
+            quote = ch
+            j = i + 1
+            chars = []
+            while j < n:
+                c = text[j]
+                if c == '\\' and j + 1 < n:
+                    chars.append(text[j:j + 2])
+                    j += 2
+                    continue
+                if c == quote:
+                    break
+                if c == '"' and quote == "'":
+                    chars.append('\\"')
+                elif c == '\n':
+                    chars.append('\\n')
+                else:
+                    chars.append(c)
+                j += 1
+            out.append('"' + ''.join(chars) + ('"' if j < n else ''))
+            i = j + 1
+            continue
+
+        # Comments
+        if text.startswith('//', i):
+            newline = text.find('\n', i)
+            i = n if newline < 0 else newline
+            continue
+        if text.startswith('/*', i):
+            close = text.find('*/', i + 2)
+            i = n if close < 0 else close + 2
+            continue
+
+        # Bare words: Python literals, unquoted keys or stray values
+        # (not the exponent of a number like 1e5)
+        match = re.match(r'[A-Za-z_][\w\-]*', text[i:])
+        if match and not (i and text[i - 1].isdigit()):
+            word = match.group()
+            literal = {'True': 'true', 'False': 'false', 'None': 'null'}.get(word)
+            if literal:
+                out.append(literal)
+            elif word in ('true', 'false', 'null'):
+                out.append(word)
+            else:
+                out.append(json.dumps(word))
+            i += len(word)
+            continue
+
+        out.append(ch)
+        i += 1
+
+    # Trailing commas
+    return re.sub(r',(\s*[}\]])', r'\1', ''.join(out))
+
+
+def _close_truncated(text: str) -> str:
+    """Close an unterminated string and any open brackets."""
+
+    stack = []
+    in_string = False
+    escaped = False
+
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]' and stack:
+            stack.pop()
+
+    if in_string:
+        text += '"'
+
+    text = re.sub(r'[,:]\s*$', '', text.rstrip())
+    if stack and stack[-1] == '}':
+        # A key cut off before its value: {"a": 1, "ke
+        text = re.sub(r'([{,])\s*"(?:[^"\\]|\\.)*"$', r'\1', text)
+        text = re.sub(r'[,:]\s*$', '', text)
+    text = re.sub(r',(\s*[}\]])', r'\1', text)
+
+    return text + ''.join(reversed(stack))
+
+
+def _drop_incomplete_tail(text: str) -> Optional[str]:
+    """Cut back to the last complete element of the outermost container."""
+
+    cut = max(text.rfind('},'), text.rfind('],'))
+    if cut < 0:
+        return None
+    return text[:cut + 1]
@@ -0,0 +1,101 @@
+"""Incremental JSON array parsing for streamed LLM output."""
+
+import json
+from typing import List, Dict, Any, Optional
+
+
+class JSONArrayStreamParser:
+    """
+    Parses objects out of a JSON array as it streams in.
+
+    Feed text chunks; each call returns the objects whose closing brace
+    arrived in that chunk. Text before the opening `[` (e.g. a "```json"
+    fence) is skipped up to max_preamble_chars.
+
+    Attributes:
+        done: The array's closing `]` has been seen
+        malformed: Output can no longer be parsed (see error)
+    """
+
+    def __init__(self, max_preamble_chars: int = 500):
+        self.max_preamble_chars = max_preamble_chars
+
+        self.done = False
+        self.malformed = False
+        self.error: Optional[str] = None
+
+        self._in_array = False
+        self._preamble = 0
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume chunk, return newly completed objects."""
+
+        objects = []
+
+        for char in chunk:
+            if self.done or self.malformed:
+                break
+
+            if not self._in_array:
+                if char == '[':
+                    self._in_array = True
+                elif not char.isspace():
+                    self._preamble += 1
+                    if self._preamble > self.max_preamble_chars:
+                        self._fail("No JSON array found in output")
+                continue
+
+            if self._depth == 0:
+                # Between array items
+                if char == '{':
+                    self._depth = 1
+                    self._buffer = [char]
+                elif char == ']':
+                    self.done = True
+                elif not (char.isspace() or char == ','):
+                    self._fail(f"Unexpected character between items: {char!r}")
+                continue
+
+            self._buffer.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    obj = self._decode(''.join(self._buffer))
+                    self._buffer = []
+                    if obj is not None:
+                        objects.append(obj)
+
+        return objects
+
+    def _decode(self, text: str) -> Optional[Dict[str, Any]]:
+        """Decode one complete object."""
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            self._fail(f"Invalid object: {str(e)}")
+            return None
+
+    def _fail(self, message: str) -> None:
+        self.malformed = True
+        self.error = message
+
+
+def parse_json_array(text: str) -> List[Dict[str, Any]]:
+    """Parse all complete objects of a JSON array in text."""
+    return JSONArrayStreamParser(max_preamble_chars=len(text)).feed(text)
@@ -0,0 +1,71 @@
+"""Output: Keep progress printed by parallel workers readable.
+
+- route_stdout(): while active, sys.stdout sends each thread's writes
+  to that thread's buffer if it has one, else straight through
+- buffered(): the calling thread's prints are collected and written
+  out in one piece when the block ends
+
+Documents processed at once then print one after another instead of
+line by line interleaved.
+"""
+
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator, TextIO
+
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+class ThreadRoutedStream:
+    """sys.stdout stand-in: per-thread buffer, else the wrapped stream."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        buffer = getattr(_local, 'buffer', None)
+        if buffer is not None:
+            return buffer.write(text)
+
+        with _write_lock:
+            return self.stream.write(text)
+
+    def flush(self) -> None:
+        if getattr(_local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)  # encoding, isatty, ...
+
+
+@contextmanager
+def route_stdout() -> Iterator[None]:
+    """Install ThreadRoutedStream as sys.stdout for the block."""
+
+    original = sys.stdout
+    sys.stdout = ThreadRoutedStream(original)
+    try:
+        yield
+    finally:
+        sys.stdout = original
+
+
+@contextmanager
+def buffered() -> Iterator[None]:
+    """Collect this thread's prints; emit them together at the end
+    (needs route_stdout() active, else prints pass straight through)."""
+
+    buffer = io.StringIO()
+    _local.buffer = buffer
+    try:
+        yield
+    finally:
+        _local.buffer = None
+        text = buffer.getvalue()
+        if text:
+            sys.stdout.write(text)
+            sys.stdout.flush()
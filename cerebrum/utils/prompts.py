@@ -0,0 +1,69 @@
+"""Shared document prefix for per-document LLM prompts.
+
+Every stage that reads the source document (classification,
+distillation, retries) opens its prompt with the same block: a fixed
+header followed by the document text, always cut from the start. Stage
+instructions come after it, so a later stage on the same model finds
+the earlier stage's tokens already in the KV cache.
+
+Only an identical block is reused (it ends with a closing rule, so a
+shorter cut is not a prefix of a longer one). The block's budget
+therefore does not depend on the stage: it leaves room for the largest
+completion and instructions of any stage that opens with it.
+"""
+
+from typing import Dict, Any
+
+# Document tokens in the shared block (the context window may allow fewer)
+DOCUMENT_INPUT_TOKENS = 4096
+
+# Room kept after the block: the largest stage completion (distillation)
+# plus stage instructions
+DOCUMENT_OUTPUT_TOKENS = 3000
+INSTRUCTIONS_RESERVE_TOKENS = 512
+
+
+def document_prefix(metadata: Dict[str, Any], text: str) -> str:
+    """Document block that opens a prompt (must not vary per stage)."""
+
+    return (
+        "# Source document\n\n"
+        f"Title: {metadata.get('title', 'Untitled')}\n"
+        f"Source type: {metadata.get('source_type', 'unknown')}\n\n"
+        f"{text}\n\n"
+        "---\n\n"
+    )
+
+
+def fit_document_prefix(
+    llm,
+    raw_text: str,
+    metadata: Dict[str, Any],
+    instructions: str,
+    max_output_tokens: int,
+    max_input_tokens: int = DOCUMENT_INPUT_TOKENS
+) -> str:
+    """
+    Document prefix holding as much text as the token budget allows.
+
+    Args:
+        llm: LLMService the prompt is for (budget follows its model)
+        raw_text: Full document text
+        metadata: Extraction metadata (title, source_type)
+        instructions: Stage instructions that follow the prefix
+        max_output_tokens: Completion budget of this stage
+        max_input_tokens: Cap on document tokens (stages sharing the
+            prefix must pass the same value)
+
+    Returns:
+        Prefix; the same for every stage on the same model and cap, as
+        long as the stage fits the shared reserve (a stage that does not
+        gets a shorter, unshared prefix)
+    """
+
+    header = document_prefix(metadata, "")
+    shared = llm.input_budget(DOCUMENT_OUTPUT_TOKENS + INSTRUCTIONS_RESERVE_TOKENS, header)
+    stage = llm.input_budget(max_output_tokens, header + instructions)
+    budget = min(max_input_tokens, shared, stage)
+
+    return document_prefix(metadata, llm.fit_tokens(raw_text, budget))
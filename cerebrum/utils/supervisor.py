@@ -0,0 +1,140 @@
+"""Supervisor: Run a function in a time- and memory-boxed subprocess.
+
+- Wall-clock limit: the child and everything it started are killed
+- Memory limit: RLIMIT_AS in the child (POSIX); allocations beyond it
+  raise MemoryError there
+- Crashes (segfault, kernel OOM kill) are reported instead of hanging
+  or taking the caller down
+
+Children are spawned, not forked, so fn and its arguments must be
+picklable (fn defined at module level).
+"""
+
+import multiprocessing
+import os
+import signal
+from typing import Any, Callable, Optional, Tuple
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False  # Windows: no memory limit
+
+
+class SupervisedError(Exception):
+    """Supervised call failed; reason is 'timeout', 'memory', 'crashed'
+    or the reason attribute of the child's exception (default 'error')."""
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def run_supervised(
+    fn: Callable,
+    args: Tuple = (),
+    timeout: Optional[float] = None,
+    max_memory_mb: Optional[int] = None
+) -> Any:
+    """
+    Call fn(*args) in a child process and return its result.
+
+    Args:
+        fn: Module-level function
+        args: Picklable arguments
+        timeout: Wall-clock seconds before the child is killed (None = no limit)
+        max_memory_mb: Address-space limit of the child and of each
+            process it starts (None = no limit)
+
+    Returns:
+        fn's return value
+
+    Raises:
+        SupervisedError: Timed out, out of memory, crashed or raised
+    """
+
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+
+    # Not a daemon: the child may start its own workers
+    process = context.Process(
+        target=_child, args=(sender, fn, args, max_memory_mb), name="cerebrum-supervised"
+    )
+    process.start()
+    sender.close()  # Child's copy only: EOF once the child is gone
+
+    try:
+        # Step 1: Wait for a message (result, error or EOF)
+        if not receiver.poll(timeout):
+            _kill(process)
+            raise SupervisedError(f"Timed out after {timeout:g}s", reason='timeout')
+
+        try:
+            message = receiver.recv()
+        except EOFError:
+            message = None
+
+        # Step 2: Reap the child
+        process.join(5)
+        if process.is_alive():
+            _kill(process)
+
+        if message is None:
+            raise SupervisedError(_exit_description(process.exitcode, max_memory_mb), reason=(
+                'memory' if process.exitcode == -signal.SIGKILL and max_memory_mb else 'crashed'
+            ))
+
+        status, payload, reason = message
+        if status == 'ok':
+            return payload
+        raise SupervisedError(payload, reason=reason)
+
+    finally:
+        receiver.close()
+
+
+def _child(sender, fn: Callable, args: Tuple, max_memory_mb: Optional[int]) -> None:
+    """Child entry point: apply limits, run fn, send the outcome."""
+
+    # Own process group, so a kill also reaches any workers fn starts
+    if hasattr(os, 'setsid'):
+        os.setsid()
+
+    if max_memory_mb and RESOURCE_AVAILABLE:
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    try:
+        message = ('ok', fn(*args), None)
+    except MemoryError:
+        message = ('error', f"Memory limit exceeded ({max_memory_mb} MB)", 'memory')
+    except Exception as e:
+        message = ('error', str(e) or type(e).__name__, getattr(e, 'reason', None) or 'error')
+
+    try:
+        sender.send(message)
+    except Exception:
+        pass  # Parent sees EOF and reports a crash
+    finally:
+        sender.close()
+
+
+def _kill(process) -> None:
+    """Kill the child's process group (or just the child) and reap it."""
+
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        process.kill()  # No group yet (or not POSIX)
+
+    process.join()
+
+
+def _exit_description(exitcode: Optional[int], max_memory_mb: Optional[int]) -> str:
+    if exitcode is not None and exitcode < 0:
+        name = signal.Signals(-exitcode).name
+        if exitcode == -signal.SIGKILL and max_memory_mb:
+            return f"Killed by {name} (likely out of memory, limit {max_memory_mb} MB)"
+        return f"Killed by {name}"
+    return f"Exited with code {exitcode} without a result"
@@ -1,25 +1,128 @@
-"""Template engine for note generation."""
+"""Templates: Compiled, cached note templates.
+
+- Placeholders are {name} (letters, digits, underscore); a placeholder
+  without a value is kept as written, so it can be filled in later
+- Each template is compiled once into a list of (literal, placeholder)
+  segments and rendered in a single pass; values are never re-scanned
+- Templates are looked up by name in `.cerebrum/templates/<name>.md`,
+  falling back to the default the caller ships; a file is re-read only
+  when its mtime or size changes
+
+To customize the literature, permanent or MOC note body, copy the
+default into `.cerebrum/templates/literature.md`, `permanent.md` or
+`moc.md` and edit it.
+"""
 
-from typing import Dict, Any
+import re
+import threading
 from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 
+_PLACEHOLDER = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
 
-class TemplateEngine:
-    """Simple template engine."""
+# Compiled strings passed to render() directly (not loaded by name)
+MAX_INLINE_TEMPLATES = 256
+
+
+class Template:
+    """A template compiled into literal and placeholder segments."""
+
+    __slots__ = ('source', 'segments', 'names')
+
+    def __init__(self, source: str):
+        self.source = source
+
+        # (literal, placeholder): placeholder is None for the trailing literal
+        segments: List[Tuple[str, Optional[str]]] = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            segments.append((source[position:match.start()], match.group(1)))
+            position = match.end()
+        segments.append((source[position:], None))
+
+        self.segments = tuple(segments)
+        self.names = frozenset(name for _, name in segments if name)
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        """Fill placeholders (missing ones are kept as {name})."""
 
-    def __init__(self, config: Dict[str, Any]):
-        self.config = config
-        self.templates_dir = Path('.cerebrum/templates')
+        parts = []
+        for literal, name in self.segments:
+            parts.append(literal)
+            if name is None:
+                continue
+            if name in variables:
+                parts.append(str(variables[name]))
+            else:
+                parts.append(f"{{{name}}}")
+        return ''.join(parts)
+
+
+class TemplateEngine:
+    """Loads templates by name (user file or default) and renders them."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, templates_dir: Optional[Path] = None):
+        self.config = config or {}
+        self.templates_dir = templates_dir or Path('.cerebrum/templates')
+
+        # name -> ((mtime_ns, size) of the user file or None, compiled)
+        self._named: Dict[str, Tuple[Optional[Tuple[int, int]], Template]] = {}
+        self._inline: Dict[str, Template] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_vault(cls, vault_path: Path) -> 'TemplateEngine':
+        """Engine reading user templates from the vault's .cerebrum directory."""
+        return cls(templates_dir=vault_path / ".cerebrum" / "templates")
+
+    def get(self, name: str, default: Optional[str] = None) -> Template:
+        """
+        Compiled template by name.
+
+        Args:
+            name: Template name (file <name>.md in the templates directory)
+            default: Source used when there is no user file
+                (None = default_template())
+
+        Returns:
+            Compiled template (cached until the user file changes)
+        """
+
+        path = self.templates_dir / f"{name}.md"
+        try:
+            stat = path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None  # No user file
+
+        with self._lock:
+            cached = self._named.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        if signature is not None:
+            try:
+                source = path.read_text(encoding='utf-8')
+            except OSError:
+                source, signature = None, None
+        else:
+            source = None
+
+        if source is None:
+            source = default if default is not None else self.default_template()
+
+        template = Template(source)
+        with self._lock:
+            self._named[name] = (signature, template)
+        return template
 
     def load_template(self, name: str) -> str:
         """Load template by name."""
-        template_path = self.templates_dir / f"{name}.md"
+        return self.get(name).source
 
-        if template_path.exists():
-            return template_path.read_text(encoding='utf-8')
-
-        # Return default template
-        return self.default_template()
+    def render_named(self, name: str, variables: Dict[str, Any], default: Optional[str] = None) -> str:
+        """Render the template called name (see get())."""
+        return self.get(name, default).render(variables)
 
     def default_template(self) -> str:
         """Default note template."""
@@ -43,6 +146,14 @@ class TemplateEngine:
 
     def render(self, template: str, variables: Dict[str, str]) -> str:
         """Render template with variables."""
-        for key, value in variables.items():
-            template = template.replace(f"{{{key}}}", str(value))
-        return template
+
+        with self._lock:
+            compiled = self._inline.get(template)
+        if compiled is None:
+            compiled = Template(template)
+            with self._lock:
+                if len(self._inline) >= MAX_INLINE_TEMPLATES:
+                    self._inline.clear()
+                self._inline[template] = compiled
+
+        return compiled.render(variables)